@@ -0,0 +1,75 @@
+"""
+captains.py
+-----------
+Starters and captains (kopmannen) for all races at once.
+
+top_k() takes a riders x races score matrix and a bool mask of the riders
+that can be picked per race, and returns the k best rows of every column in
+one go: np.argpartition finds the k-th best score per race, after which only
+the k selected rows per race are sorted. Ties are broken by row order, like
+the stable sorts on the pages. Both the Sporza Klassiekers page (top 12
+starters and the kopman advice) and the Scorito Evaluator (C1/C2/C3) read
+from it.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Geen score (NaN) komt na elke echte score, maar vóór wie niet gekozen kan worden
+_GEEN_SCORE = -np.finfo(float).max
+
+
+def top_k(scores, mask, k):
+    """
+    (races, k) int array with the row positions of the k best eligible
+    riders per race, best first; -1 where fewer than k riders are eligible.
+    """
+    scores = np.where(np.isnan(scores), _GEEN_SCORE, scores.astype(float))
+    masked = np.where(mask, scores, -np.inf)
+    n_rows, n_races = masked.shape
+    res = np.full((n_races, k), -1, dtype=int)
+    kk = min(k, n_rows)
+    if kk == 0:
+        return res
+
+    kth = np.argpartition(-masked, kk - 1, axis=0)[kk - 1]
+    grens = masked[kth, np.arange(n_races)]
+    beter = masked > grens
+    gelijk = masked == grens
+    # Bij een gelijke stand aan de grens gaan de eerste rijen voor
+    gekozen = beter | (gelijk & (np.cumsum(gelijk, axis=0) <= kk - beter.sum(axis=0)))
+    kolom, rij = np.nonzero(gekozen.T)
+    rijen = rij.reshape(n_races, kk)
+    volgorde = np.argsort(-masked[rijen, kolom.reshape(n_races, kk)], axis=1, kind='stable')
+    rijen = np.take_along_axis(rijen, volgorde, axis=1)
+    res[:, :kk] = np.where(np.take_along_axis(mask.T, rijen, axis=1), rijen, -1)
+    return res
+
+
+def starters_and_captains(df, races, active, n_starters=12, n_kopmannen=3):
+    """
+    For the riders of df (rows aligned with the bool riders x races frame
+    active): the n_starters best eligible riders per race by EV_{race}.
+    Returns (starters, kopmannen): a bool DataFrame shaped like active and a
+    DataFrame indexed by race with the n_kopmannen best names (None if fewer).
+    """
+    ev = df[[f'EV_{r}' for r in races]].to_numpy(dtype=float)
+    rijen = top_k(ev, active[races].to_numpy(dtype=bool), max(n_starters, n_kopmannen))
+
+    starters = np.zeros(ev.shape, dtype=bool)
+    k, r = np.nonzero(rijen[:, :n_starters] >= 0)
+    starters[rijen[k, r], k] = True
+
+    namen = np.append(df['Renner'].to_numpy(dtype=object), None)
+    kopmannen = pd.DataFrame(namen[rijen[:, :n_kopmannen]], index=list(races), dtype=object)
+    return pd.DataFrame(starters, index=active.index, columns=list(races)), kopmannen
+
+
+def fill_captains(ranking, vast=(), n=3):
+    """
+    Captains C1..Cn: the fixed picks in vast (None = free) first, the free
+    places filled with the best of ranking that is not a captain yet.
+    """
+    kopmannen = list(vast) + [None] * (n - len(vast))
+    vrij = iter(r for r in dict.fromkeys(ranking) if r is not None and r not in kopmannen)
+    return [c if c is not None else next(vrij, None) for c in kopmannen]
@@ -0,0 +1,183 @@
+"""
+cf_startlist.py
+---------------
+Startlist and price ingestion for the Cycling Fantasy dashboard.
+
+- PCS PDF startlists are read page by page (pdfplumber when installed,
+  otherwise pypdf) and rider rows are yielded as soon as a page is parsed;
+  the line regex is compiled once at import.
+- Parsed riders are cached by the SHA-256 of the file content, so
+  re-uploading the same PDF or a Streamlit rerun does not parse it again.
+- Names are matched against the stats through a name index that is built
+  once per list of names: exact normalized-name lookups first, fuzzy
+  token_set_ratio only for the rest, and every name is matched only once.
+  Choices are preprocessed once exactly like thefuzz does on every call, and
+  scores are rounded the same way, so fuzzy hits equal process.extractOne.
+- join_prices() attaches cf_prijzen.csv to the stats in bulk: a hash join on
+  the normalized name, then one vectorized cdist over the leftover prices
+  and the riders that did not get a price yet, and the 200-credit default.
+"""
+
+import hashlib
+import os
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+from thefuzz import utils as fuzz_utils
+
+from app_utils.name_matching import normalize_name_logic
+
+# Lines like: 123 VAN AERT Wout 100
+PCS_LINE = re.compile(r'\d+\s+([A-Z\s]+)\s+([A-Z][a-z\s]+)')
+
+DEFAULT_PRICE = 200
+MAX_CACHED_FILES = 32
+_parsed_cache = OrderedDict()
+_name_indexes = OrderedDict()
+
+
+def content_hash(source):
+    """SHA-256 of an uploaded file, bytes or path; None when the content cannot be read."""
+    data = None
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+    elif hasattr(source, 'getvalue'):
+        data = source.getvalue()
+    elif isinstance(source, (str, os.PathLike)) and os.path.isfile(source):
+        with open(source, 'rb') as f:
+            data = f.read()
+    if not isinstance(data, (bytes, bytearray)):
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_pdf_pages(source):
+    """Yields the text of every page, one page at a time."""
+    try:
+        import pdfplumber
+    except ImportError:
+        from pypdf import PdfReader
+        for page in PdfReader(source).pages:
+            yield page.extract_text() or ""
+        return
+    with pdfplumber.open(source) as pdf:
+        for page in pdf.pages:
+            yield page.extract_text() or ""
+
+
+def iter_pcs_riders(pages):
+    """Yields 'First LAST' for every startlist line in the page texts."""
+    for text in pages:
+        for line in text.split('\n'):
+            match = PCS_LINE.search(line)
+            if match:
+                yield f"{match.group(2).strip()} {match.group(1).strip()}"
+
+
+def parse_pcs_riders(source):
+    """Rider names from a PCS startlist PDF, cached by file content."""
+    key = content_hash(source)
+    if key is not None and key in _parsed_cache:
+        _parsed_cache.move_to_end(key)
+        return list(_parsed_cache[key])
+
+    riders = list(iter_pcs_riders(iter_pdf_pages(source)))
+    if key is not None:
+        _parsed_cache[key] = riders
+        if len(_parsed_cache) > MAX_CACHED_FILES:
+            _parsed_cache.popitem(last=False)
+    return list(riders)
+
+
+def build_name_index(full_names):
+    """
+    Name index for full_names, built once per distinct list: exact
+    normalized-name map, preprocessed fuzzy choices and a per-name memo.
+    """
+    full_names = tuple(full_names)
+    key = hash(full_names)
+    index = _name_indexes.get(key)
+    if index is not None and index['names'] == full_names:
+        return index
+
+    exact = {}
+    for naam in full_names:
+        exact.setdefault(normalize_name_logic(naam), naam)
+    index = {
+        'names': full_names,
+        'exact': exact,
+        'choices': [_preprocess(n) for n in full_names],
+        'memo': {},
+    }
+    _name_indexes[key] = index
+    if len(_name_indexes) > MAX_CACHED_FILES:
+        _name_indexes.popitem(last=False)
+    return index
+
+
+def _preprocess(text):
+    return fuzz_utils.full_process(str(text), force_ascii=True)
+
+
+def match_name(index, name, threshold):
+    """Best match for name (exact normalized hit, else token_set_ratio > threshold) or None."""
+    memo_key = (name, threshold)
+    if memo_key in index['memo']:
+        return index['memo'][memo_key]
+
+    match = index['exact'].get(normalize_name_logic(name))
+    if match is None:
+        best = rf_process.extractOne(
+            _preprocess(name), index['choices'], scorer=rf_fuzz.token_set_ratio, processor=None
+        )
+        match = index['names'][best[2]] if best and int(round(best[1])) > threshold else None
+    index['memo'][memo_key] = match
+    return match
+
+
+def match_names(names, full_names, threshold=75):
+    """Matches a list of names against full_names; unmatched names become None."""
+    index = build_name_index(full_names)
+    return [None if n is None or n != n or n == '' else match_name(index, str(n), threshold) for n in names]
+
+
+def join_prices(stats_names, df_prices, threshold=85, default=DEFAULT_PRICE):
+    """
+    Price per stats rider (Series aligned with stats_names). Prices are
+    joined on the normalized name first; the remaining price rows are fuzzy
+    scored (token_set_ratio > threshold) against the riders without a price
+    only. Riders without a match get the default price.
+    """
+    stats_names = pd.Series(stats_names).reset_index(drop=True)
+    prijzen = pd.Series(np.nan, index=stats_names.index, dtype=float)
+    if df_prices is None or df_prices.empty:
+        return prijzen.fillna(default).astype(int)
+
+    price_names = df_prices['Renner'].astype(str).reset_index(drop=True)
+    price_values = pd.to_numeric(df_prices['Prijs'], errors='coerce').reset_index(drop=True)
+
+    stats_norm = stats_names.map(normalize_name_logic)
+    price_norm = price_names.map(normalize_name_logic)
+    # First stats row per normalized name, last price row wins (same as the old price_map)
+    stats_pos = pd.Series(stats_norm.index, index=stats_norm.values)
+    stats_pos = stats_pos[~stats_pos.index.duplicated(keep='first')]
+    exact = price_norm.map(stats_pos)
+    hit = exact.notna()
+    prijzen.iloc[exact[hit].astype(int).to_numpy()] = price_values[hit].to_numpy()
+
+    rest = price_names[~hit]
+    open_pos = np.flatnonzero(prijzen.isna().to_numpy())
+    if len(rest) and len(open_pos):
+        choices = [_preprocess(n) for n in stats_names.iloc[open_pos]]
+        queries = [_preprocess(n) for n in rest]
+        scores = rf_process.cdist(queries, choices, scorer=rf_fuzz.token_set_ratio, processor=None, workers=-1)
+        best = scores.argmax(axis=1)
+        best_score = np.round(scores[np.arange(len(queries)), best])
+        for q, keep in enumerate(best_score > threshold):
+            if keep:
+                prijzen.iloc[open_pos[best[q]]] = price_values[rest.index[q]]
+
+    return prijzen.fillna(default).astype(int)
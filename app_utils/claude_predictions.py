@@ -12,12 +12,69 @@ SETUP
        anthropic>=0.25.0
 
 3. In Sporza_Giro.py, replace the old import/usage — see INTEGRATION below.
+
+Without an API key (or without the anthropic library) the deterministic
+LocalBackend serves the predictions instead: the best riders per stage on the
+weighted profile score, in the same JSON format, so tests and offline use run
+through the same parsing and resolving code.
+
+Stages can be split over several smaller requests (stages_per_request) that
+run concurrently on a thread pool (max_workers). Every stage in an answer is
+validated on its own; only stages without a valid answer (missing, no
+resolvable picks, or the whole request failed) are requested again, up to
+max_retries times. on_stage is called for every finished stage, so the page
+can show results while the other requests are still running.
+
+Results are cached per stage, per process and shared by all users, keyed by
+the hash of the rider table sent to the model, the normalised stage weights,
+top_x and the backend. Returned names are resolved through a name index that
+is built once per rider list (exact, then accent-insensitive, then WRatio >=
+85 on choices that are preprocessed once), with a memo per name.
 """
 
+import hashlib
 import json
+import threading
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-from thefuzz import process
+from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+from thefuzz import utils as fuzz_utils
+
+from app_utils.name_matching import normalize_name_logic
+
+MODEL = "claude-sonnet-4-20250514"
+API_URL = "https://api.anthropic.com"
+API_VERSION = "2023-06-01"
+MAX_TOKENS = 4096
+FUZZY_MIN_SCORE = 85
+MAX_CACHED = 32
+MAX_CACHED_STAGES = 32 * 21
+MAX_WORKERS = 4
+PROFIEL_STATS = ["SPR", "GC", "ITT", "MTN"]
+
+_predictions = OrderedDict()
+_resolvers = OrderedDict()
+_lock = threading.Lock()
+
+SYSTEM_PROMPT = (
+    "Je bent een elite wieleranalyst voor fantasy wielerspellen. "
+    "Je krijgt een rennerlijst (naam, team, prijs in M€, scores GC/SPR/ITT/MTN op 0-100, "
+    "verwachte waarde EV) en een lijst etappes met profiel-wegingen.\n\n"
+    "Wegingen uitleg:\n"
+    "  SPR  = kans voor sprinters / klassieke renners\n"
+    "  GC   = kans voor toplklimmers / klassementsrenners\n"
+    "  ITT  = voordeel voor tijdrijders\n"
+    "  MTN  = kans voor vluchters, punchers en aanvallers\n\n"
+    "Regels:\n"
+    "- Gebruik ALLEEN namen die exact voorkomen in de rennerlijst.\n"
+    "- Kies renners waarvan de dominante score overeenkomt met de hoogste weging.\n"
+    "- Geef je antwoord ALLEEN als geldig JSON — geen markdown, geen uitleg buiten de JSON."
+)
 
 # ---------------------------------------------------------------------------
 # Internal helpers
@@ -57,20 +114,244 @@ def _build_stages_context(etappes: list, custom_weights: dict) -> list:
     ]
 
 
-def _fuzzy_resolve(name: str, valid_names: list[str]) -> str | None:
+def _build_user_prompt(rider_csv: str, stages_list: list, top_x: int) -> str:
+    ids = [str(st_["id"]) for st_ in stages_list]
+    n_stages = len(ids)
+    komma = "," if n_stages > 1 else ""
+    voorbeeld = [f'  "{ids[0]}": {{"picks": ["Naam1", "Naam2", ...], "reasoning": "..."}}{komma}\n']
+    if n_stages > 2:
+        voorbeeld.append(f'  "{ids[1]}": {{"picks": [...], "reasoning": "..."}},\n')
+        voorbeeld.append('  ...\n')
+    if n_stages > 1:
+        voorbeeld.append(f'  "{ids[-1]}": {{"picks": [...], "reasoning": "..."}}\n')
+    return (
+        f"Beschikbare renners:\n{rider_csv}\n\n"
+        f"Etappes:\n{json.dumps(stages_list, ensure_ascii=False)}\n\n"
+        f"Voorspel voor ELKE etappe (id {ids[0]} t/m {ids[-1]}) de top {top_x} renners.\n"
+        f"Geef per etappe:\n"
+        f"  - \"picks\": lijst van PRECIES {top_x} namen (exacte namen uit de rennerlijst)\n"
+        f"  - \"reasoning\": één Nederlandse zin waarom dit type renner deze etappe domineert "
+        f"én waarom jouw eerste twee keuzes hier sterk zijn\n\n"
+        f"Formaat (alle {n_stages} etappes):\n"
+        "{\n"
+        + "".join(voorbeeld)
+        + "}"
+    )
+
+
+def _empty(etappes: list, top_x: int) -> tuple[dict, dict]:
+    return {str(e["id"]): [None] * top_x for e in etappes}, {}
+
+
+def _preprocess(text: str) -> str:
+    return fuzz_utils.full_process(str(text), force_ascii=True)
+
+
+# ---------------------------------------------------------------------------
+# Name resolving
+# ---------------------------------------------------------------------------
+
+def build_name_resolver(valid_names) -> dict:
+    """
+    Name index for valid_names, built once per distinct list: exact names,
+    an accent-insensitive map, preprocessed fuzzy choices and a per-name memo.
     """
-    Try to resolve a Claude-returned name to an exact df name.
+    valid_names = tuple(valid_names)
+    key = hash(valid_names)
+    with _lock:
+        resolver = _resolvers.get(key)
+        if resolver is not None and resolver["names"] == valid_names:
+            return resolver
+
+    genormaliseerd = {}
+    for naam in valid_names:
+        genormaliseerd.setdefault(normalize_name_logic(naam), naam)
+    resolver = {
+        "names": valid_names,
+        "exact": set(valid_names),
+        "normalized": genormaliseerd,
+        "choices": [_preprocess(n) for n in valid_names],
+        "memo": {},
+    }
+    with _lock:
+        _resolvers[key] = resolver
+        if len(_resolvers) > MAX_CACHED:
+            _resolvers.popitem(last=False)
+    return resolver
+
+
+def resolve_name(resolver: dict, name) -> str | None:
+    """
+    Resolve a Claude-returned name to an exact df name.
     Claude sometimes adds accents or slight spelling differences.
     """
-    if name in valid_names:
+    if not isinstance(name, str) or not name:
+        return None
+    if name in resolver["exact"]:
         return name
+    if name in resolver["memo"]:
+        return resolver["memo"][name]
+
+    match = resolver["normalized"].get(normalize_name_logic(name))
+    if match is None and resolver["choices"]:
+        # Zelfde score als thefuzz.process.extractOne (WRatio, afgerond)
+        best = rf_process.extractOne(_preprocess(name), resolver["choices"], scorer=rf_fuzz.WRatio, processor=None)
+        if best and int(round(best[1])) >= FUZZY_MIN_SCORE:
+            match = resolver["names"][best[2]]
+    resolver["memo"][name] = match
+    return match
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+# A backend answers complete(system, user, context) with the raw model text.
+# context holds the same request as structured data ("riders", "stages",
+# "top_x") for backends that do not read the prompt.
+
+class ClaudeBackend:
+    """The Anthropic Messages API through the anthropic SDK."""
+
+    def __init__(self, api_key: str, model: str = MODEL, base_url: str | None = None):
+        import anthropic
+        self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
+        self.model = model
+        self.name = f"claude:{model}"
+
+    def complete(self, system: str, user: str, context: dict) -> str:
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=MAX_TOKENS,
+            system=system,
+            messages=[{"role": "user", "content": user}],
+        )
+        return response.content[0].text
+
+
+class MessagesHTTPBackend:
+    """
+    The same Messages API call over plain HTTP (no SDK needed). base_url can
+    point at any server that speaks POST /v1/messages, e.g. a local mock.
+    """
+
+    def __init__(self, api_key: str, model: str = MODEL, base_url: str = API_URL, timeout: float = 120):
+        self.api_key = api_key
+        self.model = model
+        self.url = base_url.rstrip("/") + "/v1/messages"
+        self.timeout = timeout
+        self.name = f"claude:{model}"
+
+    def complete(self, system: str, user: str, context: dict) -> str:
+        body = json.dumps({
+            "model": self.model,
+            "max_tokens": MAX_TOKENS,
+            "system": system,
+            "messages": [{"role": "user", "content": user}],
+        }).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, method="POST", headers={
+            "x-api-key": self.api_key,
+            "anthropic-version": API_VERSION,
+            "content-type": "application/json",
+        })
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = json.loads(response.read().decode("utf-8"))
+        return "".join(blok.get("text", "") for blok in data.get("content", []) if blok.get("type") == "text")
+
+
+class LocalBackend:
+    """
+    Deterministic stand-in: per stage the top_x riders on the weighted
+    SPR/GC/ITT/MTN score (ties on Giro_EV, then name), as Claude-style JSON.
+    """
+
+    name = "local"
+
+    def complete(self, system: str, user: str, context: dict) -> str:
+        riders = context["riders"]
+        namen = riders["Renner"].to_numpy(dtype=object)
+        stats = np.column_stack([
+            pd.to_numeric(riders[c], errors="coerce").fillna(0).to_numpy(dtype=float) if c in riders.columns
+            else np.zeros(len(riders))
+            for c in PROFIEL_STATS
+        ])
+        ev = pd.to_numeric(riders.get("Giro_EV", pd.Series(0, index=riders.index)), errors="coerce").fillna(0).to_numpy(dtype=float)
+
+        antwoord = {}
+        for stage in context["stages"]:
+            w = np.array([stage["weights"].get(c, 0) for c in PROFIEL_STATS], dtype=float)
+            score = stats @ w
+            top = [namen[i] for i in np.lexsort((namen.astype(str), -ev, -score))[:context["top_x"]]]
+            profiel = PROFIEL_STATS[int(np.argmax(w))]
+            antwoord[str(stage["id"])] = {
+                "picks": top,
+                "reasoning": f"Lokale voorspelling: {profiel}-profiel, {' en '.join(top[:2])} scoren hier het hoogst.",
+            }
+        return json.dumps(antwoord, ensure_ascii=False)
+
+
+def _api_key() -> str:
+    try:
+        return st.secrets.get("ANTHROPIC_API_KEY", "")
+    except Exception:
+        return ""
+
+
+def kies_backend():
+    """
+    ClaudeBackend with an API key (MessagesHTTPBackend when the anthropic
+    library is not installed), else LocalBackend.
+    """
+    api_key = _api_key()
+    if not api_key:
+        st.info("🔑 Geen API key gevonden: de suggesties komen van het lokale etappeprofiel-model.")
+        return LocalBackend()
+    try:
+        return ClaudeBackend(api_key)
+    except ImportError:
+        return MessagesHTTPBackend(api_key)
 
-    # Use thefuzz to find the closest match
-    match = process.extractOne(name, valid_names)
-    if match and match[1] >= 85:
-        return match[0]
 
-    return None
+def clear_cache():
+    with _lock:
+        _predictions.clear()
+        _resolvers.clear()
+
+
+# ---------------------------------------------------------------------------
+# Requests and validation
+# ---------------------------------------------------------------------------
+
+def _parse_answer(raw: str) -> dict:
+    """The JSON object in a model answer (markdown fences removed); raises ValueError."""
+    parsed = json.loads(raw.replace("```json", "").replace("```", "").strip())
+    if not isinstance(parsed, dict):
+        raise ValueError("antwoord is geen JSON object")
+    return parsed
+
+
+def _validate_stage(stage_data, resolver: dict, top_x: int):
+    """
+    (picks padded to top_x, reasoning, unresolved names) for one stage of an
+    answer, or None when the stage has no usable picks.
+    """
+    if not isinstance(stage_data, dict) or not isinstance(stage_data.get("picks"), list):
+        return None
+    picks, unresolved = [], []
+    for name in stage_data["picks"]:
+        resolved = resolve_name(resolver, name)
+        if resolved:
+            picks.append(resolved)
+        else:
+            unresolved.append(name)
+    if not picks:
+        return None
+    # Pad or trim to exactly top_x
+    picks = (picks + [None] * top_x)[:top_x]
+    return picks, str(stage_data.get("reasoning", "")), unresolved
+
+
+def _chunks(items: list, size: int) -> list:
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 
 # ---------------------------------------------------------------------------
@@ -82,131 +363,106 @@ def genereer_claude_etappe_voorspellingen(
     etappes: list,
     top_x: int,
     custom_weights: dict,
+    backend=None,
+    stages_per_request: int | None = None,
+    max_workers: int = MAX_WORKERS,
+    max_retries: int = 1,
+    on_stage=None,
 ) -> tuple[dict, dict]:
     """
     Claude-powered replacement for genereer_ai_etappe_voorspellingen().
 
     Parameters
     ----------
-    df             : merged DataFrame with startlist riders + stats (output of calculate_giro_ev)
-    etappes        : GIRO_ETAPPES list
-    top_x          : how many picks per stage
-    custom_weights : st.session_state.giro_weights
+    df                 : merged DataFrame with startlist riders + stats (output of calculate_giro_ev)
+    etappes            : GIRO_ETAPPES list
+    top_x              : how many picks per stage
+    custom_weights     : st.session_state.giro_weights
+    backend            : object with complete(system, user, context); default kies_backend()
+    stages_per_request : stages per request (None = all stages in one request)
+    max_workers        : maximum number of concurrent requests
+    max_retries        : extra rounds for the stages without a valid answer
+    on_stage           : optional callback(stage_id_str, picks, reasoning), called
+                         in the calling thread as soon as a stage is done
 
     Returns
     -------
     predictions : dict  {stage_id_str: [name | None, ...]}   — same shape as before
     reasoning   : dict  {stage_id_str: str}                  — new, one sentence per stage
     """
-    # --- dependency check -----------------------------------------------
-    try:
-        import anthropic
-    except ImportError:
-        st.error(
-            "📦 De Anthropic library ontbreekt. Voeg `anthropic>=0.25.0` toe aan "
-            "requirements.txt en herstart de app."
-        )
-        return {str(e["id"]): [None] * top_x for e in etappes}, {}
+    if backend is None:
+        backend = kies_backend()
 
-    api_key = st.secrets.get("ANTHROPIC_API_KEY", "")
-    if not api_key:
-        st.error(
-            "🔑 Geen API key gevonden. Voeg `ANTHROPIC_API_KEY = 'sk-ant-...'` toe "
-            "aan `.streamlit/secrets.toml`."
-        )
-        return {str(e["id"]): [None] * top_x for e in etappes}, {}
-
-    client = anthropic.Anthropic(api_key=api_key)
-    valid_names = df["Renner"].tolist()
     rider_csv = _build_rider_context(df)
-    stages_list = _build_stages_context(etappes, custom_weights)
-    n_stages = len(etappes)
-
-    # --- prompts ------------------------------------------------------------
-    system_prompt = (
-        "Je bent een elite wieleranalyst voor fantasy wielerspellen. "
-        "Je krijgt een rennerlijst (naam, team, prijs in M€, scores GC/SPR/ITT/MTN op 0-100, "
-        "verwachte waarde EV) en een lijst etappes met profiel-wegingen.\n\n"
-        "Wegingen uitleg:\n"
-        "  SPR  = kans voor sprinters / klassieke renners\n"
-        "  GC   = kans voor toplklimmers / klassementsrenners\n"
-        "  ITT  = voordeel voor tijdrijders\n"
-        "  MTN  = kans voor vluchters, punchers en aanvallers\n\n"
-        "Regels:\n"
-        "- Gebruik ALLEEN namen die exact voorkomen in de rennerlijst.\n"
-        "- Kies renners waarvan de dominante score overeenkomt met de hoogste weging.\n"
-        "- Geef je antwoord ALLEEN als geldig JSON — geen markdown, geen uitleg buiten de JSON."
-    )
+    rider_hash = hashlib.sha256(rider_csv.encode("utf-8")).hexdigest()
+    resolver = build_name_resolver(df["Renner"].tolist())
+    predictions, reasoning = _empty(etappes, top_x)
 
-    user_prompt = (
-        f"Beschikbare renners:\n{rider_csv}\n\n"
-        f"Etappes:\n{json.dumps(stages_list, ensure_ascii=False)}\n\n"
-        f"Voorspel voor ELKE etappe (id 1 t/m {n_stages}) de top {top_x} renners.\n"
-        f"Geef per etappe:\n"
-        f"  - \"picks\": lijst van PRECIES {top_x} namen (exacte namen uit de rennerlijst)\n"
-        f"  - \"reasoning\": één Nederlandse zin waarom dit type renner deze etappe domineert "
-        f"én waarom jouw eerste twee keuzes hier sterk zijn\n\n"
-        f"Formaat (alle {n_stages} etappes):\n"
-        "{\n"
-        '  "1": {"picks": ["Naam1", "Naam2", ...], "reasoning": "..."},\n'
-        '  "2": {"picks": [...], "reasoning": "..."},\n'
-        f'  ...\n'
-        f'  "{n_stages}": {{"picks": [...], "reasoning": "..."}}\n'
-        "}"
-    )
+    def cache_key(stage):
+        return (rider_hash, json.dumps(stage, sort_keys=True, ensure_ascii=False), top_x, backend.name)
 
-    # --- API call -----------------------------------------------------------
-    with st.spinner("🤖 Claude analyseert alle 21 etappes..."):
-        try:
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=4096,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}],
-            )
-            raw = response.content[0].text
-        except Exception as exc:
-            st.error(f"Claude API fout: {exc}")
-            return {str(e["id"]): [None] * top_x for e in etappes}, {}
-
-    # --- parse --------------------------------------------------------------
-    try:
-        clean = raw.replace("```json", "").replace("```", "").strip()
-        parsed: dict = json.loads(clean)
-    except json.JSONDecodeError as exc:
-        st.error(f"Claude's antwoord kon niet worden geparsed als JSON: {exc}")
-        st.code(raw[:500], language="text")
-        return {str(e["id"]): [None] * top_x for e in etappes}, {}
-
-    # --- build output -------------------------------------------------------
-    predictions: dict[str, list] = {}
-    reasoning: dict[str, str] = {}
-    unresolved: list[str] = []
+    def klaar(stage, picks, reden):
+        sid = str(stage["id"])
+        predictions[sid], reasoning[sid] = list(picks), reden
+        if on_stage is not None:
+            on_stage(sid, list(picks), reden)
+
+    open_stages = []
+    for stage in _build_stages_context(etappes, custom_weights):
+        with _lock:
+            hit = _predictions.get(cache_key(stage))
+            if hit is not None:
+                _predictions.move_to_end(cache_key(stage))
+        if hit is None:
+            open_stages.append(stage)
+        else:
+            klaar(stage, *hit)
 
-    for etappe in etappes:
-        sid = str(etappe["id"])
-        stage_data = parsed.get(sid, {})
-        raw_picks: list = stage_data.get("picks", [])
-
-        valid_picks: list = []
-        for name in raw_picks:
-            resolved = _fuzzy_resolve(name, valid_names)
-            if resolved:
-                valid_picks.append(resolved)
-            else:
-                unresolved.append(f"etappe {sid}: '{name}'")
-
-        # Pad or trim to exactly top_x
-        while len(valid_picks) < top_x:
-            valid_picks.append(None)
-        predictions[sid] = valid_picks[:top_x]
-        reasoning[sid] = stage_data.get("reasoning", "")
+    unresolved: list[str] = []
+    fouten: list[str] = []
+    for _ in range(max_retries + 1):
+        if not open_stages:
+            break
+        requests = _chunks(open_stages, stages_per_request or len(open_stages))
+        mislukt = []
+        with st.spinner(f"🤖 Claude analyseert {len(open_stages)} etappes..."):
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requests)))) as pool:
+                futures = {
+                    pool.submit(backend.complete, SYSTEM_PROMPT, _build_user_prompt(rider_csv, chunk, top_x),
+                                {"riders": df, "stages": chunk, "top_x": top_x}): chunk
+                    for chunk in requests
+                }
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        parsed = _parse_answer(future.result())
+                    except Exception as exc:
+                        fouten.append(f"etappe {chunk[0]['id']}-{chunk[-1]['id']}: {exc}")
+                        mislukt += chunk
+                        continue
+                    for stage in chunk:
+                        res = _validate_stage(parsed.get(str(stage["id"])), resolver, top_x)
+                        if res is None:
+                            mislukt.append(stage)
+                            continue
+                        picks, reden, niet_herkend = res
+                        unresolved += [f"etappe {stage['id']}: '{n}'" for n in niet_herkend]
+                        with _lock:
+                            _predictions[cache_key(stage)] = (picks, reden)
+                            if len(_predictions) > MAX_CACHED_STAGES:
+                                _predictions.popitem(last=False)
+                        klaar(stage, picks, reden)
+        open_stages = mislukt
 
+    if open_stages:
+        st.error(
+            f"Geen geldige voorspelling voor etappe(s) {', '.join(str(s['id']) for s in open_stages)}"
+            + (f" — laatste fout: {fouten[-1]}" if fouten else "")
+        )
     if unresolved:
         st.warning(
             f"⚠️ {len(unresolved)} renner(s) niet herkend en overgeslagen: "
             + ", ".join(unresolved[:5])
             + ("..." if len(unresolved) > 5 else "")
         )
-
     return predictions, reasoning
@@ -1,8 +1,38 @@
 import json
 import hashlib
+import hmac
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 
+# Standaard aantal PBKDF2 iteraties; te overschrijven met PBKDF2_ITERATIONS (omgeving of secrets)
+PBKDF2_ITERATIONS = 600000
+
+# Hoogstens MAX_WORKERS hashes tegelijk; pbkdf2_hmac geeft de GIL vrij, dus de
+# rest van de server blijft bereikbaar terwijl er ingelogd wordt
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+# Maximaal aantal wachtende hashes; daarboven krijgt de gebruiker "druk" terug
+MAX_WACHTRIJ = 32
+WACHTRIJ_TIMEOUT = 10.0
+
+# Per gebruiker hoogstens MAX_POGINGEN inlogpogingen per POGING_VENSTER seconden
+MAX_POGINGEN = 5
+POGING_VENSTER = 60.0
+
+# Uitkomsten van controleer_login
+LOGIN_OK = "ok"
+LOGIN_FOUT = "fout"
+LOGIN_TE_VEEL = "te_veel_pogingen"
+LOGIN_DRUK = "druk"
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="wachtwoord")
+_wachtrij = threading.BoundedSemaphore(MAX_WACHTRIJ)
+_pogingen = {}
+_pogingen_lock = threading.Lock()
+
 def generate_signature(data_dict):
     """
     Generates a SHA-256 hash for a given dictionary.
@@ -12,12 +42,27 @@ def generate_signature(data_dict):
     salt = st.secrets["CRYPTO_SALT"]
     return hashlib.sha256((data_str + salt).encode('utf-8')).hexdigest()
 
-def hash_wachtwoord(wachtwoord):
+def pbkdf2_iteraties():
+    """
+    Configured PBKDF2 iteration count: the PBKDF2_ITERATIONS environment
+    variable, else the PBKDF2_ITERATIONS secret, else PBKDF2_ITERATIONS.
+    """
+    waarde = os.environ.get("PBKDF2_ITERATIONS")
+    if waarde is None:
+        try:
+            waarde = st.secrets.get("PBKDF2_ITERATIONS")
+        except Exception:
+            waarde = None
+    if isinstance(waarde, (int, str)) and str(waarde).strip().isdigit() and int(waarde) > 0:
+        return int(waarde)
+    return PBKDF2_ITERATIONS
+
+def hash_wachtwoord(wachtwoord, iterations=None):
     """
     Hashes a password using PBKDF2-HMAC-SHA256 with a random salt.
     Format: pbkdf2_sha256$<iterations>$<salt_hex>$<hash_hex>
     """
-    iterations = 600000
+    iterations = iterations or pbkdf2_iteraties()
     salt = os.urandom(16).hex()
     dk = hashlib.pbkdf2_hmac('sha256', wachtwoord.encode('utf-8'), salt.encode('utf-8'), iterations)
     return f"pbkdf2_sha256${iterations}${salt}${dk.hex()}"
@@ -33,8 +78,96 @@ def verify_wachtwoord(wachtwoord, db_hash):
             _, iterations_str, salt, stored_hash = parts
             iterations = int(iterations_str)
             dk = hashlib.pbkdf2_hmac('sha256', wachtwoord.encode('utf-8'), salt.encode('utf-8'), iterations)
-            return dk.hex() == stored_hash
+            return hmac.compare_digest(dk.hex(), stored_hash)
         return False
     else:
         # Legacy unsalted SHA-256 validation
-        return hashlib.sha256(wachtwoord.encode('utf-8')).hexdigest() == db_hash
+        return hmac.compare_digest(hashlib.sha256(wachtwoord.encode('utf-8')).hexdigest(), db_hash)
+
+def needs_rehash(db_hash):
+    """True for legacy SHA-256 hashes and PBKDF2 hashes with another iteration count than configured."""
+    parts = db_hash.split("$")
+    if len(parts) != 4 or parts[0] != "pbkdf2_sha256":
+        return True
+    return parts[1] != str(pbkdf2_iteraties())
+
+def _in_pool(fn, *args):
+    # Wacht op een plek in de begrensde wachtrij; None als de server te druk is
+    if not _wachtrij.acquire(timeout=WACHTRIJ_TIMEOUT):
+        return None
+    try:
+        future = _pool.submit(fn, *args)
+    except BaseException:
+        _wachtrij.release()
+        raise
+    future.add_done_callback(lambda _: _wachtrij.release())
+    return future
+
+def hash_in_pool(wachtwoord):
+    """hash_wachtwoord() on the worker pool; None when the queue stays full for WACHTRIJ_TIMEOUT seconds."""
+    future = _in_pool(hash_wachtwoord, wachtwoord)
+    return None if future is None else future.result()
+
+def wachttijd(gebruiker, nu=None):
+    """Seconds until gebruiker may try to log in again (0 when allowed)."""
+    nu = time.monotonic() if nu is None else nu
+    with _pogingen_lock:
+        pogingen = _pogingen.get(gebruiker)
+        if not pogingen:
+            return 0.0
+        while pogingen and pogingen[0] <= nu - POGING_VENSTER:
+            pogingen.popleft()
+        if not pogingen:
+            del _pogingen[gebruiker]
+            return 0.0
+        if len(pogingen) < MAX_POGINGEN:
+            return 0.0
+        return pogingen[0] + POGING_VENSTER - nu
+
+def _registreer_poging(gebruiker, nu=None):
+    nu = time.monotonic() if nu is None else nu
+    with _pogingen_lock:
+        _pogingen.setdefault(gebruiker, deque()).append(nu)
+
+def reset_pogingen(gebruiker=None):
+    with _pogingen_lock:
+        if gebruiker is None:
+            _pogingen.clear()
+        else:
+            _pogingen.pop(gebruiker, None)
+
+# Onbekende gebruikers worden tegen deze hash gecontroleerd, zodat een
+# mislukte login even lang duurt of de naam nu bestaat of niet
+_dummy_hashes = {}
+
+def _dummy_hash():
+    iterations = pbkdf2_iteraties()
+    if iterations not in _dummy_hashes:
+        _dummy_hashes[iterations] = hash_wachtwoord(os.urandom(16).hex(), iterations)
+    return _dummy_hashes[iterations]
+
+def _login_taak(wachtwoord, db_hash):
+    if not verify_wachtwoord(wachtwoord, db_hash or _dummy_hash()) or db_hash is None:
+        return False, None
+    # De nieuwe hash komt uit dezelfde worker, in dezelfde wachtrijplek
+    return True, hash_wachtwoord(wachtwoord) if needs_rehash(db_hash) else None
+
+def controleer_login(gebruiker, wachtwoord, db_hash):
+    """
+    Checks a login on the worker pool, with the per-user rate limit.
+    db_hash is the stored hash, or None when gebruiker does not exist.
+    Returns (status, nieuwe_hash): status is LOGIN_OK, LOGIN_FOUT,
+    LOGIN_TE_VEEL or LOGIN_DRUK; nieuwe_hash is the hash to store when the
+    stored one is legacy or uses another iteration count than configured.
+    """
+    if wachttijd(gebruiker) > 0:
+        return LOGIN_TE_VEEL, None
+    _registreer_poging(gebruiker)
+    future = _in_pool(_login_taak, wachtwoord, db_hash)
+    if future is None:
+        return LOGIN_DRUK, None
+    ok, nieuwe_hash = future.result()
+    if not ok:
+        return LOGIN_FOUT, None
+    reset_pogingen(gebruiker)
+    return LOGIN_OK, nieuwe_hash
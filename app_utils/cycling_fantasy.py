@@ -0,0 +1,60 @@
+"""
+cycling_fantasy.py
+------------------
+EV model for the Cycling Fantasy dashboard.
+
+calculate_cf_ev() is computed column-wise: after sorting on the race stat the
+ranking model is a lookup of the rank in CF_PTS and the power model is one
+vectorized power curve. Results are cached per (startlist hash, stat, method),
+so switching the race type or EV method back and forth costs a dict lookup.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+CF_PTS = np.array([45, 25, 22, 19, 17, 15, 14, 13, 12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1], dtype=float)
+EV_METHODS = ["1. Ranking (CF Punten)", "2. Macht 4 Curve"]
+
+MAX_CACHED = 64
+_ev_cache = OrderedDict()
+
+
+def startlist_hash(df):
+    """Stable hash of a startlist DataFrame (values, index and column names)."""
+    h = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _cf_ev(df, stat, method):
+    df = df.sort_values(by=[stat, 'AVG'], ascending=[False, False]).reset_index(drop=True)
+    if "Ranking (CF Punten)" in method:
+        ev = np.zeros(len(df))
+        n = min(len(df), len(CF_PTS))
+        ev[:n] = CF_PTS[:n]
+    else:
+        ev = (df[stat].to_numpy(dtype=float) / 100) ** 4 * 45
+    df['CF_EV'] = ev
+    df['Waarde (EV/Credit)'] = (df['CF_EV'] / df['Prijs']).replace([float('inf'), -float('inf')], 0).fillna(0).round(4)
+    return df
+
+
+def calculate_cf_ev(df, stat, method):
+    """
+    Startlist sorted on stat (then AVG) with CF_EV and 'Waarde (EV/Credit)'.
+    The returned frame is shared through the cache; do not modify it in place.
+    """
+    key = (startlist_hash(df), stat, method)
+    res = _ev_cache.get(key)
+    if res is not None:
+        _ev_cache.move_to_end(key)
+        return res
+
+    res = _cf_ev(df, stat, method)
+    _ev_cache[key] = res
+    if len(_ev_cache) > MAX_CACHED:
+        _ev_cache.popitem(last=False)
+    return res
@@ -0,0 +1,151 @@
+"""
+data_access.py
+--------------
+Shared, memoised access to the data files in data/.
+
+Every page used to read renners_stats.csv (and the startlists) with its own
+loader and its own st.cache_data copy. read_table() reads a file once per
+process and keeps it until the file's mtime or size changes; the normalized
+datasets built on top of it (rider_stats) are memoised on that same file
+version. All sessions and pages share one copy.
+
+The frames handed out are shallow copies of the shared frame: callers may add,
+rename or replace columns freely (nothing is copied until they do, pandas
+copy-on-write), but must not write values in place into the shared columns.
+
+with_columns() adds or replaces many columns in one concat instead of one
+insert per column, which would fragment the frame (60+ race columns at scale).
+
+compact_frame() gives rider frames small dtypes: categorical Team and
+Nationaliteit, uint8 stats (0-100), bool race participation and float32 EVs.
+Stats stay uint8 only for storage and comparisons; any arithmetic that can
+leave 0-255 must go through float (e.g. stat / 100) or astype(int) first.
+"""
+
+import os
+import threading
+
+import pandas as pd
+
+DATA_DIR = "data"
+STATS_PATH = os.path.join(DATA_DIR, "renners_stats.csv")
+STAT_COLS = ['COB', 'HLL', 'SPR', 'AVG', 'FLT', 'MTN', 'ITT', 'GC', 'OR', 'TTL', 'HLL/MTN']
+CATEGORY_COLS = ['Team', 'Nationaliteit']
+
+_tables = {}
+_datasets = {}
+_lock = threading.Lock()
+
+
+def file_version(path):
+    """(mtime_ns, size) of path, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read(path):
+    df = pd.read_csv(path, sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def _cached(cache, key, version, build):
+    with _lock:
+        entry = cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+    value = build()
+    with _lock:
+        cache[key] = (version, value)
+    return value
+
+
+def read_table(path):
+    """
+    The file as a DataFrame (separator sniffed, column names stripped), read
+    once per file version. Raises FileNotFoundError when the file is missing.
+    """
+    version = file_version(path)
+    if version is None:
+        raise FileNotFoundError(path)
+    df = _cached(_tables, os.path.abspath(path), version, lambda: _read(path))
+    return df.copy(deep=False)
+
+
+def normalize_rider_stats(df):
+    """Renner/Team columns, one row per rider, numeric stat columns (int, missing -> 0), Team 'Onbekend'."""
+    if 'Naam' in df.columns and 'Renner' not in df.columns:
+        df = df.rename(columns={'Naam': 'Renner'})
+    if 'Team' not in df.columns and 'Ploeg' in df.columns:
+        df = df.rename(columns={'Ploeg': 'Team'})
+    df = df.drop_duplicates(subset=['Renner'], keep='first').reset_index(drop=True)
+    stats = {}
+    for col in STAT_COLS[:-1]:
+        if col in df.columns:
+            stats[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+        else:
+            stats[col] = pd.Series(0, index=df.index, dtype=int)
+    df = df.assign(**stats)
+    df['Team'] = df['Team'].fillna('Onbekend') if 'Team' in df.columns else 'Onbekend'
+    return compact_frame(df)
+
+
+def with_columns(df, cols):
+    """
+    df with the columns of cols (a DataFrame or a dict of Series indexed like
+    df) added or replaced in one step; replaced columns keep their position.
+    The other columns of df are shared, not copied.
+    """
+    if not isinstance(cols, pd.DataFrame):
+        cols = pd.concat(cols, axis=1)
+    vervangen = [c for c in cols.columns if c in df.columns]
+    volgorde = list(df.columns) + [c for c in cols.columns if c not in df.columns]
+    return pd.concat([df.drop(columns=vervangen), cols], axis=1).reindex(columns=volgorde)
+
+
+def compact_frame(df, race_cols=(), ev_cols=None):
+    """
+    df with compact dtypes: CATEGORY_COLS as category ('Onbekend' always a
+    category, so fillna('Onbekend') keeps working), integer STAT_COLS within
+    0-255 as uint8, race_cols as bool (== 1) and ev_cols (default: all float
+    EV_* columns) as float32.
+    """
+    nieuw = {}
+    for col in CATEGORY_COLS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            cat = df[col].astype('category')
+            if 'Onbekend' not in cat.cat.categories:
+                cat = cat.cat.add_categories(['Onbekend'])
+            nieuw[col] = cat
+    for col in STAT_COLS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]) and len(df):
+            if df[col].min() >= 0 and df[col].max() <= 255:
+                nieuw[col] = df[col].astype('uint8')
+    for col in race_cols:
+        if col in df.columns:
+            nieuw[col] = df[col] == 1
+    if ev_cols is None:
+        ev_cols = [c for c in df.columns if str(c).startswith('EV_')]
+    for col in ev_cols:
+        if col in df.columns and pd.api.types.is_float_dtype(df[col]):
+            nieuw[col] = df[col].astype('float32')
+    return with_columns(df, nieuw) if nieuw else df
+
+
+def rider_stats(path=STATS_PATH):
+    """Normalized renners_stats.csv (see normalize_rider_stats), shared by all pages."""
+    version = file_version(path)
+    if version is None:
+        raise FileNotFoundError(path)
+    df = _cached(_datasets, ('rider_stats', os.path.abspath(path)), version,
+                 lambda: normalize_rider_stats(read_table(path)))
+    return df.copy(deep=False)
+
+
+def clear_cache():
+    with _lock:
+        _tables.clear()
+        _datasets.clear()
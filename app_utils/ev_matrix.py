@@ -0,0 +1,102 @@
+"""
+ev_matrix.py
+------------
+Dense riders x races EV matrix for fast transfer-plan evaluation.
+
+build_ev_matrix() turns the EV_{race} columns of a dataframe into one float
+ndarray plus a rider-name -> row lookup and per-rider cumulative sums. A
+plan then reduces to a handful of ownership intervals (rider row, first race,
+end race) whose EV is a difference of two cumulative sums, so evaluating a
+plan is O(team size) instead of one dataframe scan per rider per race.
+
+Transfer semantics match evaluate_plan_ev: a transfer with moment == race is
+applied *for* that race, transfers with an unknown moment are ignored, and
+riders that are not in the matrix score 0.
+"""
+
+import numpy as np
+
+
+def starters_order(df, koers, stat):
+    """
+    Row positions of the starters of koers, best first: stat, then AVG,
+    descending, ties in df order. This is the order in which the EV functions
+    hand out race points.
+    """
+    pos = np.flatnonzero(df[koers].to_numpy() == 1)
+    stat_vals = df[stat].to_numpy(dtype=float)[pos]
+    avg_vals = df['AVG'].to_numpy(dtype=float)[pos]
+    return pos[np.lexsort((-avg_vals, -stat_vals))]
+
+
+def build_ev_matrix(df, available_races):
+    """
+    Returns {'ev', 'cum', 'suffix', 'index', 'races'}: ev is an
+    (n_riders, n_races) float array, cum the row-wise cumulative sum with a
+    leading zero column, suffix[:, k] the EV of races k.. (remaining EV after
+    race k-1), index maps rider name to row (first occurrence wins).
+    """
+    ev = df[[f'EV_{r}' for r in available_races]].to_numpy(dtype=float)
+    cum = np.zeros((ev.shape[0], ev.shape[1] + 1))
+    np.cumsum(ev, axis=1, out=cum[:, 1:])
+    index = {}
+    for row, renner in enumerate(df['Renner']):
+        index.setdefault(renner, row)
+    suffix = cum[:, -1:] - cum
+    return {'ev': ev, 'cum': cum, 'suffix': suffix, 'index': index, 'races': list(available_races)}
+
+
+def ownership_intervals(ev_matrix, base_team, plan):
+    """
+    Replays the plan and returns a list of (rider, start, end) race-index
+    intervals during which each rider is in the team (end exclusive).
+    """
+    races = ev_matrix['races']
+    race_pos = {r: k for k, r in enumerate(races)}
+    per_race = {}
+    for t in plan:
+        k = race_pos.get(t['moment'])
+        if k is not None:
+            per_race.setdefault(k, []).append(t)
+
+    since = {r: 0 for r in base_team}
+    intervals = []
+    for k in sorted(per_race):
+        for t in per_race[k]:
+            if t['uit'] in since:
+                intervals.append((t['uit'], since.pop(t['uit']), k))
+            if t['in'] not in since:
+                since[t['in']] = k
+    intervals += [(r, start, len(races)) for r, start in since.items()]
+    return intervals
+
+
+def evaluate_plans(ev_matrix, base_team, plans):
+    """
+    Scores many candidate plans at once. base_team is either one team shared
+    by all plans or a list with one team per plan. Returns a float ndarray.
+    """
+    shared = not base_team or isinstance(base_team[0], str)
+    index = ev_matrix['index']
+    plan_ids, rows, starts, ends = [], [], [], []
+    for p, plan in enumerate(plans):
+        team = base_team if shared else base_team[p]
+        for renner, start, end in ownership_intervals(ev_matrix, team, plan):
+            row = index.get(renner)
+            if row is not None and end > start:
+                plan_ids.append(p)
+                rows.append(row)
+                starts.append(start)
+                ends.append(end)
+
+    if not rows:
+        return np.zeros(len(plans))
+    cum = ev_matrix['cum']
+    rows = np.asarray(rows)
+    vals = cum[rows, np.asarray(ends)] - cum[rows, np.asarray(starts)]
+    return np.bincount(np.asarray(plan_ids), weights=vals, minlength=len(plans))
+
+
+def evaluate_plan(ev_matrix, base_team, plan):
+    """Total EV of a single plan."""
+    return float(evaluate_plans(ev_matrix, base_team, [plan])[0])
@@ -2,6 +2,8 @@ import pandas as pd
 import os
 import streamlit as st
 from app_utils.name_matching import match_naam_slim, normalize_name_logic
+from app_utils.data_access import compact_frame, rider_stats
+from app_utils.rider_types import giro_rollen
 
 @st.cache_data
 def load_giro_data():
@@ -18,16 +20,11 @@ def load_giro_data():
 
     try:
         df_prog  = pd.read_csv(prijzen_file, sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
-        df_stats = pd.read_csv(stats_file,   sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
+        df_stats = rider_stats(stats_file)
 
         df_prog.columns  = df_prog.columns.str.strip()
-        df_stats.columns = df_stats.columns.str.strip()
 
         if 'Naam' in df_prog.columns:  df_prog  = df_prog.rename(columns={'Naam': 'Renner'})
-        if 'Naam' in df_stats.columns: df_stats = df_stats.rename(columns={'Naam': 'Renner'})
-        if 'Ploeg' in df_stats.columns: df_stats = df_stats.rename(columns={'Ploeg': 'Team'})
-
-        df_stats = df_stats.drop_duplicates(subset=['Renner'], keep='first')
         norm_to_stats = {normalize_name_logic(n): n for n in df_stats['Renner'].unique()}
         df_prog['Renner_Stats'] = df_prog['Renner'].apply(lambda x: match_naam_slim(x, norm_to_stats))
 
@@ -65,11 +62,19 @@ def load_giro_data():
         if 'Naam' not in merged_df.columns:
             merged_df['Naam'] = merged_df['Renner']
 
-        return merged_df
+        return compact_frame(merged_df)
     except Exception as e:
         st.error(f"🚨 Er trad een fout op bij het laden van de data: {e}")
         return pd.DataFrame()
 
+def bepaal_rol(row):
+    """Giro role of one rider; giro_rollen() classifies a whole frame the same way."""
+    if row['GC']  >= 85: return 'Klassementsrenner'
+    if row['SPR'] >= 85: return 'Sprinter'
+    if row['ITT'] >= 85 and row['GC'] < 75: return 'Tijdrijder'
+    if row['MTN'] >= 80 and row['GC'] < 80: return 'Aanvaller / Klimmer'
+    return 'Knecht / Vrijbuiter'
+
 def calculate_giro_ev(df):
     df = df.copy()
     df['EV_GC']  = (df['GC']  / 100)**4 * 400
@@ -77,18 +82,12 @@ def calculate_giro_ev(df):
     df['EV_ITT'] = (df['ITT'] / 100)**4 * 80
     df['EV_MTN'] = (df['MTN'] / 100)**4 * 100
     df['Giro_EV'] = (df['EV_GC'] + df['EV_SPR'] + df['EV_ITT'] + df['EV_MTN']).fillna(0).round(0).astype(int)
+    df = compact_frame(df)
 
     # Backwards compatibility for Sporza_Giro_Bouwer
     df['EV'] = df['Giro_EV']
 
     df['Waarde (EV/M)'] = (df['Giro_EV'] / df['Prijs']).replace([float('inf'), -float('inf')], 0).fillna(0).round(1)
 
-    def bepaal_rol(row):
-        if row['GC']  >= 85: return 'Klassementsrenner'
-        if row['SPR'] >= 85: return 'Sprinter'
-        if row['ITT'] >= 85 and row['GC'] < 75: return 'Tijdrijder'
-        if row['MTN'] >= 80 and row['GC'] < 80: return 'Aanvaller / Klimmer'
-        return 'Knecht / Vrijbuiter'
-
-    df['Type'] = df.apply(bepaal_rol, axis=1)
+    df['Type'] = giro_rollen(df)
     return df
@@ -5,30 +5,26 @@ def solve_giro_team(df, draft_counts=None, max_bud=100.0, max_ren=16, max_per_te
     prob = pulp.LpProblem("Scorito_Giro_Solver", pulp.LpMaximize)
     x = pulp.LpVariable.dicts("Select", df.index, cat='Binary')
 
-    df_solve = df.copy()
-
     if draft_counts is not None:
-        df_solve['Draft_Pts'] = df_solve['Renner'].map(draft_counts).fillna(0)
-        df_solve['Obj_Score'] = (df_solve['Draft_Pts'] * 1000) + df_solve[ev_column]
+        draft_pts = df['Renner'].map(draft_counts).fillna(0)
+        obj_score = (draft_pts * 1000) + df[ev_column]
     else:
-        df_solve['Obj_Score'] = df_solve[ev_column]
+        obj_score = df[ev_column]
 
-    prob += pulp.lpSum([df_solve.loc[i, 'Obj_Score'] * x[i] for i in df_solve.index])
-    prob += pulp.lpSum([x[i] for i in df_solve.index]) == max_ren
-    prob += pulp.lpSum([df_solve.loc[i, 'Prijs'] * x[i] for i in df_solve.index]) <= max_bud
+    prob += pulp.lpSum([score * x[i] for i, score in zip(df.index, obj_score.to_numpy(dtype=float))])
+    prob += pulp.lpSum([x[i] for i in df.index]) == max_ren
+    prob += pulp.lpSum([prijs * x[i] for i, prijs in zip(df.index, df['Prijs'].to_numpy(dtype=float))]) <= max_bud
 
-    if max_per_team is not None and 'Team' in df_solve.columns:
-        for team in df_solve['Team'].dropna().unique():
-            team_indices = df_solve[df_solve['Team'] == team].index
+    if max_per_team is not None and 'Team' in df.columns:
+        for team_indices in df.groupby('Team', observed=True).groups.values():
             prob += pulp.lpSum([x[i] for i in team_indices]) <= max_per_team
 
     if force_base or ban_base:
-        for i in df_solve.index:
-            renner = df_solve.loc[i, 'Renner']
+        for i, renner in zip(df.index, df['Renner']):
             if force_base and renner in force_base: prob += x[i] == 1
             if ban_base and renner in ban_base:   prob += x[i] == 0
 
     prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=15))
     if pulp.LpStatus[prob.status] == 'Optimal':
-        return [df_solve.loc[i, 'Renner'] for i in df_solve.index if x[i].varValue > 0.5]
+        return [renner for i, renner in zip(df.index, df['Renner']) if x[i].varValue > 0.5]
     return []
@@ -0,0 +1,371 @@
+"""
+het_spel.py
+-----------
+Shared logic for the custom Sporza game (pages/Sporza/Classics/Het_Spel.py).
+
+build_race_index() precomputes for every race the top-50 favourites (on the
+race's specialty stat), the riders eligible as dark horse and, per base team,
+the extras that can still be picked. The index is built once per data
+version and shared by all races and reruns, so the selection widgets only do
+dict lookups.
+
+optimize_picks() fills in the extras, captain and dark horse of every race
+for a fixed base team in one batched numpy pass over the riders x races EV
+matrix from build_ev(). Per race the EV of a selection is the sum over the
+13 active riders plus the captain once more (x2) plus the dark-horse bonus,
+so the three best non-base riders are always the optimal extras, the best
+active rider the optimal captain, and the dark horse is independent.
+
+het_spel_standings() scores every player's custom_team against the results
+store: the picks become flat (player, race, rider, weight) entries (1 per
+active rider, 2 for the captain) plus (player, race, rider) dark-horse
+entries, about 14 per player and race, so all players and races are scored
+with two bincounts regardless of the number of riders. Standings are cached
+per set of payloads; only races that received new result rows are scored
+again.
+"""
+
+import hashlib
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app_utils.cf_startlist import build_name_index, match_name, match_names
+from app_utils.name_matching import normalize_name_logic
+from app_utils.results_store import load_results
+from app_utils.sporza_klassiekers import SCORITO_NAAR_SPORZA
+
+PRIJZEN_PATH = "data/sporza_prijzen_startlijst.csv"
+STATS_PATH = "data/renners_stats.csv"
+TOP_N_FAVORIETEN = 50
+HET_SPEL_PTS = [100, 80, 70, 60, 50, 40, 36, 32, 28, 24, 20, 18, 16, 14, 12, 10, 8, 6, 4, 2]
+DARK_HORSE_BONUS = 150
+DARK_HORSE_TOP = 10
+AANTAL_EXTRAS = 3
+EV_METHODS = ["1. Ranking (Spelpunten)", "2. Macht 4 Curve"]
+MAX_EXTRAS_CACHE = 32
+
+UITSLAG_MATCH_THRESHOLD = 70
+MAX_STANDINGS_CACHE = 8
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_standings = {}
+_standings_lock = threading.Lock()
+
+
+def koppel_stats(df_p, df_s, cols=('COB', 'HLL', 'SPR', 'AVG', 'Team')):
+    """
+    Adds the stats columns to the Sporza price/startlist frame. Sporza uses
+    short names ('VAN DER POEL Mathieu'), so riders are linked on the
+    normalized name (token_set_ratio > 75) while Renner keeps the Sporza name.
+    """
+    cols = [c for c in cols if c in df_s.columns and c not in df_p.columns]
+    df_s = df_s.drop_duplicates(subset=['Renner'], keep='first')
+    full_names = df_s['Renner'].dropna().astype(str).tolist()
+    norm_to_full = {normalize_name_logic(n): n for n in full_names}
+    gematcht = match_names([normalize_name_logic(n) for n in df_p['Renner'].astype(str)], list(norm_to_full), threshold=75)
+    koppel = pd.Series([norm_to_full.get(m) for m in gematcht], index=df_p.index)
+    stats = df_s.set_index('Renner')[cols]
+    return df_p.join(stats.reindex(koppel.to_numpy()).set_axis(df_p.index))
+
+
+def _top_50(df, stat):
+    if stat in df.columns:
+        return df.sort_values(by=stat, ascending=False).head(TOP_N_FAVORIETEN)['Renner'].tolist()
+    return df.head(TOP_N_FAVORIETEN)['Renner'].tolist()
+
+
+def build_race_index(df, races, koers_map, version):
+    """
+    Per-race index for (version, races), built once and shared:
+    {'alle_renners', 'alle_renners_set', 'races': {race: {'stat', 'top_50', 'dark_horses'}}}.
+    version identifies the data (e.g. the file mod times of the inputs).
+    """
+    key = (version, tuple(races), tuple(sorted(koers_map.items())))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            return index
+
+        alle_renners = sorted(df['Renner'].dropna().unique()) if not df.empty else []
+        per_race = {}
+        for race in races:
+            stat = koers_map.get(race, "AVG")
+            top_50 = frozenset(_top_50(df, stat))
+            per_race[race] = {
+                'stat': stat,
+                'top_50': top_50,
+                'dark_horses': [r for r in alle_renners if r not in top_50],
+            }
+        index = {'alle_renners': alle_renners, 'alle_renners_set': frozenset(alle_renners), 'races': per_race, 'extras': {}, 'ev': {}}
+        _indexes.clear()
+        _indexes[key] = index
+        return index
+
+
+def race_info(index, race):
+    """Index entry for race; races outside the index fall back to AVG."""
+    info = index['races'].get(race)
+    if info is None:
+        info = {'stat': "AVG", 'top_50': frozenset(), 'dark_horses': list(index['alle_renners'])}
+    return info
+
+
+def beschikbare_extras(index, base_team):
+    """Riders that can be picked as extra (everyone outside the base team), memoised per base team."""
+    key = frozenset(base_team)
+    extras = index['extras'].get(key)
+    if extras is None:
+        extras = [r for r in index['alle_renners'] if r not in key]
+        if len(index['extras']) >= MAX_EXTRAS_CACHE:
+            index['extras'].clear()
+        index['extras'][key] = extras
+    return extras
+
+
+def build_ev(df, race_index, method=EV_METHODS[0]):
+    """
+    Riders x races EV matrices for race_index, cached on the index per method:
+    {'renners', 'row', 'races', 'points', 'dark_horse', 'rank', 'eligible'}.
+    Riders are ranked per race on the race stat (then AVG) among the starters
+    (column == 1). 'points' is the expected top-20 score, 'dark_horse' the
+    expected bonus as dark horse, 'eligible' marks riders outside the top 50.
+    """
+    ev = race_index['ev'].get(method)
+    if ev is not None:
+        return ev
+
+    renners = race_index['alle_renners']
+    races = list(race_index['races'])
+    data = df.dropna(subset=['Renner']).drop_duplicates(subset=['Renner']).set_index('Renner').reindex(renners)
+    n, n_races = len(renners), len(races)
+    pts_table = np.zeros(max(n, len(HET_SPEL_PTS)))
+    pts_table[:len(HET_SPEL_PTS)] = HET_SPEL_PTS
+    renner_arr = np.array(renners, dtype=object)
+
+    points = np.zeros((n, n_races))
+    dark_horse = np.zeros((n, n_races))
+    rank = np.full((n, n_races), np.inf)
+    eligible = np.zeros((n, n_races), dtype=bool)
+    avg = _numeric(data, 'AVG', n)
+    for k, race in enumerate(races):
+        info = race_index['races'][race]
+        stat = _numeric(data, info['stat'], n)
+        starts = data[race].to_numpy() == 1 if race in data.columns else np.ones(n, dtype=bool)
+        rows = np.flatnonzero(starts)
+        order = rows[np.lexsort((-avg[rows], -stat[rows]))]
+        rank[order, k] = np.arange(len(order))
+        eligible[:, k] = ~np.isin(renner_arr, list(info['top_50']))
+
+        if "Ranking" in method:
+            points[order, k] = pts_table[:len(order)]
+            dark_horse[order[:DARK_HORSE_TOP], k] = DARK_HORSE_BONUS
+        else:
+            curve = (stat[order] / 100) ** 4
+            points[order, k] = curve * HET_SPEL_PTS[0]
+            if len(order):
+                grens = curve[min(DARK_HORSE_TOP, len(order)) - 1]
+                kans = np.minimum(curve / grens, 1.0) if grens > 0 else (curve > 0).astype(float)
+                dark_horse[order, k] = kans * DARK_HORSE_BONUS
+
+    ev = {
+        'renners': renners, 'row': {r: i for i, r in enumerate(renners)}, 'races': races,
+        'points': points, 'dark_horse': dark_horse, 'rank': rank, 'eligible': eligible,
+    }
+    race_index['ev'][method] = ev
+    return ev
+
+
+def _numeric(data, col, n):
+    if col not in data.columns:
+        return np.zeros(n)
+    return np.nan_to_num(np.asarray(pd.to_numeric(data[col], errors='coerce'), dtype=float))
+
+
+def optimize_picks(ev, base_team, races=None):
+    """
+    Best extras, captain and dark horse for every race at once given the base
+    team. Returns {race: {'extras', 'kopman', 'dark_horse', 'ev'}} in the
+    game_picks format (plus the expected score).
+    """
+    races = ev['races'] if races is None else [r for r in races if r in ev['races']]
+    cols = np.array([ev['races'].index(r) for r in races], dtype=int)
+    points = ev['points'][:, cols]
+    n = points.shape[0]
+    renners = ev['renners']
+
+    base_rows = np.array(sorted({ev['row'][r] for r in base_team if r in ev['row']}), dtype=int)
+    is_base = np.zeros(n, dtype=bool)
+    is_base[base_rows] = True
+
+    # Extra's: de 3 beste renners buiten het basisteam, per koers (kolom)
+    kandidaat = np.where(is_base[:, None], -np.inf, points)
+    k = min(AANTAL_EXTRAS, n - len(base_rows))
+    if k > 0:
+        # Stabiele volgorde bij gelijke EV: hoogste EV eerst, dan rij
+        extras = np.argsort(-kandidaat, axis=0, kind='stable')[:k]
+    else:
+        extras = np.zeros((0, len(cols)), dtype=int)
+    extra_vals = np.take_along_axis(points, extras, axis=0)
+
+    # Kopman: beste actieve renner (basis + extra's)
+    actief = np.vstack([np.broadcast_to(base_rows[:, None], (len(base_rows), len(cols))), extras]).astype(int)
+    actief_vals = np.vstack([points[base_rows], extra_vals])
+    if len(actief):
+        kopman_pos = np.argmax(actief_vals, axis=0)
+        kopman = actief[kopman_pos, np.arange(len(cols))]
+        kopman_vals = actief_vals[kopman_pos, np.arange(len(cols))]
+    else:
+        kopman, kopman_vals = np.full(len(cols), -1), np.zeros(len(cols))
+
+    # Dark horse: buiten de top 50, hoogste verwachte bonus (bij gelijkheid beste voorspelde plaats)
+    dh_vals = ev['dark_horse'][:, cols]
+    dh_score = np.where(ev['eligible'][:, cols], dh_vals - 1e-9 * np.minimum(ev['rank'][:, cols], 1e6), -np.inf)
+    dark = np.argmax(dh_score, axis=0)
+    heeft_dark = np.isfinite(dh_score[dark, np.arange(len(cols))])
+    dark_vals = np.where(heeft_dark, dh_vals[dark, np.arange(len(cols))], 0.0)
+
+    totaal = actief_vals.sum(axis=0) + kopman_vals + dark_vals
+    picks = {}
+    for j, race in enumerate(races):
+        picks[race] = {
+            'extras': [renners[i] for i in extras[:, j]],
+            'kopman': renners[kopman[j]] if kopman[j] >= 0 else None,
+            'dark_horse': renners[dark[j]] if heeft_dark[j] else None,
+            'ev': float(totaal[j]),
+        }
+    return picks
+
+
+def parse_custom_team(custom_team, verify=None):
+    """
+    (base, picks) from a custom_team payload ({'data': {'base', 'picks'},
+    'signature'}), or None when it is missing or verify(data, signature)
+    rejects it.
+    """
+    if not isinstance(custom_team, dict) or not isinstance(custom_team.get('data'), dict):
+        return None
+    data = custom_team['data']
+    if verify is not None and not verify(data, custom_team.get('signature')):
+        return None
+    return list(data.get('base') or []), dict(data.get('picks') or {})
+
+
+def _selection_entries(teams, renners, races):
+    """
+    Sparse picks of all players: an (entries, 4) array of (player, race,
+    rider, weight) with weight 1 per active rider and 2 for the captain, and
+    an (entries, 3) array of (player, race, rider) for the dark horses.
+    Races and riders are positions in races and renners.
+    """
+    row = {r: i for i, r in enumerate(renners)}
+    rijen, aantal, kopman, dark = [], [], [], []
+    for base, picks in teams:
+        base_rows = list(dict.fromkeys(row[r] for r in base if r in row))
+        for race in races:
+            pick = picks.get(race) or {}
+            actief = base_rows + [i for i in dict.fromkeys(row[r] for r in pick.get('extras') or [] if r in row) if i not in base_rows]
+            rijen.extend(actief)
+            aantal.append(len(actief))
+            kopman.append(row.get(pick.get('kopman'), -1))
+            dark.append(row.get(pick.get('dark_horse'), -1))
+
+    # Cel = speler * aantal koersen + koers, in dezelfde volgorde als de lus
+    cel = np.repeat(np.arange(len(aantal)), aantal)
+    rijen = np.array(rijen, dtype=np.int32)
+    gewicht = 1 + (rijen == np.array(kopman, dtype=np.int32)[cel])
+    entries = np.column_stack([cel // len(races), cel % len(races), rijen, gewicht]).astype(np.int32)
+    dark = np.array(dark, dtype=np.int32)
+    heeft = np.flatnonzero(dark >= 0)
+    return entries, np.column_stack([heeft // len(races), heeft % len(races), dark[heeft]]).astype(np.int32)
+
+
+def _score_entries(entries, punten, kolom, n_spelers):
+    """Players x new-races score matrix: sum of weight * punten[rider, race] over the entries of those races."""
+    n_nieuw = punten.shape[1]
+    j = kolom[entries[:, 1]]
+    sel = j >= 0
+    spelers, j, rijen = entries[sel, 0], j[sel], entries[sel, 2]
+    gewicht = entries[sel, 3] if entries.shape[1] > 3 else 1
+    return np.bincount(spelers * n_nieuw + j, weights=gewicht * punten[rijen, j],
+                       minlength=n_spelers * n_nieuw).reshape(n_spelers, n_nieuw)
+
+
+def _uitslag_matcher(renners):
+    norm_to_renner = {}
+    for r in renners:
+        norm_to_renner.setdefault(normalize_name_logic(r), r)
+    index = build_name_index(list(norm_to_renner))
+    return lambda naam: norm_to_renner.get(match_name(index, normalize_name_logic(naam), UITSLAG_MATCH_THRESHOLD))
+
+
+def het_spel_standings(players, race_index, store=None, verify=None):
+    """
+    Standings of all players: one row per player with the points per raced
+    race, 'Totaal' and 'Positie'. players are rows with 'username' and
+    'custom_team'; players without a valid payload are left out.
+    """
+    store = load_results() if store is None else store
+    renners = race_index['alle_renners']
+    races = list(race_index['races'])
+
+    teams, namen = [], []
+    for speler in players:
+        team = parse_custom_team(speler.get('custom_team'), verify)
+        if team is not None:
+            teams.append(team)
+            namen.append(speler.get('username'))
+    key = hashlib.sha256(json.dumps([namen, teams, renners, races], sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    with _standings_lock:
+        state = _standings.get(key)
+        if state is None:
+            entries, dark = _selection_entries(teams, renners, races)
+            state = {'entries': entries, 'dark': dark, 'rows': {}, 'scores': {}, 'version': None, 'frame': None}
+            if len(_standings) >= MAX_STANDINGS_CACHE:
+                _standings.clear()
+            _standings[key] = state
+        if state['version'] == store.version and state['frame'] is not None:
+            return state['frame']
+
+        uitslag = store.matched(("het_spel", hash(tuple(renners))), _uitslag_matcher(renners))
+        uitslag = uitslag.assign(Race=uitslag['Race'].replace(SCORITO_NAAR_SPORZA))
+        uitslag = uitslag[uitslag['Race'].isin(races)]
+        per_race = uitslag.groupby('Race', sort=False).size()
+        nieuw = [r for r in races if r in per_race.index and state['rows'].get(r) != per_race[r]]
+
+        if nieuw:
+            row = {r: i for i, r in enumerate(renners)}
+            cols = {r: j for j, r in enumerate(nieuw)}
+            sub = uitslag[uitslag['Race'].isin(nieuw) & uitslag['Rnk'].str.isdigit()]
+            rank = np.full((len(renners), len(nieuw)), np.inf)
+            np.minimum.at(rank, (sub['Renner'].map(row).to_numpy(dtype=int), sub['Race'].map(cols).to_numpy(dtype=int)),
+                          sub['Rnk'].astype(int).to_numpy())
+
+            pts_table = np.zeros(len(HET_SPEL_PTS) + 2)
+            pts_table[1:len(HET_SPEL_PTS) + 1] = HET_SPEL_PTS
+            punten = pts_table[np.where(rank <= len(HET_SPEL_PTS), rank, 0).astype(int)]
+            eligible = np.column_stack([~np.isin(np.array(renners, dtype=object), list(race_index['races'][r]['top_50'])) for r in nieuw])
+            bonus = np.where((rank <= DARK_HORSE_TOP) & eligible, DARK_HORSE_BONUS, 0)
+
+            # Positie van elke koers binnen nieuw (-1 voor koersen zonder nieuwe uitslag)
+            kolom = np.full(len(races), -1)
+            kolom[[races.index(r) for r in nieuw]] = np.arange(len(nieuw))
+            scores = (_score_entries(state['entries'], punten, kolom, len(teams))
+                      + _score_entries(state['dark'], bonus, kolom, len(teams)))
+            for j, race in enumerate(nieuw):
+                state['scores'][race] = scores[:, j]
+                state['rows'][race] = per_race[race]
+
+        gereden = [r for r in races if r in state['scores']]
+        frame = pd.DataFrame({r: state['scores'][r] for r in gereden}, index=pd.Index(namen, name='Speler'))
+        frame = frame.astype(int)
+        frame['Totaal'] = frame.sum(axis=1)
+        frame = frame.sort_values('Totaal', ascending=False, kind='stable').reset_index()
+        frame.insert(0, 'Positie', np.arange(1, len(frame) + 1))
+        state['frame'] = frame
+        state['version'] = store.version
+        return frame
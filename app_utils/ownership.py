@@ -0,0 +1,109 @@
+"""
+ownership.py
+------------
+Who is in the team at which race, for a start team plus a transfer plan.
+
+OwnershipTimeline replays the plan once. Every transfer is a step; the team
+after each step is one row of a bool (steps, riders) array and its cost is a
+prefix sum over the price changes of the steps. A transfer "after race X"
+takes effect from the race after X, so the team in race k is the team after
+all transfers whose moment lies before k. Those step numbers are stored per
+race, which makes every question of the pages and validators ("who rides race
+X", "who is in the team after X", "what does the team cost after transfer i",
+"how much budget is left") a lookup instead of a list remove/append replay.
+
+Steps follow the plan sorted (stable) by moment; transfers with a moment that
+is not in races come last and never take effect in a race. Riders without a
+price count as 0.
+"""
+
+import numpy as np
+
+
+class OwnershipTimeline:
+    """
+    Ownership of base_team + plan over races. prijzen maps rider -> price
+    (dict or Series), budget is a fixed budget or a function of the number of
+    transfers made (e.g. the Sporza penalties).
+    """
+
+    def __init__(self, base_team, plan, races, prijzen=None, budget=None):
+        self.races = list(races)
+        self.race_pos = {r: k for k, r in enumerate(self.races)}
+        n_races = len(self.races)
+        volgorde = sorted(range(len(plan)), key=lambda i: self.race_pos.get(plan[i]['moment'], n_races))
+        self.transfers = [plan[i] for i in volgorde]
+
+        self.renners = []
+        self.index = {}
+        for r in list(base_team) + [naam for t in self.transfers for naam in (t['uit'], t['in'])]:
+            if r not in self.index:
+                self.index[r] = len(self.renners)
+                self.renners.append(r)
+
+        stappen = np.zeros((len(self.transfers) + 1, len(self.renners)), dtype=bool)
+        stappen[0, [self.index[r] for r in base_team]] = True
+        for s, t in enumerate(self.transfers, start=1):
+            stappen[s] = stappen[s - 1]
+            stappen[s, self.index[t['uit']]] = False
+            stappen[s, self.index[t['in']]] = True
+        self.stappen = stappen
+
+        prijzen = {} if prijzen is None else prijzen
+        self.prijzen = prijzen
+        prijs = np.array([prijzen.get(r, 0) for r in self.renners])
+        self.prijs = prijs.astype(np.int64 if prijs.dtype.kind in 'biu' else float)
+        delta = (stappen[1:].astype(int) - stappen[:-1].astype(int)) @ self.prijs
+        self.kosten_stap = np.concatenate([[stappen[0] @ self.prijs], delta]).cumsum()
+
+        aantal = len(self.transfers)
+        if callable(budget):
+            self.budget_stap = np.array([budget(s) for s in range(aantal + 1)])
+        else:
+            self.budget_stap = np.full(aantal + 1, np.inf if budget is None else budget)
+
+        momenten = np.array([self.race_pos.get(t['moment'], n_races) for t in self.transfers], dtype=int)
+        # Stap waarmee race k gereden wordt, en de stap na het wisselmoment ná race k
+        self.stap_in_race = np.searchsorted(momenten, np.arange(n_races), side='left')
+        self.stap_na_race = np.searchsorted(momenten, np.arange(n_races), side='right')
+        self.owned = stappen[self.stap_in_race].T
+        self.kosten = self.kosten_stap[self.stap_in_race]
+        self.budget = self.budget_stap[self.stap_in_race]
+
+    def _namen(self, rij):
+        return [self.renners[i] for i in np.flatnonzero(rij)]
+
+    def team_in(self, race):
+        """Riders that ride race for the team."""
+        return self._namen(self.stappen[self.stap_in_race[self.race_pos[race]]])
+
+    def team_na(self, race):
+        """Team after the transfers made after race (the team that can be changed at that moment)."""
+        return self._namen(self.stappen[self.stap_na_race[self.race_pos[race]]])
+
+    def kosten_na(self, race):
+        return self.kosten_stap[self.stap_na_race[self.race_pos[race]]]
+
+    def team_na_wissel(self, i):
+        """Team after the first i + 1 transfers."""
+        return self._namen(self.stappen[i + 1])
+
+    def kosten_na_wissel(self, i):
+        return self.kosten_stap[i + 1]
+
+    def speling_na_wissel(self, i):
+        """Budget left after transfer i, against the budget that applies with i + 1 transfers."""
+        return self.budget_stap[i + 1] - self.kosten_stap[i + 1]
+
+    def rijdt(self, renner, race):
+        i = self.index.get(renner)
+        return i is not None and bool(self.owned[i, self.race_pos[race]])
+
+    def owned_rows(self, renners):
+        """Bool (len(renners), races) array; riders outside the plan never ride."""
+        rijen = np.zeros((len(renners), len(self.races)), dtype=bool)
+        for j, r in enumerate(renners):
+            i = self.index.get(r)
+            if i is not None:
+                rijen[j] = self.owned[i]
+        return rijen
@@ -0,0 +1,327 @@
+"""
+parameter_sweep.py
+------------------
+Sensitivity analysis for the Klassiekers solvers (Scorito and Sporza).
+
+Runs the existing EV + solver pipeline for every combination in a parameter
+grid (min_bud, max_bud, max_ren, EV method, transfer moments) in a process
+pool. Every scenario result is cached in memory and on disk under
+.cache/sweep/, keyed by the game, the parameters and a fingerprint of the
+input data, so repeated sweeps only solve what is new.
+
+HEADLESS
+--------
+    python -m app_utils.parameter_sweep --game scorito --min-bud 42000000 43000000 --max-ren 19 20
+    python -m app_utils.parameter_sweep --game sporza --ev-method 1 2 --t-moments - RVV PR,RVV
+
+On the page the same generator (run_sweep) feeds the "🧪 Gevoeligheid" tab,
+which redraws its table every time a worker finishes. The page passes its
+own constraints (skipped races, forced, banned and excluded riders) so
+every scenario is one the user can actually pick.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from app_utils import scorito_klassiekers, sporza_klassiekers
+
+CACHE_DIR = os.path.join(".cache", "sweep")
+GAMES = ("scorito", "sporza")
+
+DEFAULT_GRIDS = {
+    "scorito": {
+        "min_bud": [43000000],
+        "max_bud": [45000000],
+        "max_ren": [20],
+        "ev_method": [scorito_klassiekers.EV_METHODS[0]],
+        "t_moments": [["PR", "PR", "PR"]],
+    },
+    "sporza": {
+        "ev_method": [sporza_klassiekers.EV_METHODS[0]],
+        "t_moments": [[]],
+    },
+}
+
+CONSTRAINT_KEYS = ("skip_races", "force_base", "ban_base", "exclude_list")
+
+_memory_cache = {}
+_worker_data = {}
+
+# ---------------------------------------------------------------------------
+# Grid & cache helpers
+# ---------------------------------------------------------------------------
+
+def build_grid(game, grid=None):
+    """
+    Expands a {param: [values]} dict into a list of scenario dicts.
+    Parameters that are not given fall back to the page defaults of `game`.
+    """
+    full = dict(DEFAULT_GRIDS[game])
+    full.update({k: v for k, v in (grid or {}).items() if v})
+    keys = list(full.keys())
+    scenarios = []
+    for combo in itertools.product(*[full[k] for k in keys]):
+        params = dict(zip(keys, combo))
+        params["t_moments"] = list(params.get("t_moments") or [])
+        scenarios.append(params)
+    return scenarios
+
+
+def data_fingerprint(df_raw):
+    """Stable hash of the merged input data; part of every cache key."""
+    hashed = pd.util.hash_pandas_object(df_raw, index=True).values
+    return hashlib.sha256(hashed.tobytes()).hexdigest()[:16]
+
+
+def normalise_constraints(constraints=None):
+    """{key: sorted list} for every CONSTRAINT_KEYS entry; missing keys become empty lists."""
+    constraints = constraints or {}
+    return {k: sorted(constraints.get(k) or []) for k in CONSTRAINT_KEYS}
+
+
+def _cache_key(game, params, fingerprint, constraints=None):
+    payload = json.dumps({"game": game, "params": params, "data": fingerprint, "constraints": constraints}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_cached(key):
+    if key in _memory_cache:
+        return _memory_cache[key]
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            _memory_cache[key] = result
+            return result
+        except (OSError, ValueError):
+            return None
+    return None
+
+
+def _store_cached(key, result):
+    _memory_cache[key] = result
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(os.path.join(CACHE_DIR, f"{key}.json"), "w", encoding="utf-8") as f:
+            json.dump(result, f)
+    except OSError:
+        pass
+
+# ---------------------------------------------------------------------------
+# Scenario solving
+# ---------------------------------------------------------------------------
+
+def _sporza_plan_ev(df, base_team, plan, available_races):
+    """Sum of the best 12 starters per race, mirroring the Sporza solver objective."""
+    ev_lookup = df.set_index("Renner")
+    totaal = 0.0
+    for idx_r, race in enumerate(available_races):
+        active = set(base_team)
+        for t in plan:
+            if available_races.index(t["moment"]) < idx_r:
+                active.discard(t["uit"])
+                active.add(t["in"])
+        starters = ev_lookup.loc[[r for r in active if r in ev_lookup.index]]
+        starters = starters[starters[race] == 1]
+        totaal += starters[f"EV_{race}"].nlargest(12).sum()
+    return totaal
+
+
+def _race_order(available_races):
+    # Onbekende momenten (bv. 'GEEN') achteraan, zoals op de pagina's
+    return lambda x: available_races.index(x) if x in available_races else len(available_races)
+
+
+def solve_scenario(game, df_raw, available_races, koers_stat_map, params, constraints=None):
+    """
+    Runs the EV calculation and solver of `game` for one parameter set, with
+    the page constraints (see normalise_constraints). Returns a
+    JSON-serialisable dict with status, objective, team and plan.
+    """
+    result = {"game": game, "params": params, "status": "Infeasible", "objective": 0.0, "team": [], "plan": []}
+    c = normalise_constraints(constraints)
+
+    if game == "scorito":
+        df = scorito_klassiekers.calculate_dynamic_ev(df_raw, available_races, koers_stat_map, params["ev_method"], c["skip_races"])
+        base = scorito_klassiekers.solve_knapsack_dynamic(
+            df, params["max_bud"], params["min_bud"], params["max_ren"], c["force_base"], c["ban_base"], c["exclude_list"]
+        )
+        if not base:
+            return result
+        plan = []
+        t_moments = list(params["t_moments"])
+        if t_moments:
+            t_moments = (t_moments + ["GEEN"] * 3)[:3]
+            t_moments = sorted(t_moments, key=_race_order(available_races))
+            new_base, new_plan = scorito_klassiekers.rebuild_team_and_transfers(
+                df, available_races, params["max_bud"], params["min_bud"], params["max_ren"], base, t_moments, True
+            )
+            if new_base:
+                base, plan = new_base, new_plan
+        objective = scorito_klassiekers.evaluate_plan_ev(df, base, plan, available_races)
+    elif game == "sporza":
+        df = sporza_klassiekers.calculate_sporza_ev(df_raw, available_races, koers_stat_map, params["ev_method"])
+        t_moments = sorted(params["t_moments"], key=_race_order(available_races))
+        base, plan = sporza_klassiekers.solve_sporza_dynamic(df, available_races, t_moments, c["force_base"], c["ban_base"], c["exclude_list"])
+        if not base:
+            return result
+        objective = _sporza_plan_ev(df, base, plan, available_races)
+    else:
+        raise ValueError(f"Onbekend spel: {game}")
+
+    result.update({"status": "Optimal", "objective": round(float(objective), 1), "team": sorted(base), "plan": plan})
+    return result
+
+
+def _init_worker(game, df_raw, available_races, koers_stat_map, constraints):
+    _worker_data.update({"game": game, "df_raw": df_raw, "races": available_races, "koers_map": koers_stat_map, "constraints": constraints})
+
+
+def _solve_in_worker(params):
+    d = _worker_data
+    return solve_scenario(d["game"], d["df_raw"], d["races"], d["koers_map"], params, d["constraints"])
+
+
+def run_sweep(game, df_raw, available_races, koers_stat_map, scenarios, max_workers=None, use_cache=True, constraints=None):
+    """
+    Generator that yields one result dict per scenario as soon as it is known.
+    Cached scenarios are yielded first; the rest are solved in a process pool
+    and yielded in completion order. Every result carries a 'cached' flag.
+    constraints applies to every scenario (see normalise_constraints).
+    """
+    fingerprint = data_fingerprint(df_raw)
+    constraints = normalise_constraints(constraints)
+    todo = []
+    for params in scenarios:
+        key = _cache_key(game, params, fingerprint, constraints)
+        cached = _load_cached(key) if use_cache else None
+        if cached is not None:
+            yield dict(cached, cached=True)
+        else:
+            todo.append((key, params))
+
+    if not todo:
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(game, df_raw, available_races, koers_stat_map, constraints),
+    ) as pool:
+        futures = {pool.submit(_solve_in_worker, params): key for key, params in todo}
+        for fut in as_completed(futures):
+            result = fut.result()
+            _store_cached(futures[fut], result)
+            yield dict(result, cached=False)
+
+# ---------------------------------------------------------------------------
+# Summaries
+# ---------------------------------------------------------------------------
+
+def summarize_sweep(results):
+    """Objective vs. parameter table, best scenario first."""
+    rows = []
+    for res in results:
+        row = {k: (" / ".join(v) if isinstance(v, list) else v) for k, v in res["params"].items()}
+        row["Status"] = res["status"]
+        row["Objective"] = res["objective"]
+        row["Transfers"] = len(res["plan"])
+        rows.append(row)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values(by="Objective", ascending=False).reset_index(drop=True)
+
+
+def inclusion_frequencies(results):
+    """Share of feasible scenarios in which each rider is owned at some point."""
+    feasible = [r for r in results if r["status"] == "Optimal"]
+    if not feasible:
+        return pd.DataFrame(columns=["Renner", "Aantal", "Frequentie"])
+    counts = {}
+    for res in feasible:
+        for renner in set(res["team"]) | {t["in"] for t in res["plan"]}:
+            counts[renner] = counts.get(renner, 0) + 1
+    df_freq = pd.DataFrame({"Renner": list(counts.keys()), "Aantal": list(counts.values())})
+    df_freq["Frequentie"] = (df_freq["Aantal"] / len(feasible)).round(3)
+    return df_freq.sort_values(by=["Aantal", "Renner"], ascending=[False, True]).reset_index(drop=True)
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def load_game_data(game):
+    """Loads the merged data of `game` exactly like the Klassiekers pages do."""
+    if game == "scorito":
+        m = scorito_klassiekers
+        return m.load_and_merge_data(
+            m.get_file_mod_time("data/sporza_prijzen_startlijst.csv"),
+            m.get_file_mod_time("data/bron_startlijsten.csv"),
+            m.get_file_mod_time("data/renners_stats.csv"),
+        )
+    m = sporza_klassiekers
+    return m.load_and_merge_data(
+        m.get_file_mod_time("data/sporza_prijzen_startlijst.csv"),
+        m.get_file_mod_time("data/renners_stats.csv"),
+    )
+
+
+def _parse_ev_methods(game, values):
+    methods = scorito_klassiekers.EV_METHODS if game == "scorito" else sporza_klassiekers.EV_METHODS
+    parsed = []
+    for v in values or []:
+        match = [m for m in methods if m.startswith(f"{v}.") or m == v]
+        if not match:
+            raise SystemExit(f"Onbekend rekenmodel '{v}'. Kies uit: {methods}")
+        parsed.append(match[0])
+    return parsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parameter sweep voor de Klassiekers solvers.")
+    parser.add_argument("--game", choices=GAMES, default="scorito")
+    parser.add_argument("--min-bud", type=int, nargs="+", help="Scorito: minimaal budget (meerdere waarden mogelijk).")
+    parser.add_argument("--max-bud", type=int, nargs="+", help="Scorito: maximaal budget.")
+    parser.add_argument("--max-ren", type=int, nargs="+", help="Scorito: aantal renners.")
+    parser.add_argument("--ev-method", nargs="+", help="Rekenmodel: nummer (1, 2, ...) of volledige naam.")
+    parser.add_argument("--t-moments", nargs="+", help="Wisselmomenten per scenario, komma-gescheiden (bv. PR,PR,RVV). Gebruik '-' voor geen wissels.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--top", type=int, default=25, help="Aantal renners in de frequentietabel.")
+    parser.add_argument("--out", help="Schrijf de resultatentabel naar dit CSV-bestand.")
+    args = parser.parse_args(argv)
+
+    grid = {
+        "ev_method": _parse_ev_methods(args.game, args.ev_method),
+        "t_moments": [[] if t == "-" else [m.strip().upper() for m in t.split(",") if m.strip()] for t in (args.t_moments or [])],
+    }
+    if args.game == "scorito":
+        grid.update({"min_bud": args.min_bud, "max_bud": args.max_bud, "max_ren": args.max_ren})
+
+    df_raw, available_races, koers_stat_map = load_game_data(args.game)
+    if df_raw.empty:
+        raise SystemExit("Data is leeg of kon niet worden geladen.")
+
+    scenarios = build_grid(args.game, grid)
+    print(f"{len(scenarios)} scenario's voor {args.game}...")
+    results = []
+    for res in run_sweep(args.game, df_raw, available_races, koers_stat_map, scenarios, args.workers, not args.no_cache):
+        results.append(res)
+        bron = "cache" if res["cached"] else "solver"
+        print(f"[{len(results)}/{len(scenarios)}] {res['status']:<10} {res['objective']:>10.1f}  ({bron})  {res['params']}")
+
+    summary = summarize_sweep(results)
+    print("\n" + summary.to_string(index=False))
+    print("\n" + inclusion_frequencies(results).head(args.top).to_string(index=False))
+    if args.out:
+        summary.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+race_status.py
+--------------
+Rider x race status matrix for the "Startlijst & Uitslagen" tabs.
+
+active_roster() combines the startlist participation of the displayed riders
+with the races they ride for the team (app_utils.ownership). race_status_matrix() joins the results through
+one (rider, race) -> rank pivot and computes every cell's status code with a
+single np.select, with the same codes as get_numeric_status on the pages:
+
+    rank    finished at that rank (raced)
+    996     DNF / not classified, or on the list without a result (raced)
+    997     on the list and starter (not raced yet)
+    998     on the list, not a starter (not raced yet)
+    999     not on the list
+"""
+
+import numpy as np
+import pandas as pd
+
+STATUS_DNF = 996
+STATUS_STARTER = 997
+STATUS_OP_LIJST = 998
+STATUS_GEEN = 999
+GEEN_RANK = ('nan', 'None', 'DNS', '')
+
+
+def rol_en_moment(renners, transfer_plan):
+    """Role of each rider: 'Verkocht na X' / 'Gekocht na X' for the first transfer naming them, else 'Basis (Blijft)'."""
+    rollen = {}
+    for t in transfer_plan:
+        rollen.setdefault(t['uit'], f"Verkocht na {t['moment']}")
+        rollen.setdefault(t['in'], f"Gekocht na {t['moment']}")
+    return [rollen.get(r, 'Basis (Blijft)') for r in renners]
+
+
+def active_roster(matrix_df, races, timeline):
+    """
+    Bool DataFrame (index and races of matrix_df): on the startlist (== 1) and
+    riding the race for the team according to the OwnershipTimeline.
+    """
+    mask = (matrix_df[races].to_numpy() == 1) & timeline.owned_rows(matrix_df.index)
+    return pd.DataFrame(mask, index=matrix_df.index, columns=list(races))
+
+
+def rank_pivot(df_uitslagen, renners, races):
+    """riders x races DataFrame of rank strings (None where there is no result); the first row per (race, rider) wins."""
+    if df_uitslagen is None or df_uitslagen.empty:
+        return pd.DataFrame(None, index=pd.Index(renners), columns=list(races), dtype=object)
+    df_u = df_uitslagen[df_uitslagen['Race'].isin(races) & df_uitslagen['Renner'].isin(renners)]
+    df_u = df_u.drop_duplicates(subset=['Race', 'Renner'], keep='first')
+    pivot = df_u.pivot(index='Renner', columns='Race', values='Rnk')
+    return pivot.reindex(index=pd.Index(renners), columns=list(races)).astype(object)
+
+
+def race_status_matrix(on_list, df_uitslagen=None, starters=None):
+    """
+    Int DataFrame (index and columns of on_list) with the status code per
+    rider and race. on_list is a bool riders x races frame, starters an
+    optional bool frame of the same shape (default: everybody on the list
+    starts). Races with at least one result in df_uitslagen count as raced.
+    """
+    races = list(on_list.columns)
+    op_lijst = on_list.to_numpy(dtype=bool)
+    starter = op_lijst if starters is None else starters.reindex(index=on_list.index, columns=races, fill_value=False).to_numpy(dtype=bool)
+
+    verreden = np.zeros(len(races), dtype=bool)
+    if df_uitslagen is not None and not df_uitslagen.empty:
+        verreden = np.isin(np.array(races, dtype=object), df_uitslagen['Race'].unique())
+    verreden = np.broadcast_to(verreden, op_lijst.shape)
+
+    ranks = pd.Series(rank_pivot(df_uitslagen, on_list.index, races).to_numpy().ravel(), dtype=object)
+    rank_str = ranks.astype(str)
+    heeft_rank = (ranks.notna() & ~rank_str.isin(GEEN_RANK)).to_numpy().reshape(op_lijst.shape)
+    is_getal = heeft_rank & rank_str.str.isdigit().to_numpy().reshape(op_lijst.shape)
+    rank = pd.to_numeric(rank_str.where(is_getal.ravel()), errors='coerce').fillna(0).to_numpy().astype(int).reshape(op_lijst.shape)
+
+    codes = np.select(
+        [verreden & is_getal,
+         verreden & heeft_rank,
+         verreden & op_lijst,
+         verreden,
+         op_lijst & starter,
+         op_lijst],
+        [rank, STATUS_DNF, STATUS_DNF, STATUS_GEEN, STATUS_STARTER, STATUS_OP_LIJST],
+        default=STATUS_GEEN,
+    )
+    return pd.DataFrame(codes, index=on_list.index, columns=races)
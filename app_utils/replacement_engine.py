@@ -0,0 +1,130 @@
+"""
+replacement_engine.py
+---------------------
+Fast emergency-replacement search (noodwissel) for the Scorito Klassiekers.
+
+The remaining EV of every rider after every race boundary comes straight from
+the suffix sums of the EV matrix (app_utils.ev_matrix). All budget checks
+of the old PuLP model (team cost now and after every future planned transfer,
+read from the OwnershipTimeline) collapse into one slack value, so the
+question becomes "best k candidates with total price <= slack".
+
+For k <= 3 the candidates are first reduced to those that are not dominated
+(cheaper *and* better) by k others, after which all combinations are scored
+with numpy. Only larger k, or an unusually large reduced set, falls back to
+a small ILP.
+"""
+
+import itertools
+import math
+
+import numpy as np
+import pulp
+
+from app_utils.ev_matrix import build_ev_matrix
+from app_utils.ownership import OwnershipTimeline
+
+MAX_ENUM_K = 3
+MAX_ENUM_COMBOS = 2_000_000
+
+
+def budget_slack(prices, index, base_team, transfer_plan, injured_riders, last_race, max_budget, available_races):
+    """
+    Budget left for the replacements: max_budget minus the most expensive team
+    state from last_race onwards (injured riders removed, later transfers applied).
+    """
+    namen = set(base_team) | {naam for t in transfer_plan for naam in (t['uit'], t['in'])}
+    timeline = OwnershipTimeline(base_team, transfer_plan, available_races,
+                                 {r: prices[index[r]] for r in namen if r in index})
+    na_race = timeline.stap_na_race[available_races.index(last_race):]
+    start = na_race[0]
+    # Geblesseerden tellen niet meer mee, tenzij een latere transfer ze terugkoopt
+    teruggekocht = np.zeros_like(timeline.stappen[start:])
+    for s, t in enumerate(timeline.transfers[start:], start=1):
+        teruggekocht[s, timeline.index[t['in']]] = True
+    meetellen = np.logical_or.accumulate(teruggekocht, axis=0)
+    meetellen |= ~np.isin(np.array(timeline.renners, dtype=object), list(injured_riders))
+    staten = (timeline.stappen[start:] & meetellen)[na_race - start]
+    return max_budget - (staten @ timeline.prijs).max()
+
+
+def _undominated(values, prices, k):
+    """Indices of candidates dominated (price <= and value >=) by fewer than k others."""
+    order = np.lexsort((-values, prices))
+    keep = []
+    best = []
+    for i in order:
+        if len(best) < k or values[i] > best[0]:
+            keep.append(i)
+        best = sorted(best + [values[i]])[-k:]
+    return np.array(keep, dtype=int)
+
+
+def _best_by_enumeration(values, prices, k, budget):
+    keep = _undominated(values, prices, k)
+    if math.comb(len(keep), k) > MAX_ENUM_COMBOS:
+        return None
+    combos = np.array(list(itertools.combinations(keep, k)), dtype=int).reshape(-1, k)
+    totaal_prijs = prices[combos].sum(axis=1)
+    totaal_ev = values[combos].sum(axis=1)
+    ok = totaal_prijs <= budget
+    if not ok.any():
+        return []
+    totaal_ev = np.where(ok, totaal_ev, -np.inf)
+    best = np.flatnonzero(totaal_ev == totaal_ev.max())
+    best = best[np.argmin(totaal_prijs[best])]
+    return list(combos[best])
+
+
+def _best_by_ilp(values, prices, k, budget):
+    prob = pulp.LpProblem("Noodwissel", pulp.LpMaximize)
+    kandidaten = range(len(values))
+    x = pulp.LpVariable.dicts("C", kandidaten, cat='Binary')
+    prob += pulp.lpSum([values[i] * x[i] for i in kandidaten])
+    prob += pulp.lpSum([x[i] for i in kandidaten]) == k
+    prob += pulp.lpSum([prices[i] * x[i] for i in kandidaten]) <= budget
+    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=10))
+    if pulp.LpStatus[prob.status] == 'Optimal':
+        return [i for i in kandidaten if x[i].varValue > 0.5]
+    return []
+
+
+def best_replacements(values, prices, k, budget):
+    """
+    Positions of the k candidates with the highest total value whose total
+    price fits in budget ([] when impossible).
+    """
+    values = np.asarray(values, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    if k <= 0 or len(values) < k:
+        return []
+    if k <= MAX_ENUM_K:
+        res = _best_by_enumeration(values, prices, k, budget)
+        if res is not None:
+            return res
+    return _best_by_ilp(values, prices, k, budget)
+
+
+def find_replacements(df_eval, base_team, transfer_plan, injured_riders, last_race, max_budget, available_races, ev_matrix=None):
+    """
+    Best replacements for injured_riders from the race after last_race on.
+    Riders that are or will be in the team (base or planned transfer) are
+    never proposed. Returns a list of rider names.
+    """
+    if ev_matrix is None:
+        ev_matrix = build_ev_matrix(df_eval, available_races)
+    index = ev_matrix['index']
+    prices = df_eval['Prijs'].to_numpy(dtype=float)
+    namen = df_eval['Renner'].to_numpy()
+
+    historisch = set(base_team) | {t['in'] for t in transfer_plan}
+    kandidaten = np.array([i for i, r in enumerate(namen) if r not in historisch and index.get(r) == i], dtype=int)
+    if len(kandidaten) == 0:
+        return []
+
+    boundary = available_races.index(last_race) + 1
+    remaining = ev_matrix['suffix'][kandidaten, boundary]
+    slack = budget_slack(prices, index, base_team, transfer_plan, injured_riders, last_race, max_budget, available_races)
+
+    gekozen = best_replacements(remaining, prices[kandidaten], len(injured_riders), slack)
+    return [namen[kandidaten[i]] for i in gekozen]
@@ -0,0 +1,191 @@
+"""
+results_store.py
+----------------
+Incremental, shared loader for data/uitslagen.csv.
+
+The results file only grows during the spring: new race blocks are appended
+at the bottom. ResultsStore remembers how far it has read and on refresh()
+only parses the new bytes into append-only per-race partitions, plus an index
+of raced races in order of appearance. Rows are parsed with csv.reader, so
+quoted fields may contain the separator, and only complete lines are
+consumed: a trailing line without a newline (a write in progress) is left for
+the next refresh. If the already-read part of the file changes (file
+replaced or edited), it starts over.
+
+Name matching is memoised per matcher key: matched() only runs the matcher
+on rows that were not matched before, so a newly ingested race costs one
+pass over that race's rows and earlier races are never processed again.
+
+All pages share one store per path via load_results().
+"""
+
+import csv
+import io
+import os
+import threading
+
+import pandas as pd
+
+UITSLAGEN_PATH = "data/uitslagen.csv"
+SKIP_RANKS = ('DNS', 'NAN', '')
+_ANCHOR = 256
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class ResultsStore:
+    def __init__(self, path=UITSLAGEN_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._stat = None
+        self._offset = 0
+        self._head = b""
+        self._tail = b""
+        self._sep = "\t"
+        self._header = None
+        self.columns = []
+        self._partitions = {}
+        self._index = []
+        self._frame = None
+        self._matched = {}
+        self.version = 0
+
+    # --- ingest ---
+    def refresh(self):
+        """Reads whatever was appended since the last call. Returns the races that received new rows."""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                if self._index or self._stat is not None:
+                    self._reset()
+                return []
+            key = (stat.st_mtime_ns, stat.st_size)
+            if key == self._stat:
+                return []
+
+            with open(self.path, "rb") as f:
+                if self._offset and not self._still_valid(f, stat.st_size):
+                    self._reset()
+                f.seek(self._offset)
+                data = f.read()
+            # Alleen volledige regels; een half geschreven laatste regel komt bij de volgende refresh
+            data = data[:data.rfind(b"\n") + 1]
+
+            if not self._offset:
+                self._head = data[:_ANCHOR]
+            self._offset += len(data)
+            if data:
+                consumed = self._tail + data
+                self._tail = consumed[-_ANCHOR:]
+            self._stat = key
+            return self._ingest(data.decode("utf-8", errors="replace"))
+
+    def _still_valid(self, f, size):
+        if size < self._offset:
+            return False
+        head = f.read(len(self._head))
+        f.seek(self._offset - len(self._tail))
+        return head == self._head and f.read(len(self._tail)) == self._tail
+
+    def _read_header(self, text):
+        """Takes the header off text (sets separator and columns); returns the rest."""
+        lines = text.splitlines(keepends=True)
+        for i, line in enumerate(lines):
+            if line.strip():
+                self._sep = "\t" if "\t" in line else (";" if ";" in line else ",")
+                self._header = [c.strip() for c in next(csv.reader([line.strip()], delimiter=self._sep))]
+                self.columns = [c.title() for c in self._header]
+                return "".join(lines[i + 1:])
+        return ""
+
+    def _ingest(self, text):
+        nieuw = []
+        if self._header is None:
+            text = self._read_header(text)
+        for values in csv.reader(io.StringIO(text), delimiter=self._sep):
+            if not any(v.strip() for v in values):
+                continue
+            if [v.strip() for v in values] == self._header:
+                continue
+            row = dict(zip(self.columns, values + [""] * (len(self.columns) - len(values))))
+            race = str(row.get("Race", "")).strip().upper()
+            if not race:
+                continue
+            row["Race"] = race
+            if race not in self._partitions:
+                self._partitions[race] = []
+                self._index.append(race)
+            self._partitions[race].append(row)
+            if race not in nieuw:
+                nieuw.append(race)
+        if nieuw:
+            self._frame = None
+            self.version += 1
+        return nieuw
+
+    # --- views ---
+    def races(self):
+        """Raced races (raw codes from the file) in order of appearance."""
+        return list(self._index)
+
+    def race_rows(self, race):
+        return list(self._partitions.get(race, []))
+
+    def frame(self):
+        """All rows as one DataFrame (columns as in the file header, title-cased)."""
+        with self._lock:
+            if self._frame is None:
+                rows = [row for race in self._index for row in self._partitions[race]]
+                self._frame = pd.DataFrame(rows, columns=self.columns or None)
+            return self._frame
+
+    def matched(self, key, match_fn):
+        """
+        DataFrame with Race, Rnk and Renner for every finished row (DNS and
+        empty ranks skipped). match_fn maps a raw rider name to a rider name or
+        None (row dropped); it is only called for rows and names not seen
+        before under this key.
+        """
+        with self._lock:
+            state = self._matched.get(key)
+            if state is None:
+                state = {"names": {}, "done": {}, "rows": [], "version": -1, "frame": None}
+                self._matched[key] = state
+            if state["version"] == self.version:
+                return state["frame"]
+
+            names = state["names"]
+            for race in self._index:
+                rows = self._partitions[race]
+                start = state["done"].get(race, 0)
+                for row in rows[start:]:
+                    rank_str = str(row.get("Rnk", "")).strip().upper()
+                    if rank_str in SKIP_RANKS:
+                        continue
+                    rider_name = str(row.get("Rider", "")).strip()
+                    if rider_name not in names:
+                        names[rider_name] = match_fn(rider_name)
+                    if names[rider_name] is None:
+                        continue
+                    state["rows"].append({"Race": race, "Rnk": rank_str, "Renner": names[rider_name]})
+                state["done"][race] = len(rows)
+
+            state["frame"] = pd.DataFrame(state["rows"], columns=["Race", "Rnk", "Renner"])
+            state["version"] = self.version
+            return state["frame"]
+
+
+def load_results(path=UITSLAGEN_PATH):
+    """Shared, refreshed ResultsStore for path (one per process)."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = ResultsStore(path)
+            _stores[path] = store
+    store.refresh()
+    return store
@@ -0,0 +1,63 @@
+"""
+rider_types.py
+--------------
+Vectorized rider classifications.
+
+klassieker_types() and giro_rollen() give the same labels as the row-wise
+bepaal_klassieker_type (Klassiekers) and bepaal_rol (Giro), but classify a
+whole frame at once with boolean masks and np.select instead of one Python
+call per rider.
+"""
+
+import numpy as np
+import pandas as pd
+
+ELITE = 85
+# Volgorde bepaalt wie wint bij een gelijke hoogste stat (zoals max() over de dict)
+PROFIEL_STATS = [('Kassei', 'COB'), ('Heuvel', 'HLL'), ('Sprint', 'SPR'),
+                 ('Klimmer', 'MTN'), ('Tijdrit', 'ITT'), ('Klassement', 'GC')]
+
+
+def _stat(df, col):
+    """col as truncated floats (int() semantics); missing column -> 0, non-numeric -> NaN."""
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return np.trunc(pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float))
+
+
+def klassieker_types(df):
+    """
+    Series (indexed like df) with the classics profile per rider: the elite
+    specialities (>= 85 on COB/HLL/SPR), 'Allround / Multispecialist' for all
+    three, otherwise the best of the six profile stats. 'Onbekend' for riders
+    without stats or with non-numeric stats.
+    """
+    stats = np.column_stack([_stat(df, col) for _, col in PROFIEL_STATS]) if len(df) else np.zeros((0, len(PROFIEL_STATS)))
+    kassei, heuvel, sprint = (stats[:, i] >= ELITE for i in range(3))
+    beste = np.array([label for label, _ in PROFIEL_STATS], dtype=object)[np.argmax(np.nan_to_num(stats, nan=-1), axis=1)]
+
+    types = np.select(
+        [np.isnan(stats).any(axis=1),
+         kassei & heuvel & sprint,
+         kassei & heuvel, kassei & sprint, heuvel & sprint,
+         kassei, heuvel, sprint,
+         stats.sum(axis=1) == 0],
+        ['Onbekend',
+         'Allround / Multispecialist',
+         'Kassei / Heuvel', 'Kassei / Sprint', 'Heuvel / Sprint',
+         'Kassei', 'Heuvel', 'Sprint',
+         'Onbekend'],
+        default=beste,
+    )
+    return pd.Series(types, index=df.index, dtype=object)
+
+
+def giro_rollen(df):
+    """Series (indexed like df) with the Giro role of each rider, from GC/SPR/ITT/MTN."""
+    gc, spr, itt, mtn = (df[col].to_numpy(dtype=float) for col in ['GC', 'SPR', 'ITT', 'MTN'])
+    rollen = np.select(
+        [gc >= 85, spr >= 85, (itt >= 85) & (gc < 75), (mtn >= 80) & (gc < 80)],
+        ['Klassementsrenner', 'Sprinter', 'Tijdrijder', 'Aanvaller / Klimmer'],
+        default='Knecht / Vrijbuiter',
+    )
+    return pd.Series(rollen, index=df.index, dtype=object)
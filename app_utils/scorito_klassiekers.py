@@ -0,0 +1,186 @@
+import os
+import numpy as np
+import pandas as pd
+import pulp
+import streamlit as st
+from app_utils.name_matching import normalize_name_logic, match_naam_slim
+from app_utils.transfer_planner import plan_transfers
+from app_utils.ev_matrix import build_ev_matrix, evaluate_plan, starters_order
+from app_utils.replacement_engine import find_replacements
+from app_utils.data_access import compact_frame, rider_stats, with_columns
+
+EV_METHODS = ["1. Scorito Ranking (Dynamisch)", "2. Originele Curve (Macht 4)", "3. Extreme Curve (Macht 10)", "4. Tiers & Spreiding (Realistisch)"]
+
+def get_file_mod_time(filepath):
+    return os.path.getmtime(filepath) if os.path.exists(filepath) else 0
+
+def evaluate_plan_ev(df_eval, base_team, plan, available_races):
+    return evaluate_plan(build_ev_matrix(df_eval, available_races), base_team, plan)
+
+def bepaal_klassieker_type(row):
+    cob, hll, spr = row.get('COB', 0), row.get('HLL', 0), row.get('SPR', 0)
+    elite = []
+    if cob >= 85: elite.append('Kassei')
+    if hll >= 85: elite.append('Heuvel')
+    if spr >= 85: elite.append('Sprint')
+    if len(elite) == 3: return 'Allround / Multispecialist'
+    elif len(elite) == 2: return ' / '.join(elite)
+    elif len(elite) == 1: return elite[0]
+    else:
+        s = {'Kassei': cob, 'Heuvel': hll, 'Sprint': spr, 'Klimmer': row.get('MTN', 0), 'Tijdrit': row.get('ITT', 0), 'Klassement': row.get('GC', 0)}
+        return max(s, key=s.get) if sum(s.values()) > 0 else 'Onbekend'
+
+# --- AANGEPASTE DATA LADEN ---
+@st.cache_data
+def load_and_merge_data(prog_mod_time, scorito_mod_time, stats_mod_time):
+    try:
+        # 1. SPORZA LADEN (BASIS)
+        df_prog = pd.read_csv("data/sporza_prijzen_startlijst.csv", sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
+        df_prog.columns = df_prog.columns.str.strip()
+        if 'Naam' in df_prog.columns: df_prog = df_prog.rename(columns={'Naam': 'Renner'})
+        if 'Prijs' in df_prog.columns: df_prog = df_prog.drop(columns=['Prijs'])
+
+        if 'PN' in df_prog.columns: df_prog = df_prog.drop(columns=['PN'])
+        if 'TA' in df_prog.columns: df_prog = df_prog.drop(columns=['TA'])
+
+        sporza_to_scorito = {'OML': 'OHN', 'STR': 'SB', 'RVB': 'BDP', 'IFF': 'GW', 'BRP': 'BP', 'AGT': 'AGR', 'WAP': 'WP'}
+        df_prog = df_prog.rename(columns=sporza_to_scorito)
+
+        # 2. SCORITO LADEN (PRIJZEN + PN + TA)
+        df_scorito = pd.read_csv("data/bron_startlijsten.csv", sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
+        df_scorito.columns = df_scorito.columns.str.strip()
+        if 'Naam' in df_scorito.columns: df_scorito = df_scorito.rename(columns={'Naam': 'Renner'})
+
+        if 'Prijs' not in df_scorito.columns and df_scorito['Renner'].astype(str).str.contains(r'\(.*\)', regex=True).any():
+            extracted = df_scorito['Renner'].str.extract(r'^(.*?)\s*\(([\d\.]+)[Mm]\)')
+            df_scorito['Renner'] = extracted[0].str.strip()
+            df_scorito['Prijs'] = pd.to_numeric(extracted[1], errors='coerce') * 1000000
+        if 'Prijs' in df_scorito.columns:
+            df_scorito['Prijs'] = df_scorito['Prijs'].fillna(0)
+            df_scorito.loc[df_scorito['Prijs'] == 800000, 'Prijs'] = 750000
+
+        scorito_cols = ['Renner', 'Prijs']
+        if 'PN' in df_scorito.columns: scorito_cols.append('PN')
+        if 'TA' in df_scorito.columns: scorito_cols.append('TA')
+        df_prijzen = df_scorito[scorito_cols].drop_duplicates(subset=['Renner'])
+
+        # 3. STATS LADEN
+        df_stats = rider_stats()
+
+        # 4. MERGE SPORZA (BASIS) EN SCORITO (PRIJS/PN/TA) - VIA OUTER JOIN
+        scorito_names = df_prijzen['Renner'].unique()
+        norm_to_scorito = {normalize_name_logic(n): n for n in scorito_names}
+        df_prog['Renner_Scorito'] = df_prog['Renner'].apply(lambda x: match_naam_slim(x, norm_to_scorito))
+
+        merged_df = pd.merge(df_prog, df_prijzen, left_on='Renner_Scorito', right_on='Renner', how='outer')
+        merged_df['Renner'] = merged_df['Renner_x'].fillna(merged_df['Renner_y'])
+        merged_df = merged_df.drop(columns=['Renner_x', 'Renner_y', 'Renner_Scorito'])
+
+        # 5. MERGE STATS
+        stats_names = df_stats['Renner'].unique()
+        norm_to_stats = {normalize_name_logic(n): n for n in stats_names}
+        merged_df['Renner_Stats'] = merged_df['Renner'].apply(lambda x: match_naam_slim(x, norm_to_stats))
+        merged_df = pd.merge(merged_df, df_stats, left_on='Renner_Stats', right_on='Renner', how='left', suffixes=('', '_drop2'))
+        merged_df = merged_df.drop(columns=[c for c in merged_df.columns if '_drop' in c or 'Renner_' in c])
+
+        merged_df['Prijs'] = pd.to_numeric(merged_df['Prijs'], errors='coerce').fillna(0).astype(int)
+        merged_df = merged_df[merged_df['Prijs'] > 0].sort_values(by='Prijs', ascending=False).drop_duplicates(subset=['Renner'])
+
+        # 6. SCHOONMAAK & TOTALEN
+        ALLE_KOERSEN = ['OHN', 'KBK', 'SB', 'PN', 'TA', 'MSR', 'BDP', 'E3', 'GW', 'DDV', 'RVV', 'SP', 'PR', 'BP', 'AGR', 'WP', 'LBL']
+        available_races = [k for k in ALLE_KOERSEN if k in merged_df.columns]
+
+        for col in available_races + ['COB', 'HLL', 'SPR', 'AVG', 'MTN', 'ITT']:
+            if col not in merged_df.columns: merged_df[col] = 0
+            merged_df[col] = pd.to_numeric(merged_df[col], errors='coerce').fillna(0).astype(int)
+
+        merged_df['HLL/MTN'] = merged_df[['HLL', 'MTN']].max(axis=1)
+        merged_df['Total_Races'] = merged_df[available_races].sum(axis=1)
+
+        merged_df = merged_df[merged_df['Total_Races'] > 0]
+
+        merged_df['Team'] = merged_df.get('Team', pd.Series(['Onbekend']*len(merged_df))).fillna('Onbekend')
+        koers_stat_map = {'OHN':'COB','KBK':'SPR','SB':'HLL','PN':'HLL/MTN','TA':'SPR','MSR':'AVG','BDP':'SPR','E3':'COB','GW':'SPR','DDV':'COB','RVV':'COB','SP':'SPR','PR':'COB','BP':'HLL','AGR':'HLL','WP':'HLL','LBL':'HLL'}
+
+        merged_df = compact_frame(merged_df, race_cols=available_races)
+        return merged_df, available_races, koers_stat_map
+    except Exception as e:
+        st.error(f"Fout in dataverwerking: {e}")
+        return pd.DataFrame(), [], {}
+
+SCORITO_PTS = np.array([100, 90, 80, 72, 64, 58, 52, 46, 40, 36, 32, 28, 24, 20, 16, 14, 12, 10, 8, 6], dtype=float)
+KOPMAN_FACTOR = np.array([3.0, 2.5, 2.0])
+
+def dynamic_ev_columns(df, available_races, koers_stat_map, method, skip_races=()):
+    """
+    Only the columns calculate_dynamic_ev adds (EV_<koers>, EV_all, Scorito_EV,
+    'Waarde (EV/M)'), indexed like df. df itself is not copied or modified.
+    """
+    race_evs = {}
+    for koers in available_races:
+        ev = np.zeros(len(df))
+        if koers not in skip_races:
+            stat = koers_stat_map.get(koers, 'AVG')
+            order = starters_order(df, koers, stat)
+            if "Scorito Ranking" in method:
+                val = np.zeros(len(order))
+                n = min(len(order), len(SCORITO_PTS))
+                val[:n] = SCORITO_PTS[:n]
+            elif "Originele Curve" in method:
+                val = (df[stat].to_numpy(dtype=float)[order] / 100)**4 * 100
+            elif "Extreme Curve" in method:
+                val = (df[stat].to_numpy(dtype=float)[order] / 100)**10 * 100
+            elif "Tiers" in method:
+                val = np.select([np.arange(len(order)) < 3, np.arange(len(order)) < 8, np.arange(len(order)) < 15], [80.0, 45.0, 20.0], 0.0)
+            else:
+                val = np.zeros(len(order))
+            k = min(len(order), len(KOPMAN_FACTOR))
+            val[:k] *= KOPMAN_FACTOR[:k]
+            ev[order] = val
+        race_evs[f'EV_{koers}'] = ev
+
+    cols = pd.DataFrame(race_evs, index=df.index)
+    cols['EV_all'] = cols.sum(axis=1) if race_evs else 0.0
+    cols['Scorito_EV'] = cols['EV_all'].fillna(0).round(0).astype(int)
+    cols['Waarde (EV/M)'] = (cols['Scorito_EV'] / (df['Prijs'] / 1000000)).replace([float('inf'), -float('inf')], 0).fillna(0).round(1)
+    return compact_frame(cols)
+
+def calculate_dynamic_ev(df, available_races, koers_stat_map, method, skip_races=()):
+    """df with the dynamic_ev_columns joined on; the existing columns are shared, not copied."""
+    cols = dynamic_ev_columns(df, available_races, koers_stat_map, method, skip_races)
+    return with_columns(df, cols)
+
+# --- SOLVERS ---
+def solve_knapsack_dynamic(df, total_budget, min_budget, max_riders, force_base, ban_base, exclude_list):
+    prob = pulp.LpProblem("Scorito_Solver", pulp.LpMaximize)
+    x = pulp.LpVariable.dicts("Base", df.index, cat='Binary')
+
+    prob += pulp.lpSum([df.loc[i, 'EV_all'] * x[i] for i in df.index])
+    prob += pulp.lpSum([x[i] for i in df.index]) == max_riders
+    prob += pulp.lpSum([df.loc[i, 'Prijs'] * x[i] for i in df.index]) <= total_budget
+    prob += pulp.lpSum([df.loc[i, 'Prijs'] * x[i] for i in df.index]) >= min_budget
+
+    for i in df.index:
+        renner = df.loc[i, 'Renner']
+        if renner in force_base: prob += x[i] == 1
+        if renner in ban_base: prob += x[i] == 0
+        if renner in exclude_list: prob += x[i] == 0
+
+    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=15))
+    if pulp.LpStatus[prob.status] == 'Optimal':
+        return [df.loc[i, 'Renner'] for i in df.index if x[i].varValue > 0.5]
+    return []
+
+def find_emergency_replacements(df_eval, base_team, transfer_plan, injured_riders, last_race, max_budget, available_races, ev_matrix=None):
+    return find_replacements(df_eval, base_team, transfer_plan, injured_riders, last_race, max_budget, available_races, ev_matrix)
+
+def rebuild_team_and_transfers(df, available_races, max_bud, min_bud, max_ren, new_base_team, t_moments, use_transfers):
+    if not use_transfers: return new_base_team, []
+    other_riders = [r for r in df['Renner'] if r not in new_base_team]
+    res = plan_transfers(
+        df, available_races, t_moments, max_ren, max_bud,
+        single_move=True, force_base=new_base_team, ban_base=other_riders, time_limit=15
+    )
+    if res['status'] == 'Optimal':
+        return res['base_team'], res['plan']
+    return None, None
@@ -0,0 +1,192 @@
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from thefuzz import process, fuzz
+from app_utils.name_matching import normalize_name_logic
+from app_utils.transfer_planner import plan_transfers, normalize_moments
+from app_utils.data_access import compact_frame, rider_stats, with_columns
+from app_utils.ev_matrix import starters_order
+
+EV_METHODS = ["1. Sporza Ranking (Dynamisch)", "2. Originele Curve (Macht 4)"]
+SPORZA_BUDGET = 120
+SPORZA_PENALTIES = [0, 0, 0, 0, 1, 3, 6, 10, 15]
+# uitslagen.csv gebruikt de Scorito-afkortingen
+SCORITO_NAAR_SPORZA = {'OHN': 'OML', 'SB': 'STR', 'BDP': 'RVB', 'GW': 'IFF', 'BP': 'BRP', 'AGR': 'AGT', 'WP': 'WAP'}
+
+def get_file_mod_time(filepath):
+    try:
+        return os.path.getmtime(filepath)
+    except Exception:
+        return 0
+
+# --- DATA LADEN (SPORZA SPECIFIEK) ---
+@st.cache_data
+def load_and_merge_data(prog_mod_time, stats_mod_time):
+    try:
+        df_prog = pd.read_csv("data/sporza_prijzen_startlijst.csv", sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
+        df_prog.columns = df_prog.columns.str.strip()
+        if 'Naam' in df_prog.columns and 'Renner' not in df_prog.columns:
+            df_prog = df_prog.rename(columns={'Naam': 'Renner'})
+        
+        df_stats = rider_stats()
+        
+        overlap_cols = [c for c in df_stats.columns if c in df_prog.columns and c != 'Renner']
+        df_stats = df_stats.drop(columns=overlap_cols)
+        
+        short_names = df_prog['Renner'].unique()
+        full_names = df_stats['Renner'].unique()
+        norm_to_full = {normalize_name_logic(n): n for n in full_names}
+        norm_full_names = list(norm_to_full.keys())
+        name_mapping = {}
+        
+        manual_overrides = {
+            "Poel": "Mathieu van der Poel", "Aert": "Wout van Aert", "Lie": "Arnaud De Lie",
+            "Gils": "Maxim Van Gils", "Broek": "Frank van den Broek",
+            "Magnier": "Paul Magnier", "Pogacar": "Tadej Pogačar", "Skujins": "Toms Skujiņš",
+            "Kooij": "Olav Kooij"
+        }
+        
+        for short in short_names:
+            if short in manual_overrides:
+                name_mapping[short] = manual_overrides[short]
+            else:
+                norm_short = normalize_name_logic(short)
+                match_res = process.extractOne(norm_short, norm_full_names, scorer=fuzz.token_set_ratio)
+                if match_res and match_res[1] > 75:
+                    name_mapping[short] = norm_to_full[match_res[0]]
+                else:
+                    name_mapping[short] = short
+
+        df_prog['Renner_Full'] = df_prog['Renner'].map(name_mapping)
+        merged_df = pd.merge(df_prog, df_stats, left_on='Renner_Full', right_on='Renner', how='left')
+        
+        if 'Renner_x' in merged_df.columns:
+            merged_df = merged_df.drop(columns=['Renner_x', 'Renner_y'], errors='ignore')
+            
+        merged_df['Prijs'] = pd.to_numeric(merged_df['Prijs'], errors='coerce').fillna(0).astype(int)
+        merged_df = merged_df.sort_values(by='Prijs', ascending=False)
+        merged_df = merged_df.drop_duplicates(subset=['Renner_Full'], keep='first')
+        merged_df = merged_df.rename(columns={'Renner_Full': 'Renner'})
+        
+        ALLE_KOERSEN = ["OML", "KBK", "SAM", "STR", "NOK", "BKC", "MSR", "RVB", "E3", "IFF", "DDV", "RVV", "SP", "PR", "RVL", "BRP", "AGT", "WAP", "LBL"]
+        available_races = [k for k in ALLE_KOERSEN if k in merged_df.columns]
+        
+        all_stats_cols = ['COB', 'HLL', 'SPR', 'AVG', 'FLT', 'MTN', 'ITT', 'GC', 'OR', 'TTL']
+        for col in available_races + all_stats_cols:
+            if col not in merged_df.columns:
+                merged_df[col] = 0
+            merged_df[col] = pd.to_numeric(merged_df[col], errors='coerce').fillna(0).astype(int)
+            
+        if 'Team' not in merged_df.columns:
+            merged_df['Team'] = 'Onbekend'
+        else:
+            merged_df['Team'] = merged_df['Team'].fillna('Onbekend')
+        
+        koers_stat_map = {
+            "OML": "COB", "KBK": "SPR", "SAM": "COB", "STR": "HLL", "NOK": "SPR", 
+            "BKC": "SPR", "MSR": "AVG", "RVB": "SPR", "E3": "COB", "IFF": "SPR", 
+            "DDV": "COB", "RVV": "COB", "SP": "SPR", "PR": "COB", "RVL": "SPR", 
+            "BRP": "HLL", "AGT": "HLL", "WAP": "HLL", "LBL": "HLL"
+        }
+        
+        merged_df = compact_frame(merged_df, race_cols=available_races)
+        return merged_df, available_races, koers_stat_map
+    except Exception as e:
+        st.error(f"Fout in dataverwerking: {e}")
+        return pd.DataFrame(), [], {}
+
+PTS_MONUMENT = [125, 100, 80, 70, 60, 50, 45, 40, 37, 34, 31, 28, 25, 22, 20, 18, 16, 14, 12, 10]
+PTS_WT = [100, 80, 65, 55, 48, 40, 36, 32, 30, 27, 24, 22, 20, 18, 16, 14, 12, 10, 9, 8]
+PTS_NON_WT = [80, 64, 52, 44, 38, 32, 29, 26, 24, 22, 20, 18, 16, 14, 12, 11, 10, 9, 8, 7]
+MONUMENTS = ["MSR", "RVV", "PR", "LBL"]
+WORLD_TOUR = ["OML", "STR", "RVB", "E3", "IFF", "DDV", "AGT", "WAP"]
+PODIUM_BONUS = np.array([30.0, 25.0, 20.0])
+
+def sporza_ev_columns(df, available_races, koers_stat_map, method):
+    """
+    Only the columns calculate_sporza_ev adds (EV_<koers>, EV_all, Sporza_EV,
+    'Waarde (EV/M)'), indexed like df. df itself is not copied or modified.
+    """
+    race_evs = {}
+    for koers in available_races:
+        stat = koers_stat_map.get(koers, 'AVG')
+        order = starters_order(df, koers, stat)
+
+        if koers in MONUMENTS: pts = PTS_MONUMENT
+        elif koers in WORLD_TOUR: pts = PTS_WT
+        else: pts = PTS_NON_WT
+
+        if "Sporza Ranking" in method:
+            val = np.zeros(len(order))
+            n = min(len(order), len(pts))
+            val[:n] = pts[:n]
+        elif "Originele Curve" in method:
+            val = (df[stat].to_numpy(dtype=float)[order] / 100)**4 * pts[0]
+        else:
+            val = np.zeros(len(order))
+        k = min(len(order), len(PODIUM_BONUS))
+        val[:k] += PODIUM_BONUS[:k]
+
+        ev = np.zeros(len(df))
+        ev[order] = val
+        race_evs[f'EV_{koers}'] = ev
+
+    cols = pd.DataFrame(race_evs, index=df.index)
+    cols['EV_all'] = cols.sum(axis=1) if race_evs else 0.0
+    cols['Sporza_EV'] = cols['EV_all'].fillna(0).round(0).astype(int)
+    cols['Waarde (EV/M)'] = (cols['Sporza_EV'] / df['Prijs']).replace([float('inf'), -float('inf')], 0).fillna(0).round(1)
+    return compact_frame(cols)
+
+def calculate_sporza_ev(df, available_races, koers_stat_map, method):
+    """df with the sporza_ev_columns joined on; the existing columns are shared, not copied."""
+    cols = sporza_ev_columns(df, available_races, koers_stat_map, method)
+    return with_columns(df, cols)
+
+def bepaal_klassieker_type(row):
+    try:
+        cob = int(row.get('COB', 0))
+        hll = int(row.get('HLL', 0))
+        spr = int(row.get('SPR', 0))
+        mtn = int(row.get('MTN', 0))
+        itt = int(row.get('ITT', 0))
+        gc = int(row.get('GC', 0))
+    except (ValueError, TypeError):
+        return 'Onbekend'
+
+    elite = []
+    if cob >= 85: elite.append('Kassei')
+    if hll >= 85: elite.append('Heuvel')
+    if spr >= 85: elite.append('Sprint')
+    
+    if len(elite) == 3: return 'Allround / Multispecialist'
+    elif len(elite) == 2: return ' / '.join(elite)
+    elif len(elite) == 1: return elite[0]
+    else:
+        s = {'Kassei': cob, 'Heuvel': hll, 'Sprint': spr, 'Klimmer': mtn, 'Tijdrit': itt, 'Klassement': gc}
+        if sum(s.values()) == 0: return 'Onbekend'
+        return max(s, key=s.get)
+
+# --- SPORZA SOLVER ---
+def sporza_budget(n_transfers):
+    return SPORZA_BUDGET - SPORZA_PENALTIES[min(n_transfers, len(SPORZA_PENALTIES) - 1)]
+
+def solve_sporza_dynamic(df, available_races, t_moments, force_base, ban_base, exclude_list):
+    moments = normalize_moments(t_moments, available_races)
+    K = sum(c for _, c in moments)
+
+    budgets = [sporza_budget(0)]
+    gedaan = 0
+    for _, count in moments:
+        gedaan += count
+        budgets.append(sporza_budget(gedaan))
+
+    time_limit = 20 if K <= 2 else 40
+    res = plan_transfers(
+        df, available_races, dict(moments), 20, budgets, objective='starters', max_starters=12,
+        max_per_team=4, exact_transfers=True, force_base=force_base, ban_base=ban_base,
+        exclude_list=exclude_list, time_limit=time_limit
+    )
+    if res['status'] == 'Optimal':
+        return res['base_team'], res['plan']
+    return [], []
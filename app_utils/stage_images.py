@@ -0,0 +1,80 @@
+"""
+stage_images.py
+---------------
+Stage map and profile images for the Giro pages.
+
+The images in data/giro262 are 852-1280 px wide and 0.3-1.5 MB each; the
+pages used to base64-encode the original file into the HTML of every stage on
+every rerun (32 MB of HTML for the 42 images). stage_image_uri() downscales an image once to a JPEG thumbnail
+(THUMB_WIDTH px wide, enough for the half-column the pages show it in) and
+keeps the data URI in memory until the file's mtime or size changes, so a
+rerun only costs a dict lookup and a much smaller payload.
+
+Files are found with or without their extension (giro26-13-hp and
+giro26-19-hp have none) and the format is read from the file itself, not from
+the name.
+"""
+
+import base64
+import io
+import os
+import threading
+
+from PIL import Image
+
+from app_utils.data_access import file_version
+
+THUMB_WIDTH = 640
+JPEG_QUALITY = 80
+PLACEHOLDER = "https://placehold.co/600x400/eeeeee/000000?text={}"
+
+_uris = {}
+_lock = threading.Lock()
+
+
+def resolve_image_path(path):
+    """path, or the same file without / with another image extension; None when none exists."""
+    stam, ext = os.path.splitext(path)
+    for kandidaat in dict.fromkeys([path, stam, stam + '.jpg', stam + '.jpeg', stam + '.png']):
+        if os.path.isfile(kandidaat):
+            return kandidaat
+    return None
+
+
+def _encode_thumbnail(path, width):
+    with Image.open(path) as img:
+        img.thumbnail((width, width * 4))
+        buf = io.BytesIO()
+        img.convert('RGB').save(buf, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def stage_image_uri(path, width=THUMB_WIDTH):
+    """Data URI of the downscaled image, encoded once per file version; None when it is missing or unreadable."""
+    path = resolve_image_path(path) if path else None
+    if path is None:
+        return None
+    key = (os.path.abspath(path), width)
+    version = file_version(path)
+    with _lock:
+        entry = _uris.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+    try:
+        uri = _encode_thumbnail(path, width)
+    except (OSError, ValueError):
+        uri = None
+    with _lock:
+        _uris[key] = (version, uri)
+    return uri
+
+
+def clickable_image_html(image_path, fallback_text, link):
+    """<a><img></a> with the cached thumbnail, or a placeholder image with fallback_text."""
+    img_src = stage_image_uri(image_path) or PLACEHOLDER.format(fallback_text)
+    return f'<a href="{link}" target="_blank"><img src="{img_src}" width="100%" style="border-radius:8px;"></a>'
+
+
+def clear_cache():
+    with _lock:
+        _uris.clear()
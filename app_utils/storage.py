@@ -0,0 +1,291 @@
+"""
+storage.py
+----------
+User accounts and saved game states behind one repository interface.
+
+The pages used to call supabase.table(TABEL_NAAM) directly. They now go
+through a repository with a handful of methods (get_user, create_user,
+set_password, save_game_state, load_game_state, list_users_for_leaderboard):
+
+- SupabaseRepository: the existing Supabase table, one column per game state
+  (scorito_team, sporza_team, custom_team, sporza_giro_team26, ...).
+- SQLiteRepository: a local database file with the same behaviour, for
+  running the app offline and for load tests without network.
+- CachedRepository: a write-through in-process cache in front of either one.
+  Reads are served from memory for CACHE_TTL seconds, writes go to the
+  backend first and then update the cache, so within one process a save is
+  visible immediately. The TTL bounds staleness when several processes share
+  one database.
+
+save_game_state() only writes to existing users (like the Supabase update)
+and returns False when there is no such user, so pages can report the failed
+save instead of showing success.
+
+get_repository() picks the backend from STORAGE_BACKEND ("supabase" or
+"sqlite", environment first, then secrets; default supabase) and shares one
+cached repository per table across all sessions.
+"""
+
+import abc
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import streamlit as st
+
+CACHE_TTL = 300.0
+SQLITE_PATH = os.path.join("data", "gebruikers.sqlite")
+# Kolommen van de gebruikerstabel zelf; al het andere is een opgeslagen spelstatus
+ACCOUNT_KOLOMMEN = ("username", "password", "created_at")
+
+
+class Repository(abc.ABC):
+    """Interface of the storage backends."""
+
+    name = "repository"
+
+    @abc.abstractmethod
+    def get_user(self, username, kolommen=("password",)):
+        """Dict with username and the requested columns (None when not saved), or None when the user does not exist."""
+
+    @abc.abstractmethod
+    def create_user(self, username, password_hash):
+        """Adds a user with a password hash."""
+
+    @abc.abstractmethod
+    def set_password(self, username, password_hash):
+        """Replaces the password hash of a user."""
+
+    @abc.abstractmethod
+    def save_game_state(self, username, kolom, data):
+        """
+        Stores data (JSON-serialisable) in column kolom of an existing user.
+        Returns False when the user does not exist and nothing was saved.
+        """
+
+    @abc.abstractmethod
+    def list_users_for_leaderboard(self, kolommen):
+        """Dicts with username, created_at and kolommen for every user."""
+
+    def load_game_state(self, username, kolom):
+        """The saved data of kolom, or None."""
+        user = self.get_user(username, [kolom])
+        return user.get(kolom) if user else None
+
+
+class SupabaseRepository(Repository):
+    name = "supabase"
+
+    def __init__(self, client, tabel):
+        self.client = client
+        self.tabel = tabel
+
+    def _table(self):
+        return self.client.table(self.tabel)
+
+    def get_user(self, username, kolommen=("password",)):
+        kolommen = list(dict.fromkeys(["username", *kolommen]))
+        res = self._table().select(", ".join(kolommen)).eq("username", username).execute()
+        if not res.data:
+            return None
+        return {k: res.data[0].get(k) for k in kolommen}
+
+    def create_user(self, username, password_hash):
+        self._table().insert({"username": username, "password": password_hash}).execute()
+
+    def set_password(self, username, password_hash):
+        self._table().update({"password": password_hash}).eq("username", username).execute()
+
+    def save_game_state(self, username, kolom, data):
+        # De update geeft de bijgewerkte rijen terug; leeg betekent geen gebruiker met die naam
+        res = self._table().update({kolom: data}).eq("username", username).execute()
+        return bool(res.data)
+
+    def list_users_for_leaderboard(self, kolommen):
+        kolommen = list(dict.fromkeys(["username", "created_at", *kolommen]))
+        res = self._table().select(", ".join(kolommen)).execute()
+        return [{k: row.get(k) for k in kolommen} for row in res.data]
+
+
+class SQLiteRepository(Repository):
+    """
+    Local database file with a gebruikers table (username, password,
+    created_at) and a spelstatus table with one JSON document per
+    (username, kolom).
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH, tabel="gebruikers"):
+        self.path = path
+        self.tabel = tabel
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{tabel}" '
+                "(username TEXT PRIMARY KEY, password TEXT, created_at TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{tabel}_spelstatus" '
+                "(username TEXT NOT NULL, kolom TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (username, kolom))"
+            )
+
+    def _query(self, sql, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _execute(self, sql, params=()):
+        """Runs a write statement and returns the number of affected rows."""
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def get_user(self, username, kolommen=("password",)):
+        kolommen = list(dict.fromkeys(["username", *kolommen]))
+        rij = self._query(f'SELECT username, password, created_at FROM "{self.tabel}" WHERE username = ?', (username,))
+        if not rij:
+            return None
+        user = dict(zip(ACCOUNT_KOLOMMEN, rij[0]))
+        spel = [k for k in kolommen if k not in ACCOUNT_KOLOMMEN]
+        opgeslagen = {}
+        if spel:
+            plekken = ", ".join("?" * len(spel))
+            opgeslagen = dict(self._query(
+                f'SELECT kolom, data FROM "{self.tabel}_spelstatus" WHERE username = ? AND kolom IN ({plekken})',
+                (username, *spel),
+            ))
+        return {k: json.loads(opgeslagen[k]) if k in opgeslagen else user.get(k) for k in kolommen}
+
+    def create_user(self, username, password_hash):
+        nu = datetime.now(timezone.utc).isoformat()
+        self._query(f'INSERT INTO "{self.tabel}" (username, password, created_at) VALUES (?, ?, ?)', (username, password_hash, nu))
+
+    def set_password(self, username, password_hash):
+        self._query(f'UPDATE "{self.tabel}" SET password = ? WHERE username = ?', (password_hash, username))
+
+    def save_game_state(self, username, kolom, data):
+        # Net als de Supabase update: een onbekende gebruiker wordt niet aangemaakt
+        return self._execute(
+            f'INSERT OR REPLACE INTO "{self.tabel}_spelstatus" (username, kolom, data) '
+            f'SELECT username, ?, ? FROM "{self.tabel}" WHERE username = ?',
+            (kolom, json.dumps(data), username),
+        ) > 0
+
+    def list_users_for_leaderboard(self, kolommen):
+        kolommen = list(dict.fromkeys(["username", "created_at", *kolommen]))
+        users = {u: {"username": u, "created_at": c} for u, c in self._query(
+            f'SELECT username, created_at FROM "{self.tabel}" ORDER BY created_at, username')}
+        spel = [k for k in kolommen if k not in ACCOUNT_KOLOMMEN]
+        if spel:
+            plekken = ", ".join("?" * len(spel))
+            for u, kolom, data in self._query(
+                f'SELECT username, kolom, data FROM "{self.tabel}_spelstatus" WHERE kolom IN ({plekken})', spel
+            ):
+                if u in users:
+                    users[u][kolom] = json.loads(data)
+        return [{k: user.get(k) for k in kolommen} for user in users.values()]
+
+
+class CachedRepository(Repository):
+    """
+    Write-through cache in front of backend. Values are deep-copied on the
+    way in and out, so callers can keep editing what they saved or loaded
+    (session state lists and dicts) without touching the cache.
+    """
+
+    def __init__(self, backend, ttl=CACHE_TTL, clock=time.monotonic):
+        self.backend = backend
+        self.name = f"cached-{backend.name}"
+        self.ttl = ttl
+        self._clock = clock
+        self._users = {}
+        self._leaderboards = {}
+        self._lock = threading.Lock()
+
+    def _vers(self, tijd):
+        return self._clock() - tijd < self.ttl
+
+    def get_user(self, username, kolommen=("password",)):
+        kolommen = list(dict.fromkeys(["username", *kolommen]))
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is not None and self._vers(entry[0]) and all(k in entry[1] for k in kolommen):
+                return copy.deepcopy({k: entry[1][k] for k in kolommen})
+        user = self.backend.get_user(username, kolommen)
+        if user is None:
+            return None
+        with self._lock:
+            entry = self._users.get(username)
+            velden = dict(entry[1]) if entry is not None and self._vers(entry[0]) else {}
+            velden.update(copy.deepcopy(user))
+            self._users[username] = (self._clock(), velden)
+        return user
+
+    def _schrijf(self, username, velden):
+        # Alleen kolommen die al in de cache staan bijwerken; de rest komt bij de volgende get_user
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is not None:
+                entry[1].update(copy.deepcopy(velden))
+            self._leaderboards.clear()
+
+    def create_user(self, username, password_hash):
+        self.backend.create_user(username, password_hash)
+        with self._lock:
+            self._users.pop(username, None)
+            self._leaderboards.clear()
+
+    def set_password(self, username, password_hash):
+        self.backend.set_password(username, password_hash)
+        self._schrijf(username, {"password": password_hash})
+
+    def save_game_state(self, username, kolom, data):
+        opgeslagen = self.backend.save_game_state(username, kolom, data)
+        if opgeslagen:
+            self._schrijf(username, {kolom: data})
+        return opgeslagen
+
+    def list_users_for_leaderboard(self, kolommen):
+        key = tuple(kolommen)
+        with self._lock:
+            entry = self._leaderboards.get(key)
+            if entry is not None and self._vers(entry[0]):
+                return copy.deepcopy(entry[1])
+        users = self.backend.list_users_for_leaderboard(kolommen)
+        with self._lock:
+            self._leaderboards[key] = (self._clock(), copy.deepcopy(users))
+        return users
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._leaderboards.clear()
+
+
+def _instelling(naam, default):
+    waarde = os.environ.get(naam)
+    if waarde is None:
+        try:
+            waarde = st.secrets.get(naam, default)
+        except Exception:
+            waarde = default
+    return waarde if isinstance(waarde, str) else default
+
+
+@st.cache_resource
+def get_repository(tabel):
+    """The shared, cached repository for tabel (see the module docstring)."""
+    if _instelling("STORAGE_BACKEND", "supabase").lower() == "sqlite":
+        backend = SQLiteRepository(_instelling("SQLITE_PATH", SQLITE_PATH), tabel)
+    else:
+        from app_utils.db import init_connection
+        backend = SupabaseRepository(init_connection(), tabel)
+    return CachedRepository(backend)
@@ -0,0 +1,151 @@
+"""
+transfer_planner.py
+-------------------
+General multi-period transfer planner shared by the Scorito and Sporza
+Klassiekers solvers.
+
+The season is split into periods by the transfer moments (a transfer "after
+race X" applies from the race after X). Instead of one y/z variable pair per
+transfer slot and a hand-written budget constraint per combination of slots,
+every period p gets its own binary "owned" variable per rider:
+
+    own[p][i] = own[p-1][i] + buy[p][i] - sell[p][i]
+
+Budget, team-size and team-limit constraints are then written once per
+period against own[p], so the model grows linearly with the number of
+transfer moments.
+"""
+
+import pulp
+
+
+def normalize_moments(t_moments, available_races):
+    """
+    Turns a list of transfer moments (duplicates allowed, 'GEEN' ignored) or a
+    {moment: count} dict into a sorted list of (moment, count) tuples.
+    """
+    if isinstance(t_moments, dict):
+        items = [(m, int(c)) for m, c in t_moments.items()]
+    else:
+        counts = {}
+        for m in t_moments:
+            counts[m] = counts.get(m, 0) + 1
+        items = list(counts.items())
+    items = [(m, c) for m, c in items if m in available_races and c > 0]
+    return sorted(items, key=lambda x: available_races.index(x[0]))
+
+
+def period_races(available_races, moments):
+    """Splits available_races into len(moments) + 1 consecutive periods."""
+    periods = []
+    start = 0
+    for m, _ in moments:
+        end = available_races.index(m) + 1
+        periods.append(available_races[start:end])
+        start = end
+    periods.append(available_races[start:])
+    return periods
+
+
+def plan_transfers(df, available_races, t_moments, team_size, budgets, *,
+                   objective='periods', max_starters=None, max_per_team=None,
+                   exact_transfers=False, single_move=False,
+                   force_base=(), ban_base=(), exclude_list=(), time_limit=15):
+    """
+    Solves the start team plus all transfers in one ILP.
+
+    df needs 'Renner', 'Prijs', 'Team' (only with max_per_team), one EV_{race}
+    column per race and, for objective='starters', the 0/1 startlist columns.
+    budgets is a scalar or a list with one limit per period.
+
+    objective='periods'  : sum of EV of every owned rider (Scorito).
+    objective='starters' : per race only the best `max_starters` owned starters
+                           count (Sporza).
+
+    Returns {'status', 'objective', 'base_team', 'plan', 'variables',
+    'constraints'} where plan is a list of {'uit', 'in', 'moment'} dicts.
+    """
+    moments = normalize_moments(t_moments, available_races)
+    periods = period_races(available_races, moments)
+    P = len(periods)
+    if not isinstance(budgets, (list, tuple)):
+        budgets = [budgets] * P
+
+    force_base, ban_base, exclude_list = set(force_base), set(ban_base), set(exclude_list)
+    idx = list(df.index)
+    renners = df['Renner']
+    prijs = df['Prijs']
+
+    prob = pulp.LpProblem("Transfer_Planner", pulp.LpMaximize)
+    own = [pulp.LpVariable.dicts(f"Own{p}", idx, cat='Binary') for p in range(P)]
+    buy = [None] + [pulp.LpVariable.dicts(f"Buy{p}", idx, cat='Binary') for p in range(1, P)]
+    sell = [None] + [pulp.LpVariable.dicts(f"Sell{p}", idx, cat='Binary') for p in range(1, P)]
+
+    if objective == 'starters':
+        start = {}
+        terms = []
+        for p, races in enumerate(periods):
+            for r in races:
+                starters = [i for i in idx if df.at[i, r] == 1]
+                start[r] = pulp.LpVariable.dicts(f"Start_{r}", starters, cat='Binary')
+                for i in starters:
+                    prob += start[r][i] <= own[p][i]
+                    terms.append(start[r][i] * df.at[i, f'EV_{r}'])
+                if max_starters is not None:
+                    prob += pulp.lpSum(start[r].values()) <= max_starters
+        prob += pulp.lpSum(terms)
+    else:
+        terms = []
+        for p, races in enumerate(periods):
+            if not races:
+                continue
+            ev_p = df[[f'EV_{r}' for r in races]].sum(axis=1)
+            terms += [own[p][i] * ev_p[i] for i in idx if ev_p[i] != 0]
+        prob += pulp.lpSum(terms)
+
+    for p in range(1, P):
+        count = moments[p - 1][1]
+        n_buy = pulp.lpSum(buy[p].values())
+        prob += n_buy == pulp.lpSum(sell[p].values())
+        if exact_transfers:
+            prob += n_buy == count
+        else:
+            prob += n_buy <= count
+        for i in idx:
+            prob += own[p][i] == own[p - 1][i] + buy[p][i] - sell[p][i]
+            prob += buy[p][i] + sell[p][i] <= 1
+
+    for i in idx:
+        bought = [buy[p][i] for p in range(1, P)]
+        prob += own[0][i] + pulp.lpSum(bought) <= 1
+        if single_move and P > 1:
+            prob += pulp.lpSum(bought) + pulp.lpSum([sell[p][i] for p in range(1, P)]) <= 1
+
+        renner = renners[i]
+        if renner in force_base: prob += own[0][i] == 1
+        if renner in ban_base: prob += own[0][i] == 0
+        if renner in exclude_list:
+            for p in range(P): prob += own[p][i] == 0
+
+    teams = df.groupby('Team', observed=True).groups if max_per_team is not None else {}
+    for p in range(P):
+        prob += pulp.lpSum(own[p].values()) == team_size
+        prob += pulp.lpSum([own[p][i] * prijs[i] for i in idx]) <= budgets[p]
+        for team_idx in teams.values():
+            prob += pulp.lpSum([own[p][i] for i in team_idx]) <= max_per_team
+
+    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit))
+    status = pulp.LpStatus[prob.status]
+    result = {'status': status, 'objective': 0.0, 'base_team': [], 'plan': [],
+              'variables': len(prob.variables()), 'constraints': len(prob.constraints)}
+    if status != 'Optimal':
+        return result
+
+    result['objective'] = pulp.value(prob.objective) or 0.0
+    result['base_team'] = [renners[i] for i in idx if own[0][i].varValue > 0.5]
+    for p in range(1, P):
+        uit = sorted(renners[i] for i in idx if sell[p][i].varValue > 0.5)
+        erin = sorted(renners[i] for i in idx if buy[p][i].varValue > 0.5)
+        for u, e in zip(uit, erin):
+            result['plan'].append({"uit": u, "in": e, "moment": moments[p - 1][0]})
+    return result
@@ -0,0 +1,88 @@
+"""
+Benchmark for joining data/cf_prijzen.csv onto the Cycling Fantasy stats.
+
+Compares the original per-row process.extractOne loop from load_static_data
+with the bulk join_prices (normalized hash join + fuzzy leftovers).
+
+    python -m benchmarks.cf_price_join --repeat 5
+"""
+
+import argparse
+import json
+import time
+
+import pandas as pd
+from thefuzz import process, fuzz
+
+from app_utils.cf_startlist import join_prices
+
+STATS_PATH = "data/renners_stats.csv"
+PRICES_PATH = "data/cf_prijzen.csv"
+
+
+def legacy_join(df_stats, df_prices):
+    full_names = df_stats['Renner'].tolist()
+    price_map = {}
+    for _, row in df_prices.iterrows():
+        match = process.extractOne(str(row['Renner']), full_names, scorer=fuzz.token_set_ratio)
+        if match and match[1] > 85:
+            price_map[match[0]] = row['Prijs']
+    return df_stats['Renner'].map(price_map).fillna(200).astype(int)
+
+
+def load_data():
+    df_stats = pd.read_csv(STATS_PATH, sep='\t')
+    if 'Naam' in df_stats.columns:
+        df_stats = df_stats.rename(columns={'Naam': 'Renner'})
+    df_stats = df_stats.drop_duplicates(subset=['Renner'], keep='first').reset_index(drop=True)
+    df_prices = pd.read_csv(PRICES_PATH, sep=None, engine='python')
+    if 'Naam' in df_prices.columns:
+        df_prices = df_prices.rename(columns={'Naam': 'Renner'})
+    return df_stats, df_prices
+
+
+def _best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return res, best
+
+
+def run(repeat=3):
+    df_stats, df_prices = load_data()
+    legacy, t_legacy = _best_of(lambda: legacy_join(df_stats, df_prices), repeat)
+    bulk, t_bulk = _best_of(lambda: join_prices(df_stats['Renner'], df_prices, threshold=85), repeat)
+
+    verschil = df_stats.loc[legacy.to_numpy() != bulk.to_numpy(), 'Renner'].tolist()
+    return {
+        "riders": len(df_stats),
+        "prices": len(df_prices),
+        "legacy_seconds": round(t_legacy, 4),
+        "bulk_seconds": round(t_bulk, 4),
+        "speedup": round(t_legacy / max(t_bulk, 1e-9), 1),
+        "priced_legacy": int((legacy != 200).sum()),
+        "priced_bulk": int((bulk != 200).sum()),
+        "differences": verschil,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark van de CF prijzen-join (extractOne-loop vs. bulk join).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Schrijf het resultaat ook als JSON naar dit bestand.")
+    args = parser.parse_args(argv)
+
+    res = run(args.repeat)
+    for k, v in res.items():
+        print(f"{k:<16} {v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+    return res
+
+
+if __name__ == "__main__":
+    main()
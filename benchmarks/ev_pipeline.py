@@ -0,0 +1,112 @@
+"""
+Allocation profile of the EV layer per page rerun.
+
+Compares the original Scorito Klassiekers pipeline, which starts with
+df.copy() and inserts the EV columns one by one, against the current one,
+which computes only the new columns and joins them onto the input in one
+step. The work done on one rerun is traced with tracemalloc (numpy buffers
+included): the peak of extra memory during the rerun and the number of
+allocations that are still alive afterwards next to the result.
+
+The Giro EV and stage scores keep their df.copy(): with ~90 riders the
+fixed per-frame overhead of pandas outweighs the copied data, so joining
+columns there raised the peak instead of lowering it.
+
+--scale repeats the riders to show how both pipelines grow with the frame.
+
+    python -m benchmarks.ev_pipeline --repeat 5 --scale 10
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from app_utils import scorito_klassiekers
+from app_utils.parameter_sweep import load_game_data
+
+
+def legacy_dynamic_ev(df, available_races, koers_stat_map, method):
+    df = df.copy()
+    scorito_pts = [100, 90, 80, 72, 64, 58, 52, 46, 40, 36, 32, 28, 24, 20, 16, 14, 12, 10, 8, 6]
+    race_evs = {}
+    for koers in available_races:
+        stat = koers_stat_map.get(koers, 'AVG')
+        starters = df[df[koers] == 1].copy()
+        starters = starters.sort_values(by=[stat, 'AVG'], ascending=[False, False])
+        race_ev = pd.Series(0.0, index=df.index)
+        for i, idx in enumerate(starters.index):
+            val = scorito_pts[i] if i < len(scorito_pts) else 0.0
+            if i == 0: val *= 3.0
+            elif i == 1: val *= 2.5
+            elif i == 2: val *= 2.0
+            race_ev.loc[idx] = val
+        race_evs[koers] = race_ev
+        df[f'EV_{koers}'] = race_ev
+    df['EV_all'] = sum(race_evs.values()) if race_evs else 0.0
+    df['Scorito_EV'] = df['EV_all'].fillna(0).round(0).astype(int)
+    df['Waarde (EV/M)'] = (df['Scorito_EV'] / (df['Prijs'] / 1000000)).replace([float('inf'), -float('inf')], 0).fillna(0).round(1)
+    return df
+
+
+def _profile(fn, repeat):
+    fn()  # opwarmen (imports, caches)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    before = tracemalloc.take_snapshot()
+    res = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(max(s.count_diff, 0) for s in after.compare_to(before, 'lineno'))
+    del res
+    return {"seconds": round(best, 4), "peak_mb": round((peak - base) / 1e6, 3),
+            "retained_mb": round((current - base) / 1e6, 3), "retained_blocks": blocks}
+
+
+def _scaled(df, scale):
+    return df if scale == 1 else pd.concat([df] * scale, ignore_index=True)
+
+
+def run(repeat=3, scale=1):
+    df_s, races_s, map_s = load_game_data("scorito")
+    df_s = _scaled(df_s, scale)
+    method_s = scorito_klassiekers.EV_METHODS[0]
+
+    pipelines = {
+        "Scorito Klassiekers": (lambda: legacy_dynamic_ev(df_s, races_s, map_s, method_s),
+                                lambda: scorito_klassiekers.calculate_dynamic_ev(df_s, races_s, map_s, method_s)),
+    }
+    res = {"riders": {"scorito": len(df_s)}}
+    for naam, (legacy, nieuw) in pipelines.items():
+        res[naam] = {"legacy": _profile(legacy, repeat), "new": _profile(nieuw, repeat)}
+    return res
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Allocaties en piekgeheugen van de EV-laag per rerun (df.copy() vs. nieuwe kolommen).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=int, default=1, help="Herhaal de renners zoveel keer.")
+    parser.add_argument("--json", help="Schrijf het resultaat ook als JSON naar dit bestand.")
+    args = parser.parse_args(argv)
+
+    res = run(args.repeat, args.scale)
+    for k, v in res.items():
+        print(f"{k:<24} {v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+    return res
+
+
+if __name__ == "__main__":
+    main()
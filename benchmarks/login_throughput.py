@@ -0,0 +1,103 @@
+"""
+Logins per second with PBKDF2 password hashes.
+
+Simulates --sessions Streamlit sessions (threads) that each log in --logins
+times, once the old way (verify_wachtwoord in the session thread, plus a
+second hash for a legacy upgrade) and once via crypto.controleer_login (the
+bounded worker pool). Reports logins/sec and the worst-case login latency.
+The pool caps concurrent hashes at crypto.MAX_WORKERS, so the throughput is
+bounded by the cores; the gain is that a burst of logins no longer occupies
+more CPU than that.
+
+    python -m benchmarks.login_throughput --sessions 16 --logins 4
+    python -m benchmarks.login_throughput --iterations 100000 --json login.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+from app_utils import crypto
+
+
+def _meet(login, sessions, logins):
+    latenties = []
+    lock = threading.Lock()
+
+    def sessie(s):
+        for i in range(logins):
+            start = time.perf_counter()
+            login(f"speler{s}", i)
+            with lock:
+                latenties.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=sessie, args=(s,)) for s in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sec = time.perf_counter() - start
+    return {
+        "sec": round(sec, 3),
+        "logins_per_sec": round(len(latenties) / sec, 2),
+        "max_latency_sec": round(max(latenties), 3),
+    }
+
+
+def run(sessions=8, logins=4, iterations=None, legacy_share=0.25):
+    if iterations:
+        os.environ["PBKDF2_ITERATIONS"] = str(iterations)
+    wachtwoord = "Wielrennen2026"
+    pbkdf2 = crypto.hash_wachtwoord(wachtwoord)
+    legacy = hashlib.sha256(wachtwoord.encode()).hexdigest()
+    n_legacy = round(1 / legacy_share) if legacy_share else 0
+
+    def db_hash(i):
+        return legacy if n_legacy and i % n_legacy == 0 else pbkdf2
+
+    def oud(gebruiker, i):
+        h = db_hash(i)
+        # Originele flow van Welkom.py: verify, en bij een legacy hash opnieuw hashen
+        assert crypto.verify_wachtwoord(wachtwoord, h)
+        if not h.startswith("pbkdf2_sha256$"):
+            crypto.hash_wachtwoord(wachtwoord)
+
+    def pool(gebruiker, i):
+        status, _ = crypto.controleer_login(gebruiker, wachtwoord, db_hash(i))
+        assert status == crypto.LOGIN_OK, status
+
+    res = {
+        "iterations": crypto.pbkdf2_iteraties(),
+        "sessions": sessions,
+        "logins": sessions * logins,
+        "max_workers": crypto.MAX_WORKERS,
+        "session_thread": _meet(oud, sessions, logins),
+        "worker_pool": _meet(pool, sessions, logins),
+    }
+    crypto.reset_pogingen()
+    return res
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inloggen per seconde: hashen in de sessie vs. begrensde worker pool.")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=4, help="Aantal logins per sessie.")
+    parser.add_argument("--iterations", type=int, help="PBKDF2 iteraties (standaard de geconfigureerde waarde).")
+    parser.add_argument("--json", help="Schrijf het resultaat ook als JSON naar dit bestand.")
+    args = parser.parse_args(argv)
+
+    res = run(args.sessions, args.logins, args.iterations)
+    for k, v in res.items():
+        print(f"{k:<15} {v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    return res
+
+
+if __name__ == "__main__":
+    main()
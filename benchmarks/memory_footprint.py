@@ -0,0 +1,86 @@
+"""
+Memory footprint of the rider frames a page session holds.
+
+st.cache_data hands every session its own (unpickled) copy of the loader
+output, and each session keeps the EV frame it computes on top of it. For
+every page the deep memory usage of those frames is measured with the compact
+dtypes from data_access.compact_frame and with the legacy dtypes they replace
+(str columns, int64 stats and race flags, float64 EVs).
+
+    python -m benchmarks.memory_footprint --json mem.json
+"""
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from app_utils import giro_data, scorito_giro_data, scorito_klassiekers, sporza_klassiekers
+from app_utils.data_access import rider_stats
+
+
+def legacy_dtypes(df):
+    """df with the dtypes the loaders produced before compact_frame."""
+    nieuw = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            nieuw[col] = df[col].astype(dtype.categories.dtype)
+        elif dtype == bool or dtype == np.uint8:
+            nieuw[col] = df[col].astype('int64')
+        elif dtype == np.float32:
+            nieuw[col] = df[col].astype('float64')
+    return df.assign(**nieuw)
+
+
+def _mb(df):
+    return float(df.memory_usage(deep=True).sum()) / 1e6
+
+
+def session_frames():
+    """{page: [frames held by one session]}."""
+    pages = {"Renners stats": [rider_stats()]}
+
+    df, races, stat_map = scorito_klassiekers.load_and_merge_data(0, 0, 0)
+    pages["Scorito Klassiekers"] = [df, scorito_klassiekers.calculate_dynamic_ev(df, races, stat_map, "1. Scorito Ranking")]
+
+    df, races, stat_map = sporza_klassiekers.load_and_merge_data(0, 0)
+    pages["Sporza Klassiekers"] = [df, sporza_klassiekers.calculate_sporza_ev(df, races, stat_map, "1. Sporza Ranking")]
+
+    for naam, module in [("Sporza Giro", giro_data), ("Scorito Giro", scorito_giro_data)]:
+        df = module.load_giro_data()
+        pages[naam] = [df, module.calculate_giro_ev(df)]
+    return pages
+
+
+def run():
+    res = {}
+    totaal_oud = totaal_nieuw = 0.0
+    for page, frames in session_frames().items():
+        oud = sum(_mb(legacy_dtypes(f)) for f in frames)
+        nieuw = sum(_mb(f) for f in frames)
+        totaal_oud += oud
+        totaal_nieuw += nieuw
+        res[page] = {"legacy_mb": round(oud, 3), "compact_mb": round(nieuw, 3), "ratio": round(oud / max(nieuw, 1e-9), 2)}
+    res["Totaal per sessie"] = {"legacy_mb": round(totaal_oud, 3), "compact_mb": round(totaal_nieuw, 3),
+                                "ratio": round(totaal_oud / max(totaal_nieuw, 1e-9), 2)}
+    return res
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geheugengebruik per sessie: compacte vs. oude dtypes.")
+    parser.add_argument("--json", help="Schrijf het resultaat ook als JSON naar dit bestand.")
+    args = parser.parse_args(argv)
+
+    res = run()
+    for k, v in res.items():
+        print(f"{k:<22} {v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2, ensure_ascii=False)
+    return res
+
+
+if __name__ == "__main__":
+    main()
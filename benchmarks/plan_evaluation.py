@@ -0,0 +1,96 @@
+"""
+Benchmark for transfer-plan evaluation on the real Scorito data.
+
+Compares the original row-scan evaluate_plan_ev with the dense EV matrix
+(single plan and batched) on randomly generated 3-transfer plans.
+
+    python -m benchmarks.plan_evaluation --plans 500
+"""
+
+import argparse
+import json
+import random
+import time
+
+from app_utils import scorito_klassiekers
+from app_utils.ev_matrix import build_ev_matrix, evaluate_plan, evaluate_plans
+from app_utils.parameter_sweep import load_game_data
+
+
+def legacy_evaluate_plan_ev(df_eval, base_team, plan, available_races):
+    current_active = set(base_team)
+    totaal = 0
+    for race in available_races:
+        for t in plan:
+            if t['moment'] == race:
+                if t['uit'] in current_active: current_active.remove(t['uit'])
+                current_active.add(t['in'])
+        for r in current_active:
+            res = df_eval.loc[df_eval['Renner'] == r, f'EV_{race}']
+            if not res.empty:
+                totaal += res.values[0]
+    return totaal
+
+
+def random_plans(df, base_team, available_races, n, seed=0):
+    rnd = random.Random(seed)
+    buiten = [r for r in df['Renner'] if r not in base_team]
+    plans = []
+    for _ in range(n):
+        uit = rnd.sample(base_team, 3)
+        erin = rnd.sample(buiten, 3)
+        plans.append([{"uit": u, "in": e, "moment": rnd.choice(available_races[:-1])} for u, e in zip(uit, erin)])
+    return plans
+
+
+def run(n_plans=200):
+    df_raw, races, koers_map = load_game_data("scorito")
+    df = scorito_klassiekers.calculate_dynamic_ev(df_raw, races, koers_map, scorito_klassiekers.EV_METHODS[0])
+    base_team = scorito_klassiekers.solve_knapsack_dynamic(df, 45000000, 43000000, 20, [], [], [])
+    plans = random_plans(df, base_team, races, n_plans)
+
+    start = time.perf_counter()
+    legacy = [legacy_evaluate_plan_ev(df, base_team, p, races) for p in plans]
+    t_legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ev_matrix = build_ev_matrix(df, races)
+    t_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [evaluate_plan(ev_matrix, base_team, p) for p in plans]
+    t_single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = evaluate_plans(ev_matrix, base_team, plans)
+    t_batch = time.perf_counter() - start
+
+    max_diff = max(abs(a - b) for a, b in zip(legacy, batch))
+    assert max_diff < 1e-6 and max(abs(a - b) for a, b in zip(legacy, single)) < 1e-6
+    return {
+        "plans": n_plans,
+        "legacy_seconds": round(t_legacy, 4),
+        "matrix_build_seconds": round(t_build, 4),
+        "single_seconds": round(t_single, 4),
+        "batch_seconds": round(t_batch, 4),
+        "speedup_batch": round(t_legacy / max(t_batch + t_build, 1e-9), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark van plan-evaluatie (row-scan vs. EV-matrix).")
+    parser.add_argument("--plans", type=int, default=200)
+    parser.add_argument("--json", help="Schrijf het resultaat ook als JSON naar dit bestand.")
+    args = parser.parse_args(argv)
+
+    res = run(args.plans)
+    for k, v in res.items():
+        print(f"{k:<22} {v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    return res
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Stage-image HTML of the Giro pages per rerun.
+
+Renders the map and profile <img> of all 21 stages the way the pages used to
+(read and base64-encode the original file every time) and with
+stage_images.clickable_image_html, cold (first rerun, thumbnails encoded) and
+warm (every later rerun). Reports seconds and the HTML payload in MB.
+
+    python -m benchmarks.stage_images --repeat 3
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+
+from app_utils import stage_images
+
+STAGES = range(1, 22)
+LINK = "https://www.giroditalia.it/en/the-route/"
+
+
+def paths():
+    return [f"data/giro262/giro26-{i}-{soort}.jpg" for i in STAGES for soort in ("map", "hp")]
+
+
+def legacy_html(image_path, fallback_text, link):
+    # Originele get_clickable_image_html van de Giro pagina's
+    if os.path.exists(image_path):
+        with open(image_path, "rb") as img_file:
+            encoded_string = base64.b64encode(img_file.read()).decode()
+        ext = "png" if image_path.lower().endswith(".png") else "jpeg"
+        img_src = f"data:image/{ext};base64,{encoded_string}"
+    else:
+        img_src = f"https://placehold.co/600x400/eeeeee/000000?text={fallback_text}"
+    return f'<a href="{link}" target="_blank"><img src="{img_src}" width="100%" style="border-radius:8px;"></a>'
+
+
+def _rerun(render):
+    start = time.perf_counter()
+    html = [render(p, "Etappe", LINK) for p in paths()]
+    return time.perf_counter() - start, sum(len(h) for h in html) / 1e6, sum("placehold.co" in h for h in html)
+
+
+def run(repeat=3):
+    legacy = min((_rerun(legacy_html) for _ in range(repeat)), key=lambda r: r[0])
+    stage_images.clear_cache()
+    cold = _rerun(stage_images.clickable_image_html)
+    warm = min((_rerun(stage_images.clickable_image_html) for _ in range(repeat)), key=lambda r: r[0])
+    res = {}
+    for naam, (sec, mb, placeholders) in [("legacy", legacy), ("cached_cold", cold), ("cached_warm", warm)]:
+        res[naam] = {"sec": round(sec, 4), "html_mb": round(mb, 2), "placeholders": placeholders}
+    res["speedup_warm"] = round(legacy[0] / max(warm[0], 1e-9), 1)
+    return res
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Etappe-afbeeldingen per rerun: oud vs. gecachte thumbnails.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Schrijf het resultaat ook als JSON naar dit bestand.")
+    args = parser.parse_args(argv)
+
+    res = run(args.repeat)
+    for k, v in res.items():
+        print(f"{k:<14} {v}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    return res
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,688 @@
+"""
+Headless benchmark suite for the hot paths of the app.
+
+Runs with streamlit replaced by a mock (st.cache_data / st.cache_resource
+become plain pass-through decorators, so every run really does the work) on
+the real files in data/, and times:
+
+    data.*         loading and merging the data files (caches cleared per run)
+    matching.*     name matching between startlists, stats and results
+    ev.*           every EV calculator, per EV method
+    solver.*       every PuLP solver, plus the Het Spel pick optimizer
+    evaluator.*    the transfer-plan and kopman evaluation of the evaluators
+    leaderboard.*  the Het Spel standings for --players synthetic players
+
+Every case is timed --repeat times; the report has the fastest and the median
+run per case plus some metadata (commit, python, cpu count). --json writes
+it as JSON, --compare prints the median ratio against an earlier JSON report,
+so two commits can be compared:
+
+    python -m benchmarks.suite --json bench_base.json
+    python -m benchmarks.suite --only ev. solver.scorito --repeat 5 --compare bench_base.json
+
+Page functions and constants that have no home in app_utils (the Cycling
+Fantasy solver, the Het Spel race list, the Evaluator teams) are taken from
+the page source with page_namespace(), without running the page itself.
+
+--scale N runs the same cases on a synthetic dataset of N times the real size
+(benchmarks/synthetic_data.py: 1000*N riders, up to 60 races, 500*N users),
+so the timings of --scale 1, 10 and 100 show how the solvers, matchers and
+the leaderboard scale:
+
+    python -m benchmarks.suite --scale 10 --only ev. solver. matching. leaderboard. --json bench_x10.json
+
+At scale the loaders that read the fixed files in data/ are skipped, the
+matchers match MATCH_QUERIES names against the full scaled name lists, the
+kopman evaluator scores EVALUATOR_TEAMS user teams, and the leaderboard
+scores all synthetic users (use --players to lower the number).
+"""
+
+import sys
+from unittest.mock import MagicMock
+
+
+def headless_streamlit():
+    """Replaces streamlit by a mock whose cache decorators are pass-throughs."""
+    def passthrough(func=None, **kwargs):
+        return func if callable(func) else (lambda f: f)
+
+    st = MagicMock()
+    st.cache_data = passthrough
+    st.cache_resource = passthrough
+    st.secrets = {"CRYPTO_SALT": "benchmark", "TABEL_NAAM": "benchmark"}
+    sys.modules["streamlit"] = st
+    return st
+
+
+# Moet vóór de app_utils imports gebeuren, anders cachet st.cache_data tussen de runs
+headless_streamlit()
+
+import argparse  # noqa: E402
+import ast  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import platform  # noqa: E402
+import random  # noqa: E402
+import statistics  # noqa: E402
+import subprocess  # noqa: E402
+import tempfile  # noqa: E402
+import time  # noqa: E402
+from datetime import datetime  # noqa: E402
+from functools import cached_property  # noqa: E402
+from itertools import islice  # noqa: E402
+
+import pandas as pd  # noqa: E402
+
+from app_utils import (  # noqa: E402
+    cycling_fantasy, data_access, giro_data, het_spel, scorito_giro_data, scorito_klassiekers, sporza_klassiekers,
+)
+from app_utils.captains import top_k  # noqa: E402
+from app_utils.cf_startlist import join_prices, match_names  # noqa: E402
+from app_utils.crypto import generate_signature  # noqa: E402
+from app_utils.ev_matrix import build_ev_matrix, evaluate_plans  # noqa: E402
+from app_utils.giro_solver import solve_giro_team  # noqa: E402
+from app_utils.name_matching import match_naam_slim, match_uitslag_naam, normalize_name_logic  # noqa: E402
+from app_utils.ownership import OwnershipTimeline  # noqa: E402
+from app_utils.parameter_sweep import load_game_data  # noqa: E402
+from app_utils.replacement_engine import find_replacements  # noqa: E402
+from app_utils.results_store import UITSLAGEN_PATH, ResultsStore  # noqa: E402
+from benchmarks import synthetic_data  # noqa: E402
+
+CF_PRICES_PATH = "data/cf_prijzen.csv"
+GIRO_STARTLIST_PATH = "data/giro262/sporza_giro26_startlijst.csv"
+HET_SPEL_PAGE = "pages/Sporza/Classics/Het_Spel.py"
+CF_PAGE = "pages/Cycling_Fantasy/Classics/Dashboard.py"
+SCORITO_EVALUATOR_PAGE = "pages/Scorito/Classics/Evaluator.py"
+DEFAULT_PLAYERS = 50
+MATCH_QUERIES = 500
+EVALUATOR_TEAMS = 100
+CF_PRIJS_AANDEEL = 0.23
+
+CASES = {}
+
+
+class SkipCase(Exception):
+    """Raised by a case setup that does not apply to this run; recorded as skipped."""
+
+
+def case(name):
+    """Registers a case: a function of the BenchData that returns the callable to time."""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def page_namespace(path):
+    """
+    Imports, function definitions and UPPERCASE constants of a page, executed
+    without the rest of the page (the same trick as tests/test_scorito.py).
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    tree.body = [
+        node for node in tree.body
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))
+        or (isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) and t.id.isupper() for t in node.targets))
+    ]
+    namespace = {"__name__": "benchmark_page"}
+    exec(compile(tree, path, "exec"), namespace)
+    return namespace
+
+
+def spread_moments(races, n):
+    """n transfer moments spread evenly over all races except the last."""
+    kandidaten = races[:-1]
+    if n >= len(kandidaten):
+        return list(kandidaten)
+    stap = (len(kandidaten) - 1) / max(n - 1, 1)
+    return [kandidaten[round(j * stap)] for j in range(n)]
+
+
+def random_plans(df, base_team, races, n, seed=0):
+    rnd = random.Random(seed)
+    buiten = [r for r in df['Renner'] if r not in base_team]
+    return [
+        [{"uit": u, "in": e, "moment": rnd.choice(races[:-1])} for u, e in zip(rnd.sample(base_team, 3), rnd.sample(buiten, 3))]
+        for _ in range(n)
+    ]
+
+
+def het_spel_players(race_index, ev, n, seed=0, base_size=10):
+    """n custom_team rows as Het_Spel stores them: a random base team with the optimal picks, signed."""
+    rnd = random.Random(seed)
+    renners = race_index['alle_renners']
+    players = []
+    for p in range(n):
+        base = rnd.sample(renners, base_size)
+        picks = {r: {k: v for k, v in pick.items() if k != 'ev'} for r, pick in het_spel.optimize_picks(ev, base).items()}
+        data = {"base": base, "picks": picks}
+        players.append({"username": f"speler{p}", "custom_team": {"data": data, "signature": generate_signature(data)}})
+    return players
+
+
+class BenchData:
+    """
+    The inputs of the cases, built lazily once per suite run: from the real
+    files in data/, or from a synthetic dataset when scale is given.
+    """
+
+    def __init__(self, players=None, scale=None, seed=0):
+        self.scale = scale
+        self.seed = seed
+        if players is None:
+            players = synthetic_data.scale_sizes(scale)["users"] if scale else DEFAULT_PLAYERS
+        self.n_players = players
+
+    def real_only(self):
+        if self.scale:
+            raise SkipCase("leest de vaste bestanden in data/, alleen op de echte data")
+
+    def sample(self, namen):
+        """All names on the real data, MATCH_QUERIES of them (spread evenly) at scale."""
+        namen = list(namen)
+        if not self.scale or len(namen) <= MATCH_QUERIES:
+            return namen
+        stap = len(namen) / MATCH_QUERIES
+        return [namen[int(i * stap)] for i in range(MATCH_QUERIES)]
+
+    @cached_property
+    def synthetic(self):
+        return synthetic_data.generate(**synthetic_data.scale_sizes(self.scale), seed=self.seed)
+
+    @cached_property
+    def files(self):
+        """Paths of the stats and results files the cases read."""
+        if not self.scale:
+            return {'stats': data_access.STATS_PATH, 'results': UITSLAGEN_PATH}
+        self._tmp = tempfile.TemporaryDirectory(prefix=f"bench_x{self.scale}_")
+        return synthetic_data.write(self.synthetic, self._tmp.name, users=False)
+
+    @cached_property
+    def scorito(self):
+        if self.scale:
+            return synthetic_data.game_frame(self.synthetic, "scorito")
+        return load_game_data("scorito")
+
+    @cached_property
+    def scorito_ev(self):
+        df, races, koers_map = self.scorito
+        return scorito_klassiekers.calculate_dynamic_ev(df, races, koers_map, scorito_klassiekers.EV_METHODS[0])
+
+    @cached_property
+    def scorito_base(self):
+        return scorito_klassiekers.solve_knapsack_dynamic(self.scorito_ev, 45000000, 43000000, 20, [], [], [])
+
+    @cached_property
+    def sporza(self):
+        if self.scale:
+            return synthetic_data.game_frame(self.synthetic, "sporza")
+        return load_game_data("sporza")
+
+    @cached_property
+    def sporza_ev(self):
+        df, races, koers_map = self.sporza
+        return sporza_klassiekers.calculate_sporza_ev(df, races, koers_map, sporza_klassiekers.EV_METHODS[0])
+
+    @cached_property
+    def giro(self):
+        if self.scale:
+            return synthetic_data.giro_frame(self.synthetic)
+        return giro_data.load_giro_data()
+
+    @cached_property
+    def scorito_giro(self):
+        if self.scale:
+            return synthetic_data.giro_frame(self.synthetic)
+        return scorito_giro_data.load_giro_data()
+
+    @cached_property
+    def stats(self):
+        return data_access.rider_stats(self.files['stats'])
+
+    @cached_property
+    def cf_prices(self):
+        if self.scale:
+            # Prijzen voor de beste renners, zoals de Cycling Fantasy prijslijst
+            top = self.stats.nlargest(round(CF_PRIJS_AANDEEL * len(self.stats)), 'AVG')
+            return pd.DataFrame({'Renner': top['Renner'].to_numpy(), 'Prijs': synthetic_data.prices(top['AVG'].to_numpy(), "cycling_fantasy")})
+        df = pd.read_csv(CF_PRICES_PATH, sep=None, engine='python')
+        return df.rename(columns={'Naam': 'Renner'}) if 'Naam' in df.columns else df
+
+    @cached_property
+    def sporza_prices(self):
+        """The Sporza price list with its short names."""
+        if self.scale:
+            return self.synthetic['startlist']
+        df = pd.read_csv(het_spel.PRIJZEN_PATH, sep=None, engine='python')
+        return df.rename(columns={'Naam': 'Renner'}) if 'Naam' in df.columns else df
+
+    @cached_property
+    def giro_startlist(self):
+        """Names of a Giro startlist: the real one, or short Sporza names at scale."""
+        if self.scale:
+            return self.sample(self.synthetic['startlist']['Renner'])
+        namen = pd.read_csv(GIRO_STARTLIST_PATH, sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
+        namen.columns = namen.columns.str.strip()
+        return namen['Naam' if 'Naam' in namen.columns else 'Renner'].tolist()
+
+    @cached_property
+    def cf_static(self):
+        df = self.stats.copy()
+        df['Prijs'] = join_prices(df['Renner'], self.cf_prices, threshold=85).to_numpy()
+        return df
+
+    @cached_property
+    def cf_startlist(self):
+        # Een startlijst van 175 renners, zoals na het inlezen van een PCS pdf
+        return self.cf_static.nlargest(175, 'AVG').reset_index(drop=True)
+
+    @cached_property
+    def het_spel_page(self):
+        return page_namespace(HET_SPEL_PAGE)
+
+    @cached_property
+    def het_spel(self):
+        if self.scale:
+            df, races, koers_map = synthetic_data.game_frame(self.synthetic, "sporza")
+        else:
+            df, races, koers_map = self.het_spel_page['load_csv_data']()
+        race_index = het_spel.build_race_index(df, races, koers_map, ("benchmark", self.scale, len(df)))
+        return df, races, race_index
+
+    @cached_property
+    def het_spel_ev(self):
+        df, _, race_index = self.het_spel
+        return het_spel.build_ev(df, race_index)
+
+    @cached_property
+    def players(self):
+        if self.scale:
+            return list(islice(self.synthetic['users'](generate_signature), self.n_players))
+        return het_spel_players(self.het_spel[2], self.het_spel_ev, self.n_players)
+
+    @cached_property
+    def evaluator_teams(self):
+        """(teams, koersen, stat_map) of the Scorito Evaluator; at scale the sporza_team of EVALUATOR_TEAMS users."""
+        if self.scale:
+            teams = {
+                u['username']: {"Start": u['sporza_team']['selected_riders'], "Transfers": u['sporza_team']['transfer_plan']}
+                for u in islice(self.synthetic['users'](), EVALUATOR_TEAMS)
+            }
+            return teams, self.synthetic['races'], self.synthetic['koers_map']
+        page = page_namespace(SCORITO_EVALUATOR_PAGE)
+        return page['HARDCODED_TEAMS'], page['ALLE_KOERSEN'], page['STAT_MAPPING']
+
+
+# --- DATA LADEN ---
+@case("data.rider_stats")
+def _(d):
+    path = d.files['stats']
+
+    def run():
+        data_access.clear_cache()
+        return data_access.rider_stats(path)
+    return run
+
+
+@case("data.scorito_merge")
+def _(d):
+    d.real_only()
+
+    def run():
+        data_access.clear_cache()
+        return load_game_data("scorito")
+    return run
+
+
+@case("data.sporza_merge")
+def _(d):
+    d.real_only()
+
+    def run():
+        data_access.clear_cache()
+        return load_game_data("sporza")
+    return run
+
+
+@case("data.sporza_giro_merge")
+def _(d):
+    d.real_only()
+
+    def run():
+        data_access.clear_cache()
+        return giro_data.load_giro_data()
+    return run
+
+
+@case("data.scorito_giro_merge")
+def _(d):
+    d.real_only()
+
+    def run():
+        data_access.clear_cache()
+        return scorito_giro_data.load_giro_data()
+    return run
+
+
+@case("data.cycling_fantasy_prices")
+def _(d):
+    stats, prices = d.stats, d.cf_prices
+    return lambda: join_prices(stats['Renner'], prices, threshold=85)
+
+
+@case("data.het_spel")
+def _(d):
+    d.real_only()
+    load_csv_data = d.het_spel_page['load_csv_data']
+
+    def run():
+        data_access.clear_cache()
+        return load_csv_data()
+    return run
+
+
+@case("data.results_store")
+def _(d):
+    path = d.files['results']
+    return lambda: ResultsStore(path).refresh()
+
+
+# --- NAAM MATCHING ---
+@case("matching.giro_startlist")
+def _(d):
+    namen = d.giro_startlist
+    norm_to_stats = {normalize_name_logic(n): n for n in d.stats['Renner'].unique()}
+    return lambda: [match_naam_slim(n, norm_to_stats) for n in namen]
+
+
+@case("matching.scorito_evaluator_results")
+def _(d):
+    alle_renners = sorted(d.stats['Renner'].dropna().unique())
+    path = d.files['results']
+
+    def run():
+        store = ResultsStore(path)
+        store.refresh()
+        return store.matched("benchmark", lambda naam: match_uitslag_naam(naam, alle_renners))
+    return run
+
+
+@case("matching.het_spel_results")
+def _(d):
+    renners = d.het_spel[2]['alle_renners']
+    path = d.files['results']
+
+    def run():
+        store = ResultsStore(path)
+        store.refresh()
+        return store.matched("benchmark", het_spel._uitslag_matcher(renners))
+    return run
+
+
+@case("matching.het_spel_koppel_stats")
+def _(d):
+    df_p = d.sporza_prices
+    df_p = df_p[df_p['Renner'].isin(d.sample(df_p['Renner']))]
+    stats = d.stats
+    return lambda: het_spel.koppel_stats(df_p, stats)
+
+
+@case("matching.cycling_fantasy_names")
+def _(d):
+    prijs_namen = d.sample(d.cf_prices['Renner'].astype(str))
+    stats_namen = d.stats['Renner'].tolist()
+    return lambda: match_names(prijs_namen, stats_namen)
+
+
+# --- EV BEREKENINGEN ---
+def _ev_cases():
+    for i, method in enumerate(scorito_klassiekers.EV_METHODS, start=1):
+        @case(f"ev.scorito_klassiekers.{i}")
+        def _(d, method=method):
+            df, races, koers_map = d.scorito
+            return lambda: scorito_klassiekers.calculate_dynamic_ev(df, races, koers_map, method)
+
+    for i, method in enumerate(sporza_klassiekers.EV_METHODS, start=1):
+        @case(f"ev.sporza_klassiekers.{i}")
+        def _(d, method=method):
+            df, races, koers_map = d.sporza
+            return lambda: sporza_klassiekers.calculate_sporza_ev(df, races, koers_map, method)
+
+    for i, method in enumerate(cycling_fantasy.EV_METHODS, start=1):
+        @case(f"ev.cycling_fantasy.{i}")
+        def _(d, method=method):
+            df = d.cf_startlist
+
+            def run():
+                cycling_fantasy._ev_cache.clear()
+                return cycling_fantasy.calculate_cf_ev(df, 'COB', method)
+            return run
+
+    for i, method in enumerate(het_spel.EV_METHODS, start=1):
+        @case(f"ev.het_spel.{i}")
+        def _(d, method=method):
+            df, _, race_index = d.het_spel
+
+            def run():
+                race_index['ev'].pop(method, None)
+                return het_spel.build_ev(df, race_index, method)
+            return run
+
+
+_ev_cases()
+
+
+@case("ev.sporza_giro")
+def _(d):
+    df = d.giro
+    return lambda: giro_data.calculate_giro_ev(df)
+
+
+@case("ev.scorito_giro")
+def _(d):
+    df = d.scorito_giro
+    return lambda: scorito_giro_data.calculate_giro_ev(df)
+
+
+@case("ev.matrix")
+def _(d):
+    df, races = d.scorito_ev, d.scorito[1]
+    return lambda: build_ev_matrix(df, races)
+
+
+# --- SOLVERS ---
+@case("solver.scorito_knapsack")
+def _(d):
+    df = d.scorito_ev
+    return lambda: scorito_klassiekers.solve_knapsack_dynamic(df, 45000000, 43000000, 20, [], [], [])
+
+
+@case("solver.scorito_transfers")
+def _(d):
+    df, races, base = d.scorito_ev, d.scorito[1], d.scorito_base
+    moments = spread_moments(races, 3)
+    return lambda: scorito_klassiekers.rebuild_team_and_transfers(df, races, 45000000, 43000000, 20, base, moments, True)
+
+
+@case("solver.sporza_klassiekers")
+def _(d):
+    df, races = d.sporza_ev, d.sporza[1]
+    moments = spread_moments(races, 2)
+    return lambda: sporza_klassiekers.solve_sporza_dynamic(df, races, moments, [], [], [])
+
+
+@case("solver.sporza_giro")
+def _(d):
+    df = giro_data.calculate_giro_ev(d.giro)
+    return lambda: solve_giro_team(df, max_bud=100.0, max_ren=16, max_per_team=3, ev_column="Giro_EV")
+
+
+@case("solver.scorito_giro")
+def _(d):
+    df = scorito_giro_data.calculate_giro_ev(d.scorito_giro)
+    # De pagina rekent met max_bud=50, maar de 20 goedkoopste renners van de huidige startlijst kosten al meer;
+    # met een haalbaar budget meet de case een echte oplossing in plaats van een infeasible model
+    budget = max(50.0, float(df['Prijs'].nsmallest(20).sum()) * 1.5)
+    return lambda: solve_giro_team(df, max_bud=budget, max_ren=20, ev_column="EV")
+
+
+@case("solver.cycling_fantasy")
+def _(d):
+    solve_cf_team = page_namespace(CF_PAGE)['solve_cf_team']
+    df = cycling_fantasy.calculate_cf_ev(d.cf_startlist, 'COB', cycling_fantasy.EV_METHODS[0])
+    return lambda: solve_cf_team(df, 5000, [], [])
+
+
+@case("solver.het_spel_picks")
+def _(d):
+    ev = d.het_spel_ev
+    base = d.players[0]['custom_team']['data']['base']
+    return lambda: het_spel.optimize_picks(ev, base)
+
+
+@case("solver.replacements")
+def _(d):
+    df, races, base = d.scorito_ev, d.scorito[1], d.scorito_base
+    injured = base[:2]
+    return lambda: find_replacements(df, base, [], injured, races[len(races) // 2], 46000000, races)
+
+
+# --- EVALUATORS ---
+@case("evaluator.transfer_plans")
+def _(d):
+    df, races, base = d.scorito_ev, d.scorito[1], d.scorito_base
+    plans = random_plans(df, base, races, 200)
+
+    def run():
+        return evaluate_plans(build_ev_matrix(df, races), base, plans)
+    return run
+
+
+@case("evaluator.scorito_kopmannen")
+def _(d):
+    teams, koersen, stat_map = d.evaluator_teams
+    stats = d.stats.assign(**{'HLL/MTN': d.stats[['HLL', 'MTN']].max(axis=1)})
+    namen = stats['Renner'].to_numpy(dtype=object)
+    scores = stats[[stat_map.get(k, "COB") for k in koersen]].to_numpy(dtype=float)
+
+    def run():
+        res = {}
+        for naam, data in teams.items():
+            tl = OwnershipTimeline(data["Start"], data.get("Transfers", []), koersen)
+            res[naam] = top_k(scores, tl.owned_rows(namen), 6)
+        return res
+    return run
+
+
+# --- KLASSEMENT ---
+@case("leaderboard.het_spel")
+def _(d):
+    players, race_index = d.players, d.het_spel[2]
+    path = d.files['results']
+
+    def verify(data, signature):
+        return signature == generate_signature(data)
+
+    def run():
+        het_spel._standings.clear()
+        store = ResultsStore(path)
+        store.refresh()
+        return het_spel.het_spel_standings(players, race_index, store=store, verify=verify)
+    return run
+
+
+def measure(fn, repeat):
+    tijden = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        tijden.append(time.perf_counter() - start)
+    return {"min_sec": round(min(tijden), 5), "median_sec": round(statistics.median(tijden), 5), "runs": repeat}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def selected(only=None):
+    return [n for n in CASES if not only or any(n.startswith(prefix) for prefix in only)]
+
+
+def run(only=None, repeat=3, players=None, data=None, scale=None, seed=0):
+    """{'meta': {...}, 'cases': {name: {'min_sec', 'median_sec', 'runs'}, {'skipped'} or {'error'}}}."""
+    data = BenchData(players, scale, seed) if data is None else data
+    cases = {}
+    for name in selected(only):
+        try:
+            cases[name] = measure(CASES[name](data), repeat)
+        except SkipCase as e:
+            cases[name] = {"skipped": str(e)}
+        except Exception as e:
+            cases[name] = {"error": f"{type(e).__name__}: {e}"}
+    meta = {
+        "commit": _commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "players": data.n_players,
+        "scale": data.scale,
+    }
+    if data.scale:
+        meta["seed"] = data.seed
+        meta["sizes"] = synthetic_data.scale_sizes(data.scale)
+    return {"meta": meta, "cases": cases}
+
+
+def compare(res, base):
+    """Median of res divided by the median of the same case in base (> 1 is slower)."""
+    ratios = {}
+    for name, r in res["cases"].items():
+        b = base.get("cases", {}).get(name, {})
+        if "median_sec" in r and b.get("median_sec"):
+            ratios[name] = round(r["median_sec"] / b["median_sec"], 2)
+    return ratios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmark van alle hot paths op de echte of synthetische data.")
+    parser.add_argument("--only", nargs="+", help="Alleen cases die met een van deze prefixen beginnen (bv. ev. solver.sporza).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--players", type=int, help="Aantal spelers in het Het Spel klassement (standaard 50, bij --scale alle gebruikers).")
+    parser.add_argument("--scale", type=int, help="Synthetische data op deze schaal in plaats van data/ (1, 10, 100).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed van de synthetische data.")
+    parser.add_argument("--list", action="store_true", help="Toon alleen de namen van de cases.")
+    parser.add_argument("--compare", help="Vergelijk met een eerder JSON resultaat.")
+    parser.add_argument("--json", help="Schrijf het resultaat ook als JSON naar dit bestand.")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(selected(args.only)))
+        return None
+
+    res = run(args.only, args.repeat, args.players, scale=args.scale, seed=args.seed)
+    ratios = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            ratios = compare(res, json.load(f))
+    for name, r in res["cases"].items():
+        if "error" in r:
+            print(f"{name:<40} FOUT: {r['error']}")
+            continue
+        if "skipped" in r:
+            print(f"{name:<40} OVERGESLAGEN: {r['skipped']}")
+            continue
+        extra = f"  x{ratios[name]}" if name in ratios else ""
+        print(f"{name:<40} {r['median_sec']:>10.4f} s  (min {r['min_sec']:.4f}){extra}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    return res
+
+
+if __name__ == "__main__":
+    main()
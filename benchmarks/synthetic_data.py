@@ -0,0 +1,278 @@
+"""
+Synthetic, scaled-up datasets for load and scaling tests.
+
+The real data has ~900 riders, ~20 races and a handful of users. generate()
+makes datasets of any size with the same shapes:
+
+    stats       renners_stats.csv (Naam, Team, Nationaliteit, ..., AVG, COB, ...)
+    startlist   sporza_prijzen_startlijst.csv (short 'LASTNAME Firstname' names,
+                Prijs, Team and a 0/1 column per race)
+    results     uitslagen.csv (Race, Rnk, Rider, Team, UCI, Pnt, Time), with the
+                ' Lastname Firstname' names and DNFs of the real file
+    users       rows of the user table as the storage repository returns them
+                (username, created_at, custom_team, sporza_team), generated lazily
+
+Riders get a specialty (cobbles, hills, sprint, climbing, time trial, GC) and
+stats around it, races start the riders that suit them best, results follow
+the stats with noise, and prices follow AVG. Everything is drawn from one
+seeded numpy generator, so a (scale, seed) pair always gives the same data.
+
+game_frame() builds the frame the Klassiekers loaders return (full names,
+numeric stats, race columns, prices in Scorito or Sporza units) directly, so
+EV calculators, solvers, evaluators and the leaderboard can run at sizes where
+the loaders' fuzzy merges would take hours. write() stores the files, e.g.
+for rider_stats() and ResultsStore, or to point a copy of the app at them:
+
+    python -m benchmarks.synthetic_data --scale 10 --out data_x10
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+STAT_KOLOMMEN = ['AVG', 'FLT', 'COB', 'HLL', 'MTN', 'SPR', 'ITT', 'GC', 'OR', 'TTL']
+# Echte Sporza koersen eerst (zelfde stat als in de loaders), daarna verzonnen koersen
+SPORZA_KOERSEN = {
+    "OML": "COB", "KBK": "SPR", "SAM": "COB", "STR": "HLL", "NOK": "SPR", "BKC": "SPR", "MSR": "AVG",
+    "RVB": "SPR", "E3": "COB", "IFF": "SPR", "DDV": "COB", "RVV": "COB", "SP": "SPR", "PR": "COB",
+    "RVL": "SPR", "BRP": "HLL", "AGT": "HLL", "WAP": "HLL", "LBL": "HLL",
+}
+EXTRA_STATS = ['COB', 'HLL', 'SPR', 'AVG']
+# Specialiteit -> stats die er hoog bij liggen
+PROFIELEN = {
+    'kassei': ['COB', 'FLT', 'OR'], 'heuvel': ['HLL', 'OR'], 'sprint': ['SPR', 'FLT'],
+    'klimmer': ['MTN', 'HLL'], 'tijdrit': ['ITT', 'FLT'], 'klassement': ['GC', 'MTN', 'ITT'],
+}
+STARTERS_AANDEEL = 0.19
+FINISH_KANS = 0.85
+BASIS_TEAM = 10
+AANTAL_EXTRAS = 3
+
+VOORNAMEN = ["Wout", "Mathieu", "Tadej", "Jonas", "Remco", "Mads", "Jasper", "Tom", "Arnaud", "Tim", "Olav",
+             "Søren", "Mikel", "João", "Egan", "Primož", "Juan", "Filippo", "Biniam", "Kasper", "Toms", "Matej",
+             "Stefan", "Maxim", "Florian", "Neilson", "Nils", "Tiesj", "Axel", "Luca", "Romain", "Ben", "Magnus",
+             "Quinn", "Iván", "Dylan", "Alberto", "Thibau", "Jordi", "Ethan"]
+LETTERGREPEN = ["van", "der", "aert", "poel", "pog", "ača", "vin", "gaard", "ev", "ene", "ped", "ersen", "phil",
+                "ipsen", "pid", "cock", "lie", "mer", "lier", "ko", "oij", "kra", "gh", "sku", "jiņš", "moh",
+                "orič", "küng", "ver", "meer", "sch", "pol", "itt", "ben", "oot", "gan", "na", "ro", "lan", "dy"]
+LANDEN = ["Belgium", "Netherlands", "France", "Italy", "Spain", "Denmark", "Slovenia", "Great Britain",
+          "Germany", "Norway", "Switzerland", "Australia", "Colombia", "United States", "Latvia", "Portugal"]
+
+
+def scale_sizes(scale):
+    """Riders, races and users for a scale factor: 1x is about the real data, 10x is 10k riders, 60 races, 5k users."""
+    return {"riders": 1000 * scale, "races": min(60, 20 * scale), "users": 500 * scale}
+
+
+def race_codes(n):
+    """n race codes: the real Sporza races first, then K20, K21, ...; plus their race stat."""
+    codes = list(SPORZA_KOERSEN)[:n] + [f"K{i}" for i in range(len(SPORZA_KOERSEN), n)]
+    koers_map = {c: SPORZA_KOERSEN.get(c, EXTRA_STATS[i % len(EXTRA_STATS)]) for i, c in enumerate(codes)}
+    return codes, koers_map
+
+
+def _namen(rng, n):
+    gezien = set()
+    voornamen, achternamen = [], []
+    while len(voornamen) < n:
+        voornaam = VOORNAMEN[rng.integers(len(VOORNAMEN))]
+        delen = rng.choice(LETTERGREPEN, size=rng.integers(2, 4))
+        achternaam = "".join(delen).capitalize()
+        if rng.random() < 0.15:
+            achternaam = "van " + achternaam
+        if (voornaam, achternaam) in gezien:
+            continue
+        gezien.add((voornaam, achternaam))
+        voornamen.append(voornaam)
+        achternamen.append(achternaam)
+    return voornamen, achternamen
+
+
+def _stats(rng, n):
+    kwaliteit = rng.beta(2.0, 5.0, size=n)
+    profiel = rng.choice(list(PROFIELEN), size=n)
+    stats = {}
+    for col in STAT_KOLOMMEN[1:]:
+        sterk = np.isin(profiel, [p for p, cols in PROFIELEN.items() if col in cols])
+        waarde = 45 + kwaliteit * 35 + np.where(sterk, 18, -5) + rng.normal(0, 6, size=n)
+        stats[col] = np.clip(np.rint(waarde), 20, 99).astype(int)
+    stats['AVG'] = np.clip(np.rint(45 + kwaliteit * 50 + rng.normal(0, 3, size=n)), 20, 99).astype(int)
+    return {c: stats[c] for c in STAT_KOLOMMEN}
+
+
+def generate(riders, races, users=0, seed=0):
+    """
+    Dataset dict: 'stats', 'startlist' and 'results' frames, 'races' and
+    'koers_map', plus 'users' (a function returning a fresh iterator over the
+    user rows) and 'n_users'. Riders that start no race are kept in stats
+    but left out of the startlist, like riders without a Sporza price.
+    """
+    rng = np.random.default_rng(seed)
+    voornamen, achternamen = _namen(rng, riders)
+    n_teams = max(18, riders // 28)
+    teams = np.array([f"Team {LETTERGREPEN[i % len(LETTERGREPEN)].capitalize()} {i}" for i in range(n_teams)])[rng.integers(n_teams, size=riders)]
+    stats = _stats(rng, riders)
+
+    namen = [f"{v} {a}" for v, a in zip(voornamen, achternamen)]
+    df_stats = pd.DataFrame({
+        'Naam': namen,
+        'Team': teams,
+        'Nationaliteit': np.array(LANDEN)[rng.integers(len(LANDEN), size=riders)],
+        'Lengte': [f"{x} cm" for x in rng.integers(165, 195, size=riders)],
+        'Gewicht': [f"{x} kg" for x in rng.integers(55, 85, size=riders)],
+        'Leeftijd': [f"{x} jaar" for x in rng.integers(19, 39, size=riders)],
+        **stats,
+    })
+
+    codes, koers_map = race_codes(races)
+    n_starters = max(1, min(riders, round(STARTERS_AANDEEL * riders)))
+    start = np.zeros((riders, len(codes)), dtype=np.int8)
+    uitslagen = []
+    korte_namen = np.array([f"{a.upper()} {v}" for v, a in zip(voornamen, achternamen)], dtype=object)
+    uitslag_namen = np.array([f" {a} {v}" for v, a in zip(voornamen, achternamen)], dtype=object)
+    for k, code in enumerate(codes):
+        geschikt = stats[koers_map[code]] + rng.normal(0, 12, size=riders)
+        starters = np.argpartition(-geschikt, n_starters - 1)[:n_starters]
+        start[starters, k] = 1
+        # Uitslag: volgorde op de koers-stat met ruis, de laatsten als DNF
+        prestatie = stats[koers_map[code]][starters] + rng.normal(0, 8, size=len(starters))
+        volgorde = starters[np.argsort(-prestatie, kind='stable')]
+        n_finish = max(1, round(FINISH_KANS * len(volgorde)))
+        rnk = [str(i + 1) for i in range(n_finish)] + ["DNF"] * (len(volgorde) - n_finish)
+        tijd = ["04:53:55"] + [f"00:{min(59, i // 8):02d}" for i in range(1, len(volgorde))]
+        uitslagen.append(pd.DataFrame({
+            'Race': code, 'Rnk': rnk, 'Rider': uitslag_namen[volgorde], 'Team': teams[volgorde],
+            'UCI': np.maximum(0, 400 - np.arange(len(volgorde)) * 16), 'Pnt': np.maximum(0, 225 - np.arange(len(volgorde)) * 9),
+            'Time': tijd,
+        }))
+
+    rang = pd.Series(stats['AVG']).rank(pct=True, method='first').to_numpy()
+    startlist = pd.DataFrame({'Renner': korte_namen, 'Prijs': (4 + np.floor(rang * 10.999)).astype(int), 'Team': teams})
+    startlist = pd.concat([startlist, pd.DataFrame(start, columns=codes)], axis=1)
+    startlist = startlist[start.any(axis=1)].reset_index(drop=True)
+
+    dataset = {
+        'stats': df_stats, 'startlist': startlist, 'results': pd.concat(uitslagen, ignore_index=True),
+        'races': codes, 'koers_map': koers_map, 'n_users': users, 'seed': seed,
+        'kort_naar_naam': dict(zip(korte_namen, namen)),
+    }
+    dataset['users'] = lambda sign=None: iter_users(dataset, sign)
+    return dataset
+
+
+def prices(avg, game):
+    """Prices that follow AVG in the units of game ('scorito', 'sporza' or 'cycling_fantasy')."""
+    rang = pd.Series(avg).rank(pct=True, method='first').to_numpy()
+    if game == "scorito":
+        # 0.5M - 7M in stappen van 250k, zoals bron_startlijsten.csv
+        return (500000 + np.floor(rang * 26.999) * 250000).astype(int)
+    if game == "cycling_fantasy":
+        # 100 - 1200 credits in stappen van 50, zoals cf_prijzen.csv
+        return (100 + np.floor(rang * 22.999) * 50).astype(int)
+    return (4 + np.floor(rang * 10.999)).astype(int)
+
+
+def game_frame(dataset, game="sporza"):
+    """
+    (df, races, koers_map) shaped like load_game_data(game): full names in
+    Renner, int stats, 0/1 race columns, Prijs in the game's units, Team,
+    HLL/MTN and only riders that start at least one race.
+    """
+    from app_utils.data_access import compact_frame
+
+    stats = dataset['stats'].rename(columns={'Naam': 'Renner'})
+    start = dataset['startlist']
+    races = dataset['races']
+    # De startlijst gebruikt korte namen; de generator weet welke volledige naam erbij hoort
+    deelname = start[races].set_axis(start['Renner'].map(dataset['kort_naar_naam']).to_numpy()).reindex(stats['Renner']).fillna(0).astype(int)
+    df = stats.drop(columns=['Nationaliteit', 'Lengte', 'Gewicht', 'Leeftijd']).assign(
+        Prijs=prices(stats['AVG'].to_numpy(), game),
+        **{r: deelname[r].to_numpy() for r in races},
+    )
+    df['HLL/MTN'] = df[['HLL', 'MTN']].max(axis=1)
+    df = df[df[races].sum(axis=1) > 0].sort_values(by='Prijs', ascending=False, kind='stable').reset_index(drop=True)
+    koers_map = dict(dataset['koers_map'])
+    return compact_frame(df, race_cols=races), list(races), koers_map
+
+
+def giro_frame(dataset):
+    """Frame shaped like giro_data.load_giro_data(): Renner/Naam, Ploeg, int GC/SPR/ITT/MTN, Prijs in millions."""
+    df = dataset['stats'].rename(columns={'Naam': 'Renner'})
+    return df.assign(Naam=df['Renner'], Ploeg=df['Team'], Prijs=prices(df['AVG'].to_numpy(), "sporza").astype(float))
+
+
+def iter_users(dataset, sign=None):
+    """
+    The user rows, one at a time: a base team of BASIS_TEAM riders with
+    random extras, kopman and dark horse per race in custom_team (signed with
+    sign(data) when given), and a sporza_team with a 20-rider selection.
+    """
+    rng = random.Random(dataset['seed'])
+    renners = list(dataset['stats']['Naam'])
+    races = dataset['races']
+    begin = datetime(2026, 1, 1)
+    for u in range(dataset['n_users']):
+        base = rng.sample(renners, BASIS_TEAM)
+        picks = {}
+        for race in races:
+            extras = rng.sample(renners, AANTAL_EXTRAS)
+            picks[race] = {"extras": extras, "kopman": rng.choice(base + extras), "dark_horse": rng.choice(renners)}
+        data = {"base": base, "picks": picks}
+        selectie = rng.sample(renners, 20)
+        yield {
+            "username": f"speler{u}",
+            "created_at": (begin + timedelta(minutes=u)).isoformat(),
+            "custom_team": {"data": data, "signature": sign(data) if sign else None},
+            "sporza_team": {"selected_riders": selectie, "transfer_plan": [
+                {"uit": selectie[i], "in": rng.choice(renners), "moment": rng.choice(races[:-1] or races)} for i in range(3)
+            ]},
+        }
+
+
+def write(dataset, out_dir, users=True):
+    """Writes renners_stats.csv, sporza_prijzen_startlijst.csv, uitslagen.csv (and users.jsonl) to out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    paden = {
+        'stats': os.path.join(out_dir, "renners_stats.csv"),
+        'startlist': os.path.join(out_dir, "sporza_prijzen_startlijst.csv"),
+        'results': os.path.join(out_dir, "uitslagen.csv"),
+    }
+    dataset['stats'].to_csv(paden['stats'], sep="\t", index=False)
+    dataset['startlist'].to_csv(paden['startlist'], sep="\t", index=False)
+    with open(paden['results'], "w", encoding="utf-8", newline="") as f:
+        for i, (_, blok) in enumerate(dataset['results'].groupby('Race', sort=False)):
+            # Blokken per koers met een lege regel ertussen, zoals het echte bestand
+            f.write(blok.to_csv(sep="\t", index=False, header=i == 0))
+            f.write("\n")
+    if users:
+        paden['users'] = os.path.join(out_dir, "users.jsonl")
+        with open(paden['users'], "w", encoding="utf-8") as f:
+            for row in dataset['users']():
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return paden
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetische datasets op 1x/10x/100x schaal.")
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-users", action="store_true", help="Schrijf geen users.jsonl.")
+    parser.add_argument("--out", required=True, help="Map voor de CSV bestanden.")
+    args = parser.parse_args(argv)
+
+    sizes = scale_sizes(args.scale)
+    dataset = generate(**sizes, seed=args.seed)
+    paden = write(dataset, args.out, users=not args.no_users)
+    print(f"{sizes['riders']} renners, {sizes['races']} koersen, {len(dataset['results'])} uitslagregels, {sizes['users']} gebruikers")
+    for naam, pad in paden.items():
+        print(f"{naam:<10} {pad}")
+    return paden
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Solve-time benchmark for app_utils.transfer_planner.
+
+Runs the Scorito and Sporza transfer planner on the real data with 3, 5 and
+10 transfer moments (one transfer per moment, spread evenly over the season)
+and reports solve time and model size.
+
+    python -m benchmarks.transfer_planner
+    python -m benchmarks.transfer_planner --moments 3 5 10 --repeat 3 --json bench_transfer_planner.json
+"""
+
+import argparse
+import json
+import time
+
+from app_utils import scorito_klassiekers, sporza_klassiekers
+from app_utils.parameter_sweep import load_game_data
+from app_utils.transfer_planner import plan_transfers
+
+
+def spread_moments(available_races, n):
+    """n transfer moments spread evenly over all races except the last."""
+    kandidaten = available_races[:-1]
+    if n >= len(kandidaten):
+        return list(kandidaten)
+    stap = (len(kandidaten) - 1) / max(n - 1, 1)
+    return [kandidaten[round(j * stap)] for j in range(n)]
+
+
+def _scorito_case(n_moments):
+    df_raw, races, koers_map = load_game_data("scorito")
+    df = scorito_klassiekers.calculate_dynamic_ev(df_raw, races, koers_map, scorito_klassiekers.EV_METHODS[0])
+    moments = spread_moments(races, n_moments)
+    return lambda: plan_transfers(df, races, moments, 20, 45000000, single_move=True, time_limit=120)
+
+
+def _sporza_case(n_moments):
+    df_raw, races, koers_map = load_game_data("sporza")
+    df = sporza_klassiekers.calculate_sporza_ev(df_raw, races, koers_map, sporza_klassiekers.EV_METHODS[0])
+    moments = spread_moments(races, n_moments)
+    budgets = [sporza_klassiekers.sporza_budget(k) for k in range(n_moments + 1)]
+    return lambda: plan_transfers(
+        df, races, moments, 20, budgets, objective="starters", max_starters=12,
+        max_per_team=4, exact_transfers=True, time_limit=120
+    )
+
+
+CASES = {"scorito": _scorito_case, "sporza": _sporza_case}
+
+
+def run(games=("scorito", "sporza"), moment_counts=(3, 5, 10), repeat=1):
+    rows = []
+    for game in games:
+        for n in moment_counts:
+            solve = CASES[game](n)
+            tijden = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                res = solve()
+                tijden.append(time.perf_counter() - start)
+            rows.append({
+                "game": game,
+                "moments": n,
+                "status": res["status"],
+                "objective": round(res["objective"], 1),
+                "variables": res["variables"],
+                "constraints": res["constraints"],
+                "seconds_min": round(min(tijden), 3),
+                "seconds_mean": round(sum(tijden) / len(tijden), 3),
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark van de multi-period transfer planner.")
+    parser.add_argument("--games", nargs="+", choices=sorted(CASES), default=["scorito", "sporza"])
+    parser.add_argument("--moments", type=int, nargs="+", default=[3, 5, 10])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", help="Schrijf de resultaten ook als JSON naar dit bestand.")
+    args = parser.parse_args(argv)
+
+    rows = run(args.games, args.moments, args.repeat)
+    print(f"{'game':<8} {'moments':>7} {'status':<10} {'objective':>10} {'vars':>7} {'cons':>7} {'min s':>8} {'mean s':>8}")
+    for r in rows:
+        print(f"{r['game']:<8} {r['moments']:>7} {r['status']:<10} {r['objective']:>10} {r['variables']:>7} {r['constraints']:>7} {r['seconds_min']:>8} {r['seconds_mean']:>8}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
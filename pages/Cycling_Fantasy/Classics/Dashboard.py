@@ -2,11 +2,10 @@ import streamlit as st
 import pandas as pd
 import pulp
 import plotly.express as px
-from thefuzz import process, fuzz
-import io
-import re
-from pypdf import PdfReader
 import os
+from app_utils.cf_startlist import parse_pcs_riders, match_names, join_prices
+from app_utils.cycling_fantasy import EV_METHODS, calculate_cf_ev
+from app_utils.data_access import rider_stats
 
 # --- CONFIGURATIE ---
 st.set_page_config(page_title="Cycling Fantasy AI", layout="wide", page_icon="🚲")
@@ -26,24 +25,8 @@ def load_static_data():
             st.error(f"Bestand '{STATS_PATH}' niet gevonden in de root map.")
             return pd.DataFrame()
             
-        df_stats = pd.read_csv(STATS_PATH, sep='\t') 
-        if 'Naam' in df_stats.columns:
-            df_stats = df_stats.rename(columns={'Naam': 'Renner'})
-        if 'Team' not in df_stats.columns and 'Ploeg' in df_stats.columns:
-            df_stats = df_stats.rename(columns={'Ploeg': 'Team'})
-            
-        df_stats = df_stats.drop_duplicates(subset=['Renner'], keep='first')
-
-        all_stats_cols = ['COB', 'HLL', 'SPR', 'AVG', 'FLT', 'MTN', 'ITT', 'GC', 'OR', 'TTL']
-        for col in all_stats_cols:
-            if col not in df_stats.columns:
-                df_stats[col] = 0
-            df_stats[col] = pd.to_numeric(df_stats[col], errors='coerce').fillna(0).astype(int)
-
-        if 'Team' not in df_stats.columns:
-            df_stats['Team'] = 'Onbekend'
-        else:
-            df_stats['Team'] = df_stats['Team'].fillna('Onbekend')
+        # Genormaliseerde stats uit de gedeelde data-laag (Renner/Team, numerieke stats)
+        df_stats = rider_stats(STATS_PATH)
 
         # 2. Prijzen laden uit de root
         try:
@@ -57,23 +40,9 @@ def load_static_data():
         except Exception:
             df_prices = pd.DataFrame(columns=['Renner', 'Prijs'])
 
-        # Koppel prijzen aan de stats via Fuzzy Match
-        full_names = df_stats['Renner'].tolist()
-        
-        if not df_prices.empty:
-            # We doen een kleine pre-match om de merge sneller te maken
-            price_map = {}
-            for _, row in df_prices.iterrows():
-                match = process.extractOne(str(row['Renner']), full_names, scorer=fuzz.token_set_ratio)
-                if match and match[1] > 85:
-                    price_map[match[0]] = row['Prijs']
-            
-            df_stats['Prijs'] = df_stats['Renner'].map(price_map)
-        else:
-            df_stats['Prijs'] = 200
-
+        # Koppel prijzen aan de stats: exacte naam-join, fuzzy match alleen voor de rest
         # CF Regel: Niet in de lijst = 200 credits
-        df_stats['Prijs'] = df_stats['Prijs'].fillna(200).astype(int)
+        df_stats['Prijs'] = join_prices(df_stats['Renner'], df_prices, threshold=85).to_numpy()
         return df_stats
         
     except Exception as e:
@@ -82,27 +51,9 @@ def load_static_data():
 
 # --- PDF PARSER VOOR PCS STARTLIJSTEN ---
 def parse_pcs_pdf(uploaded_file):
+    # Pagina per pagina geparsed en gecached op de inhoud van het bestand
     try:
-        import pdfplumber
-        text = ""
-        with pdfplumber.open(uploaded_file) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-        
-        # Regex to find lines like: 123 VAN AERT Wout 100
-        # This is very brittle, usually better to look for patterns of uppercase words followed by Mixed case
-        import re
-        pattern = re.compile(r'\d+\s+([A-Z\s]+)\s+([A-Z][a-z\s]+)')
-
-        riders = []
-        for line in text.split('\n'):
-            match = pattern.search(line)
-            if match:
-                last_name = match.group(1).strip()
-                first_name = match.group(2).strip()
-                riders.append(f"{first_name} {last_name}")
-
-        return riders
+        return parse_pcs_riders(uploaded_file)
     except Exception as e:
         st.error(f"Error parsing PDF: {e}")
         return []
@@ -122,14 +73,7 @@ def process_startlist(uploaded_file, df_static):
             col_name = next((c for c in ['Renner', 'Rider', 'Naam', 'Name'] if c in df_start.columns), df_start.columns[0])
             df_start = df_start.rename(columns={col_name: 'Renner'})
         
-        full_names = df_static['Renner'].tolist()
-        
-        def match_name_upload(name):
-            if not name or pd.isna(name): return None
-            match = process.extractOne(str(name), full_names, scorer=fuzz.token_set_ratio)
-            return match[0] if match and match[1] > 75 else None
-            
-        df_start['Renner_Matched'] = df_start['Renner'].apply(match_name_upload)
+        df_start['Renner_Matched'] = match_names(df_start['Renner'].tolist(), df_static['Renner'].tolist(), threshold=75)
         df_start = df_start.dropna(subset=['Renner_Matched'])
         
         df_race = pd.merge(df_start[['Renner_Matched']], df_static, left_on='Renner_Matched', right_on='Renner', how='inner')
@@ -138,23 +82,6 @@ def process_startlist(uploaded_file, df_static):
         st.error(f"Fout bij verwerken startlijst: {e}")
         return pd.DataFrame()
 
-# --- CF EV CALCULATOR ---
-def calculate_cf_ev(df, stat, method):
-    df = df.copy()
-    df = df.sort_values(by=[stat, 'AVG'], ascending=[False, False]).reset_index(drop=True)
-    cf_pts = [45, 25, 22, 19, 17, 15, 14, 13, 12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
-    
-    df['CF_EV'] = 0.0
-    for i, idx in enumerate(df.index):
-        if "Ranking (CF Punten)" in method:
-            val = cf_pts[i] if i < len(cf_pts) else 0.0
-        else:
-            val = (df.loc[idx, stat] / 100)**4 * 45
-        df.at[idx, 'CF_EV'] = val
-        
-    df['Waarde (EV/Credit)'] = (df['CF_EV'] / df['Prijs']).replace([float('inf'), -float('inf')], 0).fillna(0).round(4)
-    return df
-
 # --- SOLVER ---
 def solve_cf_team(dataframe, total_budget, force_list, exclude_list):
     prob = pulp.LpProblem("CF_Solver", pulp.LpMaximize)
@@ -196,7 +123,7 @@ with st.sidebar:
         'Tijdrit (ITT)': 'ITT'
     }
     koers_type = st.selectbox("🏁 Type Koers:", list(stat_mapping.keys()))
-    ev_method = st.selectbox("🧮 Rekenmodel", ["1. Ranking (CF Punten)", "2. Macht 4 Curve"])
+    ev_method = st.selectbox("🧮 Rekenmodel", EV_METHODS)
     max_bud = st.number_input("💰 Budget (Credits)", value=5000, step=200, help="Maximaal aantal credits beschikbaar voor je Cycling Fantasy team.")
     
     df_race = pd.DataFrame()
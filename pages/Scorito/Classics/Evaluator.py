@@ -1,8 +1,13 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import os
 from app_utils.name_matching import match_uitslag_naam
+from app_utils.results_store import load_results
+from app_utils.data_access import rider_stats
+from app_utils.ownership import OwnershipTimeline
+from app_utils.captains import fill_captains, top_k
 
 # --- CONFIGURATIE ---
 st.set_page_config(page_title="Model Evaluator", layout="wide", page_icon="📊")
@@ -94,55 +99,23 @@ MIJN_EIGEN_KOPMANNEN = {
     
 }
 
-# --- HULPFUNCTIES VOOR NAAM-MATCHING ---
-def get_file_mod_time(filepath):
-    return os.path.getmtime(filepath) if os.path.exists(filepath) else 0
-
-@st.cache_data
-def load_data(stats_mod_time):
-    try:
-        df_stats = pd.read_csv("data/renners_stats.csv", sep='\t')
-        if len(df_stats.columns) < 3:
-            df_stats = pd.read_csv("data/renners_stats.csv", sep=None, engine='python')
-    except:
-        df_stats = pd.read_csv("data/renners_stats.csv", sep=None, engine='python')
-
-    if 'Naam' in df_stats.columns:
-        df_stats = df_stats.rename(columns={'Naam': 'Renner'})
-        
-    for col in ['COB', 'HLL', 'SPR', 'MTN', 'ITT']:
-        if col not in df_stats.columns:
-            df_stats[col] = 0
-            
+def load_data():
+    # Gedeelde stats uit de data-laag (één kopie per proces, ververst bij een nieuwe mtime)
+    df_stats = rider_stats()
     df_stats['HLL/MTN'] = df_stats[['HLL', 'MTN']].max(axis=1)
-    
-    if 'AVG' not in df_stats.columns:
-        df_stats['AVG'] = df_stats[['COB', 'HLL', 'SPR', 'MTN', 'ITT']].mean(axis=1).round(0)
-        
     alle_renners = sorted(df_stats['Renner'].dropna().unique())
     return df_stats, alle_renners
 
-stats_time = get_file_mod_time("data/renners_stats.csv")
-df_stats, alle_renners = load_data(stats_time)
+df_stats, alle_renners = load_data()
 
 st.divider()
 
 # --- GRAFIEK EN BEREKENING ---
-if not os.path.exists("data/uitslagen.csv"):
+results_store = load_results()
+if not results_store.columns:
     st.error("Bestand `uitslagen.csv` niet gevonden. Zorg dat dit bestand in de hoofddirectory staat.")
 else:
-    try:
-        df_raw_uitslagen = pd.read_csv("data/uitslagen.csv", sep='\t', engine='python')
-    except Exception as e:
-        try:
-             df_raw_uitslagen = pd.read_csv("data/uitslagen.csv", sep=None, engine='python')
-        except Exception as e2:
-             st.error(f"Fout bij inlezen van uitslagen.csv: {e2}")
-             st.stop()
-             
-    df_raw_uitslagen.columns = [str(c).strip().title() for c in df_raw_uitslagen.columns]
-
-    if 'Race' not in df_raw_uitslagen.columns or 'Rnk' not in df_raw_uitslagen.columns or 'Rider' not in df_raw_uitslagen.columns:
+    if 'Race' not in results_store.columns or 'Rnk' not in results_store.columns or 'Rider' not in results_store.columns:
         st.error("Het bestand uitslagen.csv mist de vereiste kolommen: Race, Rnk, Rider.")
     else:
         sporza_naar_scorito_map = {
@@ -157,24 +130,12 @@ else:
             'WAP': 'WP'
         }
         
-        def process_result_row(row):
-            rank_str = str(row['Rnk']).strip().upper()
-            if rank_str in ['DNS', 'NAN', '']:
-                return None
-
-            koers_origineel = str(row['Race']).strip().upper()
-            koers = sporza_naar_scorito_map.get(koers_origineel, koers_origineel)
-            rider_name = str(row['Rider']).strip()
-            gekoppelde_naam = match_uitslag_naam(rider_name, alle_renners)
-            rank = int(rank_str) if rank_str.isdigit() else 999 
-            return {
-                "Koers": koers, 
-                "Rank": rank, 
-                "Renner": gekoppelde_naam
-            }
-
-        uitslag_parsed = df_raw_uitslagen.apply(process_result_row, axis=1).dropna().tolist()
-        df_uitslagen = pd.DataFrame(uitslag_parsed)
+        df_matched = results_store.matched(("scorito_evaluator", hash(tuple(alle_renners))), lambda naam: match_uitslag_naam(naam, alle_renners))
+        df_uitslagen = pd.DataFrame({
+            "Koers": df_matched['Race'].replace(sporza_naar_scorito_map),
+            "Rank": pd.to_numeric(df_matched['Rnk'].where(df_matched['Rnk'].str.isdigit()), errors='coerce').fillna(999).astype(int),
+            "Renner": df_matched['Renner'],
+        })
         
         if df_uitslagen.empty:
             st.error("Kon geen enkele renner succesvol matchen. Controleer of de namen in uitslagen.csv kloppen.")
@@ -188,10 +149,20 @@ else:
             resultaten_lijst = []
             details_lijst = []
 
+            timelines = {naam: OwnershipTimeline(data["Start"], data.get("Transfers", []), ALLE_KOERSEN) for naam, data in HARDCODED_TEAMS.items()}
+
+            # Kopman-ranglijst per model en koers in één keer: gestarte renners uit de actieve selectie, gesorteerd op de koers-stat
+            stat_namen = df_stats['Renner'].to_numpy(dtype=object)
+            koers_idx = [ALLE_KOERSEN.index(k) for k in verreden_koersen]
+            stat_scores = np.column_stack([df_stats[STAT_MAPPING.get(k, "COB")].to_numpy(dtype=float) for k in verreden_koersen])
+            gestart = np.column_stack([df_stats['Renner'].isin(df_uitslagen.loc[df_uitslagen['Koers'] == k, 'Renner']).to_numpy() for k in verreden_koersen])
+            kopman_ranglijst = {}
+            for naam, tl in timelines.items():
+                rijen = top_k(stat_scores, tl.owned_rows(stat_namen)[:, koers_idx] & gestart, 6)
+                kopman_ranglijst[naam] = {k: [stat_namen[i] for i in rijen[j] if i >= 0] for j, k in enumerate(verreden_koersen)}
+
             for koers in verreden_koersen:
-                koers_stat = STAT_MAPPING.get(koers, "COB")
                 df_koers_uitslag = df_uitslagen[df_uitslagen['Koers'] == koers]
-                idx_current_race = ALLE_KOERSEN.index(koers)
                 
                 winnende_ploegen = {}
                 for pos in [1, 2, 3]:
@@ -202,49 +173,15 @@ else:
                         winnende_ploegen[pos] = ploeg[0] if len(ploeg) > 0 else "Onbekend"
 
                 for model_naam, model_data in HARDCODED_TEAMS.items():
-                    actieve_selectie = list(model_data["Start"])
-                    for t in model_data.get("Transfers", []):
-                        moment_koers = t["moment"]
-                        if moment_koers in ALLE_KOERSEN:
-                            idx_moment = ALLE_KOERSEN.index(moment_koers)
-                            if idx_current_race > idx_moment:
-                                if t["uit"] in actieve_selectie:
-                                    actieve_selectie.remove(t["uit"])
-                                if t["in"] not in actieve_selectie:
-                                    actieve_selectie.append(t["in"])
-                    
+                    actieve_selectie = timelines[model_naam].team_in(koers)
+
                     beschikbare_renners = [r for r in actieve_selectie if r in df_koers_uitslag['Renner'].values]
                     
-                    c1, c2, c3 = None, None, None
+                    vast = ()
                     if model_naam == "Sander's Team":
                         geplande_kopmannen = MIJN_EIGEN_KOPMANNEN.get(koers, {})
-                        c1_intended = geplande_kopmannen.get("C1")
-                        c2_intended = geplande_kopmannen.get("C2")
-                        c3_intended = geplande_kopmannen.get("C3")
-                        
-                        if c1_intended in beschikbare_renners: c1 = c1_intended
-                        if c2_intended in beschikbare_renners: c2 = c2_intended
-                        if c3_intended in beschikbare_renners: c3 = c3_intended
-                            
-                    team_stats = df_stats[df_stats['Renner'].isin(beschikbare_renners)].copy()
-                    team_stats = team_stats.sort_values(by=koers_stat, ascending=False).reset_index(drop=True)
-                    
-                    reeds_kopman = [x for x in [c1, c2, c3] if x is not None]
-                    for r in team_stats['Renner'].tolist():
-                        if c1 is not None and c2 is not None and c3 is not None:
-                            break
-                        if r in reeds_kopman:
-                            continue
-                            
-                        if c1 is None:
-                            c1 = r
-                            reeds_kopman.append(r)
-                        elif c2 is None:
-                            c2 = r
-                            reeds_kopman.append(r)
-                        elif c3 is None:
-                            c3 = r
-                            reeds_kopman.append(r)
+                        vast = [geplande_kopmannen.get(c) if geplande_kopmannen.get(c) in beschikbare_renners else None for c in ["C1", "C2", "C3"]]
+                    c1, c2, c3 = fill_captains(kopman_ranglijst[model_naam][koers], vast)
 
                     koers_score = 0
                     for renner in actieve_selectie:
@@ -1,12 +1,21 @@
 import streamlit as st
 import pandas as pd
-import pulp
 import json
 import os
 import itertools
-from app_utils.db import init_connection
+from app_utils.storage import get_repository
+from app_utils.ev_matrix import build_ev_matrix, evaluate_plans
+from app_utils.results_store import load_results
+from app_utils.parameter_sweep import build_grid, run_sweep, summarize_sweep, inclusion_frequencies
 from datetime import datetime
-from app_utils.name_matching import normalize_name_logic, match_naam_slim, match_uitslag_naam
+from app_utils.name_matching import match_uitslag_naam
+from app_utils.rider_types import klassieker_types
+from app_utils.race_status import active_roster, race_status_matrix, rol_en_moment
+from app_utils.ownership import OwnershipTimeline
+from app_utils.scorito_klassiekers import (
+    EV_METHODS, get_file_mod_time, evaluate_plan_ev, load_and_merge_data,
+    calculate_dynamic_ev, solve_knapsack_dynamic, find_emergency_replacements, rebuild_team_and_transfers
+)
 
 # --- CONFIGURATIE ---
 st.set_page_config(page_title="Scorito Klassiekers AI", layout="wide", page_icon="🏆")
@@ -18,108 +27,28 @@ if "ingelogde_speler" not in st.session_state:
 
 speler_naam = st.session_state["ingelogde_speler"]
 
-supabase = init_connection()
 TABEL_NAAM = st.secrets.get("TABEL_NAAM", "gebruikers_data_test")
+repo = get_repository(TABEL_NAAM)
 
 # --- HULPFUNCTIES ---
-def get_file_mod_time(filepath):
-    return os.path.getmtime(filepath) if os.path.exists(filepath) else 0
+SPORZA_NAAR_SCORITO = {'OML': 'OHN', 'STR': 'SB', 'RVB': 'BDP', 'IFF': 'GW', 'BRP': 'BP', 'AGT': 'AGR', 'WAP': 'WP'}
 
 def get_verreden_koersen():
-    if os.path.exists("data/uitslagen.csv"):
-        try:
-            df_u = pd.read_csv("data/uitslagen.csv", sep='\t', engine='python')
-            if 'Race' not in df_u.columns:
-                df_u = pd.read_csv("data/uitslagen.csv", sep=None, engine='python')
-            if 'Race' in df_u.columns:
-                sporza_naar_scorito_map = {'OML': 'OHN', 'STR': 'SB', 'RVB': 'BDP', 'IFF': 'GW', 'BRP': 'BP', 'AGT': 'AGR', 'WAP': 'WP'}
-                races = [str(x).strip().upper() for x in df_u['Race'].unique()]
-                return [sporza_naar_scorito_map.get(r, r) for r in races]
-        except:
-            pass
-    return []
-
-@st.cache_data
-def get_uitslagen(file_mod_time, alle_renners):
-    if not os.path.exists("data/uitslagen.csv"):
-        return pd.DataFrame()
     try:
-        df_raw_uitslagen = pd.read_csv("data/uitslagen.csv", sep=None, engine='python')
-        df_raw_uitslagen.columns = [str(c).strip().title() for c in df_raw_uitslagen.columns]
-        
-        if 'Race' not in df_raw_uitslagen.columns or 'Rider' not in df_raw_uitslagen.columns or 'Rnk' not in df_raw_uitslagen.columns:
+        return [SPORZA_NAAR_SCORITO.get(r, r) for r in load_results().races()]
+    except:
+        return []
+
+def get_uitslagen(alle_renners):
+    try:
+        store = load_results()
+        df_u = store.matched(("scorito_klassiekers", hash(tuple(alle_renners))), lambda naam: match_uitslag_naam(naam, alle_renners))
+        if df_u.empty:
             return pd.DataFrame()
-            
-        sporza_naar_scorito_map = {
-            'OML': 'OHN', 'STR': 'SB', 'RVB': 'BDP', 
-            'IFF': 'GW', 'BRP': 'BP', 'AGT': 'AGR', 'WAP': 'WP'
-        }
-            
-        uitslag_parsed = []
-        match_cache = {}
-        for race, rnk, rider in zip(df_raw_uitslagen['Race'], df_raw_uitslagen['Rnk'], df_raw_uitslagen['Rider']):
-            koers_origineel = str(race).strip().upper()
-            koers = sporza_naar_scorito_map.get(koers_origineel, koers_origineel)
-            
-            rank_str = str(rnk).strip().upper()
-            if rank_str in ['DNS', 'NAN', '']:
-                continue
-            
-            rider_name = str(rider).strip()
-            if rider_name not in match_cache:
-                match_cache[rider_name] = match_uitslag_naam(rider_name, alle_renners)
-            gekoppelde_naam = match_cache[rider_name]
-            
-            uitslag_parsed.append({
-                "Race": koers,
-                "Rnk": rank_str,
-                "Renner": gekoppelde_naam
-            })
-        return pd.DataFrame(uitslag_parsed)
+        return df_u.assign(Race=df_u['Race'].replace(SPORZA_NAAR_SCORITO))
     except:
         return pd.DataFrame()
 
-def evaluate_plan_ev(df_eval, base_team, plan, available_races):
-    current_active = set(base_team)
-    totaal = 0
-    for race in available_races:
-        for t in plan:
-            if t['moment'] == race:
-                if t['uit'] in current_active: current_active.remove(t['uit'])
-                current_active.add(t['in'])
-        for r in current_active:
-            res = df_eval.loc[df_eval['Renner'] == r, f'EV_{race}']
-            if not res.empty: 
-                totaal += res.values[0]
-    return totaal
-
-def bepaal_klassieker_type(row):
-    cob, hll, spr = row.get('COB', 0), row.get('HLL', 0), row.get('SPR', 0)
-    elite = []
-    if cob >= 85: elite.append('Kassei')
-    if hll >= 85: elite.append('Heuvel')
-    if spr >= 85: elite.append('Sprint')
-    if len(elite) == 3: return 'Allround / Multispecialist'
-    elif len(elite) == 2: return ' / '.join(elite)
-    elif len(elite) == 1: return elite[0]
-    else:
-        s = {'Kassei': cob, 'Heuvel': hll, 'Sprint': spr, 'Klimmer': row.get('MTN', 0), 'Tijdrit': row.get('ITT', 0), 'Klassement': row.get('GC', 0)}
-        return max(s, key=s.get) if sum(s.values()) > 0 else 'Onbekend'
-
-def get_numeric_status(is_on_startlist, is_starter, is_verreden=False, rank_str=None):
-    if is_verreden:
-        if rank_str and str(rank_str) not in ['nan', 'None', 'DNS', '']:
-            if str(rank_str).isdigit():
-                return int(rank_str)
-            else:
-                return 996 # DNF
-        else:
-            return 996 if is_on_startlist else 999
-    else:
-        if is_on_startlist:
-            return 997 if is_starter else 998
-        return 999
-
 def format_race_status(val, limit):
     if pd.isna(val) or val == '': return ""
     try:
@@ -133,238 +62,6 @@ def format_race_status(val, limit):
     except:
         return str(val)
 
-# --- AANGEPASTE DATA LADEN ---
-@st.cache_data
-def load_and_merge_data(prog_mod_time, scorito_mod_time, stats_mod_time):
-    try:
-        # 1. SPORZA LADEN (BASIS)
-        df_prog = pd.read_csv("data/sporza_prijzen_startlijst.csv", sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
-        df_prog.columns = df_prog.columns.str.strip()
-        if 'Naam' in df_prog.columns: df_prog = df_prog.rename(columns={'Naam': 'Renner'})
-        if 'Prijs' in df_prog.columns: df_prog = df_prog.drop(columns=['Prijs'])
-        
-        if 'PN' in df_prog.columns: df_prog = df_prog.drop(columns=['PN'])
-        if 'TA' in df_prog.columns: df_prog = df_prog.drop(columns=['TA'])
-        
-        sporza_to_scorito = {'OML': 'OHN', 'STR': 'SB', 'RVB': 'BDP', 'IFF': 'GW', 'BRP': 'BP', 'AGT': 'AGR', 'WAP': 'WP'}
-        df_prog = df_prog.rename(columns=sporza_to_scorito)
-        
-        # 2. SCORITO LADEN (PRIJZEN + PN + TA)
-        df_scorito = pd.read_csv("data/bron_startlijsten.csv", sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
-        df_scorito.columns = df_scorito.columns.str.strip()
-        if 'Naam' in df_scorito.columns: df_scorito = df_scorito.rename(columns={'Naam': 'Renner'})
-        
-        if 'Prijs' not in df_scorito.columns and df_scorito['Renner'].astype(str).str.contains(r'\(.*\)', regex=True).any():
-            extracted = df_scorito['Renner'].str.extract(r'^(.*?)\s*\(([\d\.]+)[Mm]\)')
-            df_scorito['Renner'] = extracted[0].str.strip()
-            df_scorito['Prijs'] = pd.to_numeric(extracted[1], errors='coerce') * 1000000
-        if 'Prijs' in df_scorito.columns:
-            df_scorito['Prijs'] = df_scorito['Prijs'].fillna(0)
-            df_scorito.loc[df_scorito['Prijs'] == 800000, 'Prijs'] = 750000
-            
-        scorito_cols = ['Renner', 'Prijs']
-        if 'PN' in df_scorito.columns: scorito_cols.append('PN')
-        if 'TA' in df_scorito.columns: scorito_cols.append('TA')
-        df_prijzen = df_scorito[scorito_cols].drop_duplicates(subset=['Renner'])
-
-        # 3. STATS LADEN
-        df_stats = pd.read_csv("data/renners_stats.csv", sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
-        df_stats.columns = df_stats.columns.str.strip()
-        if 'Naam' in df_stats.columns: df_stats = df_stats.rename(columns={'Naam': 'Renner'})
-        if 'Team' not in df_stats.columns and 'Ploeg' in df_stats.columns: df_stats = df_stats.rename(columns={'Ploeg': 'Team'})
-        df_stats = df_stats.drop_duplicates(subset=['Renner'], keep='first')
-        
-        # 4. MERGE SPORZA (BASIS) EN SCORITO (PRIJS/PN/TA) - VIA OUTER JOIN
-        scorito_names = df_prijzen['Renner'].unique()
-        norm_to_scorito = {normalize_name_logic(n): n for n in scorito_names}
-        df_prog['Renner_Scorito'] = df_prog['Renner'].apply(lambda x: match_naam_slim(x, norm_to_scorito))
-        
-        merged_df = pd.merge(df_prog, df_prijzen, left_on='Renner_Scorito', right_on='Renner', how='outer')
-        merged_df['Renner'] = merged_df['Renner_x'].fillna(merged_df['Renner_y']) 
-        merged_df = merged_df.drop(columns=['Renner_x', 'Renner_y', 'Renner_Scorito'])
-        
-        # 5. MERGE STATS
-        stats_names = df_stats['Renner'].unique()
-        norm_to_stats = {normalize_name_logic(n): n for n in stats_names}
-        merged_df['Renner_Stats'] = merged_df['Renner'].apply(lambda x: match_naam_slim(x, norm_to_stats))
-        merged_df = pd.merge(merged_df, df_stats, left_on='Renner_Stats', right_on='Renner', how='left', suffixes=('', '_drop2'))
-        merged_df = merged_df.drop(columns=[c for c in merged_df.columns if '_drop' in c or 'Renner_' in c])
-        
-        merged_df['Prijs'] = pd.to_numeric(merged_df['Prijs'], errors='coerce').fillna(0).astype(int)
-        merged_df = merged_df[merged_df['Prijs'] > 0].sort_values(by='Prijs', ascending=False).drop_duplicates(subset=['Renner'])
-        
-        # 6. SCHOONMAAK & TOTALEN
-        ALLE_KOERSEN = ['OHN', 'KBK', 'SB', 'PN', 'TA', 'MSR', 'BDP', 'E3', 'GW', 'DDV', 'RVV', 'SP', 'PR', 'BP', 'AGR', 'WP', 'LBL']
-        available_races = [k for k in ALLE_KOERSEN if k in merged_df.columns]
-        
-        for col in available_races + ['COB', 'HLL', 'SPR', 'AVG', 'MTN', 'ITT']:
-            if col not in merged_df.columns: merged_df[col] = 0
-            merged_df[col] = pd.to_numeric(merged_df[col], errors='coerce').fillna(0).astype(int)
-            
-        merged_df['HLL/MTN'] = merged_df[['HLL', 'MTN']].max(axis=1)
-        merged_df['Total_Races'] = merged_df[available_races].sum(axis=1)
-        
-        merged_df = merged_df[merged_df['Total_Races'] > 0]
-        
-        merged_df['Team'] = merged_df.get('Team', pd.Series(['Onbekend']*len(merged_df))).fillna('Onbekend')
-        koers_stat_map = {'OHN':'COB','KBK':'SPR','SB':'HLL','PN':'HLL/MTN','TA':'SPR','MSR':'AVG','BDP':'SPR','E3':'COB','GW':'SPR','DDV':'COB','RVV':'COB','SP':'SPR','PR':'COB','BP':'HLL','AGR':'HLL','WP':'HLL','LBL':'HLL'}
-        
-        return merged_df, available_races, koers_stat_map
-    except Exception as e:
-        st.error(f"Fout in dataverwerking: {e}")
-        return pd.DataFrame(), [], {}
-
-def calculate_dynamic_ev(df, available_races, koers_stat_map, method, skip_races=[]):
-    df = df.copy()
-    scorito_pts = [100, 90, 80, 72, 64, 58, 52, 46, 40, 36, 32, 28, 24, 20, 16, 14, 12, 10, 8, 6]
-    
-    race_evs = {}
-    for koers in available_races:
-        stat = koers_stat_map.get(koers, 'AVG')
-        starters = df[df[koers] == 1].copy()
-        starters = starters.sort_values(by=[stat, 'AVG'], ascending=[False, False])
-        
-        race_ev = pd.Series(0.0, index=df.index)
-        if koers not in skip_races:
-            for i, idx in enumerate(starters.index):
-                val = 0.0
-                if "Scorito Ranking" in method:
-                    val = scorito_pts[i] if i < len(scorito_pts) else 0.0
-                elif "Originele Curve" in method:
-                    val = (starters.loc[idx, stat] / 100)**4 * 100
-                elif "Extreme Curve" in method:
-                    val = (starters.loc[idx, stat] / 100)**10 * 100
-                elif "Tiers" in method:
-                    if i < 3: val = 80.0
-                    elif i < 8: val = 45.0
-                    elif i < 15: val = 20.0
-                    else: val = 0.0
-                    
-                if i == 0: val *= 3.0
-                elif i == 1: val *= 2.5
-                elif i == 2: val *= 2.0
-                race_ev.loc[idx] = val
-        race_evs[koers] = race_ev
-        df[f'EV_{koers}'] = race_ev
-
-    df['EV_all'] = sum(race_evs.values()) if race_evs else 0.0
-    df['Scorito_EV'] = df['EV_all'].fillna(0).round(0).astype(int)
-    df['Waarde (EV/M)'] = (df['Scorito_EV'] / (df['Prijs'] / 1000000)).replace([float('inf'), -float('inf')], 0).fillna(0).round(1)
-    return df
-
-# --- SOLVERS ---
-def solve_knapsack_dynamic(df, total_budget, min_budget, max_riders, force_base, ban_base, exclude_list):
-    prob = pulp.LpProblem("Scorito_Solver", pulp.LpMaximize)
-    x = pulp.LpVariable.dicts("Base", df.index, cat='Binary')
-    
-    prob += pulp.lpSum([df.loc[i, 'EV_all'] * x[i] for i in df.index])
-    prob += pulp.lpSum([x[i] for i in df.index]) == max_riders
-    prob += pulp.lpSum([df.loc[i, 'Prijs'] * x[i] for i in df.index]) <= total_budget
-    prob += pulp.lpSum([df.loc[i, 'Prijs'] * x[i] for i in df.index]) >= min_budget
-    
-    for i in df.index:
-        renner = df.loc[i, 'Renner']
-        if renner in force_base: prob += x[i] == 1
-        if renner in ban_base: prob += x[i] == 0
-        if renner in exclude_list: prob += x[i] == 0
-
-    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=15))
-    if pulp.LpStatus[prob.status] == 'Optimal':
-        return [df.loc[i, 'Renner'] for i in df.index if x[i].varValue > 0.5]
-    return []
-
-def find_emergency_replacements(df_eval, base_team, transfer_plan, injured_riders, last_race, max_budget, available_races):
-    all_historical_riders = set(base_team + [t['in'] for t in transfer_plan])
-    candidates = df_eval[~df_eval['Renner'].isin(all_historical_riders)].copy()
-    idx = available_races.index(last_race)
-    remaining_races = available_races[idx+1:]
-    candidates['EV_remaining'] = candidates[[f'EV_{r}' for r in remaining_races]].sum(axis=1)
-    
-    prob = pulp.LpProblem("Noodwissel", pulp.LpMaximize)
-    vars = pulp.LpVariable.dicts("C", candidates.index, cat='Binary')
-    
-    prob += pulp.lpSum([candidates.loc[i, 'EV_remaining'] * vars[i] for i in candidates.index])
-    prob += pulp.lpSum([vars[i] for i in candidates.index]) == len(injured_riders)
-    
-    current_team = set(base_team)
-    for race in available_races[:idx+1]:
-        for t in transfer_plan:
-            if t['moment'] == race:
-                if t['uit'] in current_team: current_team.remove(t['uit'])
-                current_team.add(t['in'])
-                
-    for inj in injured_riders:
-        if inj in current_team: current_team.remove(inj)
-            
-    base_cost_now = df_eval[df_eval['Renner'].isin(current_team)]['Prijs'].sum()
-    prob += base_cost_now + pulp.lpSum([candidates.loc[i, 'Prijs'] * vars[i] for i in candidates.index]) <= max_budget
-    
-    temp_team = set(current_team)
-    for race in available_races[idx+1:]:
-        changed = False
-        for t in transfer_plan:
-            if t['moment'] == race:
-                if t['uit'] in temp_team: temp_team.remove(t['uit'])
-                temp_team.add(t['in'])
-                changed = True
-        if changed:
-            cost_future = df_eval[df_eval['Renner'].isin(temp_team)]['Prijs'].sum()
-            prob += cost_future + pulp.lpSum([candidates.loc[i, 'Prijs'] * vars[i] for i in candidates.index]) <= max_budget
-            
-    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=10))
-    if pulp.LpStatus[prob.status] == 'Optimal':
-        return [candidates.loc[i, 'Renner'] for i in candidates.index if vars[i].varValue > 0.5]
-    return []
-
-def rebuild_team_and_transfers(df, max_bud, min_bud, max_ren, new_base_team, t_moments, use_transfers):
-    if not use_transfers: return new_base_team, []
-    prob = pulp.LpProblem("Scorito_Rebuild_Solver", pulp.LpMaximize)
-    x = pulp.LpVariable.dicts("Base", df.index, cat='Binary')
-    
-    y_vars = [pulp.LpVariable.dicts(f"Y{k}", df.index, cat='Binary') for k in range(3)]
-    z_vars = [pulp.LpVariable.dicts(f"Z{k}", df.index, cat='Binary') for k in range(3)]
-    
-    obj = pulp.lpSum([x[i] * df.loc[i, 'EV_all'] for i in df.index])
-    for k in range(3):
-        split_idx = available_races.index(t_moments[k]) + 1 if t_moments[k] != 'GEEN' else len(available_races)
-        races_before = available_races[:split_idx]
-        races_after = available_races[split_idx:]
-        df[f'EV_y{k}'] = df[[f'EV_{r}' for r in races_before]].sum(axis=1) if races_before else 0.0
-        df[f'EV_z{k}'] = df[[f'EV_{r}' for r in races_after]].sum(axis=1) if races_after else 0.0
-        obj += pulp.lpSum([y_vars[k][i] * df.loc[i, f'EV_y{k}'] + z_vars[k][i] * df.loc[i, f'EV_z{k}'] for i in df.index])
-        
-    prob += obj
-    for i in df.index:
-        prob += x[i] + y_vars[0][i] + y_vars[1][i] + y_vars[2][i] + z_vars[0][i] + z_vars[1][i] + z_vars[2][i] <= 1
-        renner = df.loc[i, 'Renner']
-        if renner in new_base_team:
-            prob += x[i] + sum([y_vars[k][i] for k in range(3)]) == 1
-        else:
-            prob += x[i] + sum([y_vars[k][i] for k in range(3)]) == 0
-
-    for k in range(3):
-        prob += pulp.lpSum([y_vars[k][i] for i in df.index]) <= 1  
-        prob += pulp.lpSum([y_vars[k][i] for i in df.index]) == pulp.lpSum([z_vars[k][i] for i in df.index]) 
-        
-    prob += pulp.lpSum([x[i] for i in df.index]) + pulp.lpSum([y_vars[0][i] for i in df.index]) + pulp.lpSum([y_vars[1][i] for i in df.index]) + pulp.lpSum([y_vars[2][i] for i in df.index]) == max_ren
-    prob += pulp.lpSum([(x[i] + y_vars[0][i] + y_vars[1][i] + y_vars[2][i]) * df.loc[i, 'Prijs'] for i in df.index]) <= max_bud
-    prob += pulp.lpSum([(x[i] + z_vars[0][i] + y_vars[1][i] + y_vars[2][i]) * df.loc[i, 'Prijs'] for i in df.index]) <= max_bud
-    prob += pulp.lpSum([(x[i] + z_vars[0][i] + z_vars[1][i] + y_vars[2][i]) * df.loc[i, 'Prijs'] for i in df.index]) <= max_bud
-    prob += pulp.lpSum([(x[i] + z_vars[0][i] + z_vars[1][i] + z_vars[2][i]) * df.loc[i, 'Prijs'] for i in df.index]) <= max_bud
-
-    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=15))
-    if pulp.LpStatus[prob.status] == 'Optimal':
-        base_team_res = [df.loc[i, 'Renner'] for i in df.index if x[i].varValue > 0.5]
-        transfer_plan_res = []
-        for k in range(3):
-            uit = [df.loc[i, 'Renner'] for i in df.index if y_vars[k][i].varValue > 0.5]
-            erin = [df.loc[i, 'Renner'] for i in df.index if z_vars[k][i].varValue > 0.5]
-            if uit and erin:
-                transfer_plan_res.append({"uit": uit[0], "in": erin[0], "moment": t_moments[k]})
-                base_team_res.append(uit[0])
-        return base_team_res, transfer_plan_res
-    return None, None
-
 # --- HOOFDCODE ---
 prog_t = get_file_mod_time("data/sporza_prijzen_startlijst.csv")
 scor_t = get_file_mod_time("data/bron_startlijsten.csv")
@@ -388,15 +85,16 @@ with st.sidebar:
             if st.button("💾 Opslaan", type="primary", use_container_width=True):
                 try:
                     team_data = {"selected_riders": st.session_state.selected_riders, "transfer_plan": st.session_state.transfer_plan, "ts": datetime.now().strftime("%Y-%m-%d %H:%M")}
-                    supabase.table(TABEL_NAAM).update({"scorito_team": team_data}).eq("username", speler_naam).execute()
-                    st.success("Cloud-backup geslaagd!")
+                    if repo.save_game_state(speler_naam, "scorito_team", team_data):
+                        st.success("Cloud-backup geslaagd!")
+                    else:
+                        st.error(f"Niet opgeslagen: geen account gevonden voor {speler_naam}.")
                 except Exception as e: st.error(f"Fout: {e}")
         with c_cloud2:
             if st.button("🔄 Inladen", use_container_width=True):
                 try:
-                    res = supabase.table(TABEL_NAAM).select("scorito_team").eq("username", speler_naam).execute()
-                    if res.data and res.data[0].get('scorito_team'):
-                        d = res.data[0]['scorito_team']
+                    d = repo.load_game_state(speler_naam, "scorito_team")
+                    if d:
                         st.session_state.selected_riders = d.get("selected_riders", [])
                         st.session_state.transfer_plan = d.get("transfer_plan", [])
                         st.success(f"Team geladen (van {d.get('ts', '?')})")
@@ -452,7 +150,7 @@ with st.sidebar:
     else:
         toon_uitslagen = False
 
-    ev_method = st.selectbox("🧮 Rekenmodel (EV)", ["1. Scorito Ranking (Dynamisch)", "2. Originele Curve (Macht 4)", "3. Extreme Curve (Macht 10)", "4. Tiers & Spreiding (Realistisch)"], help="Kies hoe de AI punten berekent. 'Scorito Ranking' gebruikt een vlakkere verdeling, macht-curves geven extreme bonussen aan absolute specialisten.")
+    ev_method = st.selectbox("🧮 Rekenmodel (EV)", EV_METHODS, help="Kies hoe de AI punten berekent. 'Scorito Ranking' gebruikt een vlakkere verdeling, macht-curves geven extreme bonussen aan absolute specialisten.")
     use_transfers = st.checkbox("🔁 Bereken met wissel-strategie", value=True, help="Laat de AI automatisch bepalen wie en wanneer je moet wisselen om binnen budget te blijven.")
     
     t_moments = ["GEEN", "GEEN", "GEEN"]
@@ -477,13 +175,10 @@ with st.sidebar:
             default_lr_idx = available_races.index(actieve_koersen[-1]) if actieve_koersen else 0
             last_race = st.selectbox("Laatst gereden koers (Moment van wissel):", options=available_races[:-1], index=default_lr_idx)
             
-            active_at_moment = list(st.session_state.selected_riders)
+            # Team na de wissels van last_race, via dezelfde tijdlijn als de handmatige wissels en de budgetcheck
+            active_at_moment = OwnershipTimeline(st.session_state.selected_riders, st.session_state.transfer_plan, available_races).team_na(last_race)
             idx_last = available_races.index(last_race)
-            for t in st.session_state.transfer_plan:
-                if available_races.index(t['moment']) <= idx_last:
-                    if t['uit'] in active_at_moment: active_at_moment.remove(t['uit'])
-                    if t['in'] not in active_at_moment: active_at_moment.append(t['in'])
-                    
+
             injured_selection = st.multiselect("Geblesseerde renner(s) eruit:", options=active_at_moment, help="Selecteer de geblesseerde renner(s) die je wilt vervangen.")
             
             if injured_selection:
@@ -510,18 +205,18 @@ with st.sidebar:
                     if drops_needed > 0 and not ai_auto_drop and len(drop_choices) != drops_needed:
                         st.error(f"Selecteer exact {drops_needed} wissel(s) om te annuleren.")
                     else:
+                        ev_matrix = build_ev_matrix(df, available_races)
                         if drops_needed > 0 and ai_auto_drop:
-                            best_ev = -1
-                            best_plan = None
+                            kandidaat_plannen = []
                             for drop_indices in itertools.combinations(range(len(planned_transfers_copy)), drops_needed):
                                 temp_plan = [t for i, t in enumerate(planned_transfers_copy) if i not in drop_indices]
-                                repls = find_emergency_replacements(df, st.session_state.selected_riders, temp_plan, injured_selection, last_race, max_bud, available_races)
+                                repls = find_emergency_replacements(df, st.session_state.selected_riders, temp_plan, injured_selection, last_race, max_bud, available_races, ev_matrix)
                                 if repls:
-                                    temp_full_plan = temp_plan + [{"uit": u, "in": r, "moment": last_race} for u, r in zip(injured_selection, repls)]
-                                    ev = evaluate_plan_ev(df, st.session_state.selected_riders, temp_full_plan, available_races)
-                                    if ev > best_ev:
-                                        best_ev = ev
-                                        best_plan = temp_full_plan
+                                    kandidaat_plannen.append(temp_plan + [{"uit": u, "in": r, "moment": last_race} for u, r in zip(injured_selection, repls)])
+                            best_plan = None
+                            if kandidaat_plannen:
+                                plan_evs = evaluate_plans(ev_matrix, st.session_state.selected_riders, kandidaat_plannen)
+                                best_plan = kandidaat_plannen[int(plan_evs.argmax())]
                             if best_plan:
                                 st.session_state.transfer_plan = best_plan
                                 st.rerun()
@@ -529,7 +224,7 @@ with st.sidebar:
                                 st.error("Geen budgettaire oplossing gevonden.")
                         else:
                             temp_plan = [t for i, t in enumerate(planned_transfers_copy) if i not in drop_choices]
-                            replacements = find_emergency_replacements(df, st.session_state.selected_riders, temp_plan, injured_selection, last_race, max_bud, available_races)
+                            replacements = find_emergency_replacements(df, st.session_state.selected_riders, temp_plan, injured_selection, last_race, max_bud, available_races, ev_matrix)
                             if replacements:
                                 temp_full_plan = temp_plan + [{"uit": u, "in": r, "moment": last_race} for u, r in zip(injured_selection, replacements)]
                                 st.session_state.transfer_plan = temp_full_plan
@@ -550,7 +245,7 @@ with st.sidebar:
         if res:
             st.session_state.selected_riders = res
             st.session_state.transfer_plan = [] 
-            new_res, new_plan = rebuild_team_and_transfers(df, max_bud, min_bud, max_ren, res, t_moments, use_transfers)
+            new_res, new_plan = rebuild_team_and_transfers(df, available_races, max_bud, min_bud, max_ren, res, t_moments, use_transfers)
             if new_res:
                 st.session_state.selected_riders = new_res
                 st.session_state.transfer_plan = new_plan
@@ -562,7 +257,7 @@ st.title("🏆 Voorjaarsklassiekers: Scorito")
 st.markdown("**Met dank aan:** [Wielerorakel.nl](https://www.cyclingoracle.com/) | [Kopmanpuzzel](https://kopmanpuzzel.up.railway.app/)")
 st.divider()
 
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["🚀 Jouw Team & Transfers", "🗓️ Startlijst & Uitslagen", "📊 Kopmannen", "📋 Database (Alle)", "ℹ️ Uitleg"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🚀 Jouw Team & Transfers", "🗓️ Startlijst & Uitslagen", "📊 Kopmannen", "📋 Database (Alle)", "ℹ️ Uitleg", "🧪 Gevoeligheid"])
 
 if not st.session_state.selected_riders:
     with tab1: st.info("👈 Kies je instellingen in de zijbalk en klik op **Bereken Nieuw Start-Team** of laad een team in om te beginnen!")
@@ -572,30 +267,14 @@ else:
     all_display_riders = list(set(st.session_state.selected_riders + [t['in'] for t in st.session_state.transfer_plan]))
     current_df = df[df['Renner'].isin(all_display_riders)].copy()
 
-    def bepaal_rol_en_moment(naam):
-        for t in st.session_state.transfer_plan:
-            if naam == t['uit']: return f"Verkocht na {t['moment']}"
-            if naam == t['in']: return f"Gekocht na {t['moment']}"
-        return 'Basis (Blijft)'
+    current_df['Rol'] = rol_en_moment(current_df['Renner'], st.session_state.transfer_plan)
+    current_df['Type'] = klassieker_types(current_df)
 
-    current_df['Rol'] = current_df['Renner'].apply(bepaal_rol_en_moment)
-    current_df['Type'] = current_df.apply(bepaal_klassieker_type, axis=1)
+    prijzen = dict(zip(df['Renner'], df['Prijs']))
+    timeline = OwnershipTimeline(st.session_state.selected_riders, st.session_state.transfer_plan, available_races, prijzen, max_bud)
 
     matrix_df = current_df[['Renner', 'Rol', 'Type', 'Prijs'] + available_races].set_index('Renner')
-    active_matrix = matrix_df.copy()
-
-    for r in current_df['Renner']:
-        rol = current_df.loc[current_df['Renner'] == r, 'Rol'].values[0]
-        if 'Verkocht na' in rol:
-            moment = rol.replace('Verkocht na ', '')
-            if moment in available_races:
-                idx = available_races.index(moment) + 1
-                active_matrix.loc[r, available_races[idx:]] = 0
-        elif 'Gekocht na' in rol:
-            moment = rol.replace('Gekocht na ', '')
-            if moment in available_races:
-                idx = available_races.index(moment) + 1
-                active_matrix.loc[r, available_races[:idx]] = 0
+    active_matrix = active_roster(matrix_df, available_races, timeline)
 
     with tab1:
         st.subheader("📊 Dashboard")
@@ -620,11 +299,8 @@ else:
             if not st.session_state.transfer_plan:
                 st.info("Nog geen transfers doorgevoerd.")
             else:
-                temp_team = list(st.session_state.selected_riders)
                 for i, t in enumerate(st.session_state.transfer_plan):
-                    if t['uit'] in temp_team: temp_team.remove(t['uit'])
-                    if t['in'] not in temp_team: temp_team.append(t['in'])
-                    budget_now = max_bud - df[df['Renner'].isin(temp_team)]['Prijs'].sum()
+                    budget_now = timeline.speling_na_wissel(i)
                     
                     st.markdown(f"***Wissel {i+1} (ná {t['moment']} | Budget over: € {budget_now/1000000:.2f}M)***")
                     c_uit, c_in, c_del = st.columns([4, 4, 1])
@@ -644,23 +320,15 @@ else:
                     m_race = st.selectbox("Wisselmoment (Ná race):", options=available_races[:-1], index=len(available_races)-2)
                     
                     # Bepaal exact wie er in het team zit op dit moment
-                    actief_op_moment = list(st.session_state.selected_riders)
-                    idx_m = available_races.index(m_race)
-                    for t in st.session_state.transfer_plan:
-                        if available_races.index(t['moment']) <= idx_m:
-                            if t['uit'] in actief_op_moment: actief_op_moment.remove(t['uit'])
-                            if t['in'] not in actief_op_moment: actief_op_moment.append(t['in'])
-                            
+                    actief_op_moment = timeline.team_na(m_race)
+
                     m_uit = st.selectbox("❌ Wie gaat eruit?", options=sorted(actief_op_moment))
                     m_in_opties = [r for r in df['Renner'].tolist() if r not in actief_op_moment]
                     m_in = st.selectbox("📥 Wie komt erin?", options=sorted(m_in_opties))
                     
                     if st.button("➕ Voeg Wissel Toe", use_container_width=True):
-                        test_team = list(actief_op_moment)
-                        test_team.remove(m_uit)
-                        test_team.append(m_in)
-                        test_kosten = df[df['Renner'].isin(test_team)]['Prijs'].sum()
-                        
+                        test_kosten = timeline.kosten_na(m_race) - prijzen.get(m_uit, 0) + prijzen.get(m_in, 0)
+
                         if test_kosten > max_bud:
                             st.error(f"Budget overschreden! Het team zou € {test_kosten/1000000:.2f}M kosten (Max budget: € {max_bud/1000000:.2f}M).")
                         else:
@@ -688,7 +356,7 @@ else:
                 sugg_keuze = []
                 if not sugg_df.empty:
                     st.info(f"💡 **Top Suggesties (Budget per renner: € {max_affordable/1000000:.1f}M):**")
-                    sugg_df['Type'] = sugg_df.apply(bepaal_klassieker_type, axis=1)
+                    sugg_df['Type'] = klassieker_types(sugg_df)
                     st.dataframe(sugg_df[['Renner', 'Prijs', 'Waarde (EV/M)', 'Scorito_EV', 'Type']], hide_index=True, use_container_width=True)
                     sugg_keuze = st.multiselect("👉 Of selecteer hier direct een AI-suggestie:", options=sugg_df['Renner'].tolist(), help="Selecteer direct één van de voorgestelde renners om aan je team toe te voegen.")
 
@@ -722,7 +390,7 @@ else:
                     if st.button("🚀 VOER WIJZIGING DOOR", type="primary", use_container_width=True):
                         new_force_base = [r for r in st.session_state.selected_riders if r not in to_replace] + to_add
                         if len(new_force_base) == max_ren:
-                            new_res, new_plan = rebuild_team_and_transfers(df, max_bud, min_bud, max_ren, new_force_base, t_moments, use_transfers)
+                            new_res, new_plan = rebuild_team_and_transfers(df, available_races, max_bud, min_bud, max_ren, new_force_base, t_moments, use_transfers)
                             if new_res:
                                 st.session_state.selected_riders = new_res
                                 st.session_state.transfer_plan = new_plan
@@ -742,28 +410,11 @@ else:
         
         if toon_uitslagen:
             st.success("✅ Actuele uitslagen ingeladen! Top 20 finishes worden beloond met medailles (🏅). Tabel blijft perfect sorteerbaar.")
-            u_time = get_file_mod_time("data/uitslagen.csv")
-            df_uitslagen = get_uitslagen(u_time, df['Renner'].tolist())
-            verreden_koersen = df_uitslagen['Race'].unique() if not df_uitslagen.empty else []
+            df_uitslagen = get_uitslagen(df['Renner'].tolist())
         else:
             df_uitslagen = pd.DataFrame()
-            verreden_koersen = []
 
-        display_matrix = active_matrix[available_races].copy()
-        
-        for c in available_races:
-            is_verreden = c in verreden_koersen
-            df_k = df_uitslagen[df_uitslagen['Race'] == c] if is_verreden else pd.DataFrame()
-            
-            for r in display_matrix.index:
-                is_on_list = (active_matrix.loc[r, c] == 1)
-                rank_str = None
-                if is_verreden:
-                    res = df_k[df_k['Renner'] == r]
-                    if not res.empty: rank_str = res['Rnk'].values[0]
-                
-                display_matrix.loc[r, c] = get_numeric_status(is_on_list, is_on_list, is_verreden, rank_str)
-            display_matrix[c] = pd.to_numeric(display_matrix[c])
+        display_matrix = race_status_matrix(active_matrix, df_uitslagen)
 
         display_matrix.insert(0, 'Rol', matrix_df['Rol'])
         display_matrix.insert(1, 'Type', matrix_df['Type'])
@@ -820,34 +471,16 @@ with tab4:
     with col_f3: race_filter = st.multiselect("🏁 Rijdt geselecteerde koersen:", options=available_races, help="Filter de database op renners die meedoen aan de geselecteerde koersen.")
 
     f_df = df.copy()
-    f_df['Type'] = f_df.apply(bepaal_klassieker_type, axis=1)
+    f_df['Type'] = klassieker_types(f_df)
     if search_name: f_df = f_df[f_df['Renner'].str.contains(search_name, case=False, na=False) | f_df['Team'].str.contains(search_name, case=False, na=False)]
     f_df = f_df[(f_df['Prijs'] >= price_filter[0]) & (f_df['Prijs'] <= price_filter[1])]
     if race_filter: f_df = f_df[f_df[race_filter].sum(axis=1) == len(race_filter)]
 
     d_df = f_df[['Renner', 'Team', 'Prijs', 'Waarde (EV/M)', 'Type', 'Scorito_EV'] + available_races].copy()
     
-    if toon_uitslagen:
-        u_time = get_file_mod_time("data/uitslagen.csv")
-        df_uitslagen_db = get_uitslagen(u_time, df['Renner'].tolist())
-        verreden_koersen_db = df_uitslagen_db['Race'].unique() if not df_uitslagen_db.empty else []
-    else:
-        df_uitslagen_db = pd.DataFrame()
-        verreden_koersen_db = []
-
-    for c in available_races:
-        is_verreden = c in verreden_koersen_db
-        df_k = df_uitslagen_db[df_uitslagen_db['Race'] == c] if is_verreden else pd.DataFrame()
-        
-        new_col = []
-        for r, val in zip(d_df['Renner'], d_df[c]):
-            is_on_list = (val == 1)
-            rank_str = None
-            if is_verreden:
-                res = df_k[df_k['Renner'] == r]
-                if not res.empty: rank_str = res['Rnk'].values[0]
-            new_col.append(get_numeric_status(is_on_list, is_on_list, is_verreden, rank_str))
-        d_df[c] = pd.to_numeric(new_col)
+    df_uitslagen_db = get_uitslagen(df['Renner'].tolist()) if toon_uitslagen else pd.DataFrame()
+    on_list_db = pd.DataFrame(d_df[available_races].to_numpy() == 1, index=d_df['Renner'], columns=available_races)
+    d_df[available_races] = race_status_matrix(on_list_db, df_uitslagen_db).to_numpy()
     
     format_dict = {c: lambda x: format_race_status(x, 20) for c in available_races}
     format_dict['Prijs'] = lambda x: f"€ {x/1000000:.2f}M"
@@ -915,3 +548,48 @@ with tab5:
     1. Gebruik de cloud opslag bovenin de zijbalk of upload je bewaarde `.json` bestand.
     2. Het systeem plaatst direct je basis-20 terug in het geheugen en zet eventuele wissels klaar in je Transfer Plan. Het script controleert zelfs volautomatisch of oude namen nog steeds (zonder spelfouten) in de actuele database staan via *Fuzzy Matching*!
     """)
+
+with tab6:
+    st.header("🧪 Gevoeligheidsanalyse")
+    st.markdown("Hoe verandert het optimale team als je de instellingen aanpast? De AI rekent elk scenario parallel door en toont de resultaten zodra ze binnenkomen. Eerder berekende scenario's komen direct uit de cache.")
+
+    sc1, sc2 = st.columns(2)
+    with sc1:
+        sweep_methods = st.multiselect("🧮 Rekenmodellen", options=EV_METHODS, default=[ev_method], help="Elk gekozen rekenmodel wordt als apart scenario doorgerekend.")
+        sweep_min_bud = st.multiselect("Min Budget", options=list(range(40000000, 45500000, 500000)), default=[min_bud] if min_bud in range(40000000, 45500000, 500000) else [], format_func=lambda x: f"€ {x/1000000:.1f}M", help="Minimale budgetten die je wilt vergelijken.")
+        sweep_max_ren = st.multiselect("Totaal aantal renners", options=list(range(15, 26)), default=[max_ren] if 15 <= max_ren <= 25 else [], help="Teamgroottes die je wilt vergelijken.")
+    with sc2:
+        sweep_moments = st.multiselect("🗓️ Wisselmomenten (3 wissels na)", options=["GEEN"] + available_races[:-1], default=[t_moments[0]] if use_transfers else ["GEEN"], help="Per gekozen koers wordt een scenario berekend waarin alle 3 de wissels na die koers vallen. 'GEEN' rekent zonder wissels.")
+        cpu_count = os.cpu_count() or 1
+        if cpu_count > 1:
+            sweep_workers = st.slider("Parallelle processen", 1, cpu_count, min(4, cpu_count), help="Aantal scenario's dat tegelijk wordt doorgerekend.")
+        else:
+            # Een slider met min == max geeft een fout; op één CPU rekent de sweep met één proces
+            sweep_workers = 1
+
+    sweep_grid = {
+        "min_bud": sweep_min_bud,
+        "max_bud": [max_bud],
+        "max_ren": sweep_max_ren,
+        "ev_method": sweep_methods,
+        "t_moments": [[] if m == "GEEN" else [m, m, m] for m in sweep_moments],
+    }
+    scenarios = build_grid("scorito", sweep_grid)
+    st.caption(f"{len(scenarios)} scenario's in deze sweep. Je geforceerde, uitgesloten en genegeerde renners en 'Toon alleen Resterende EV' gelden voor elk scenario.")
+    sweep_constraints = {"skip_races": skip_races, "force_base": force_base, "ban_base": ban_base, "exclude_list": exclude_list}
+
+    if st.button("▶️ Start Sweep", type="primary", use_container_width=True):
+        progress = st.progress(0.0, text="Scenario's worden doorgerekend...")
+        table_placeholder = st.empty()
+        sweep_results = []
+        for res in run_sweep("scorito", df_raw, available_races, koers_mapping, scenarios, max_workers=sweep_workers, constraints=sweep_constraints):
+            sweep_results.append(res)
+            progress.progress(len(sweep_results) / len(scenarios), text=f"{len(sweep_results)}/{len(scenarios)} scenario's klaar")
+            table_placeholder.dataframe(summarize_sweep(sweep_results), hide_index=True, use_container_width=True)
+        st.session_state.scorito_sweep_results = sweep_results
+
+    if st.session_state.get("scorito_sweep_results"):
+        st.subheader("📈 Objective per scenario")
+        st.dataframe(summarize_sweep(st.session_state.scorito_sweep_results), hide_index=True, use_container_width=True)
+        st.subheader("🔁 Hoe vaak zit een renner in het team?")
+        st.dataframe(inclusion_frequencies(st.session_state.scorito_sweep_results), hide_index=True, use_container_width=True)
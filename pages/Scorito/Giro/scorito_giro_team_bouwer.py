@@ -2,11 +2,11 @@ import streamlit as st
 import pandas as pd
 import unicodedata
 import os
-import base64
 import pulp
-from app_utils.db import init_connection
+from app_utils.storage import get_repository
 from app_utils.scorito_giro_data import load_giro_data, calculate_giro_ev
 from app_utils.giro_solver import solve_giro_team
+from app_utils.stage_images import clickable_image_html
 
 # --- CONFIGURATIE ---
 st.set_page_config(page_title="Giro Etappe Bouwer", layout="wide", page_icon="🇮🇹")
@@ -17,8 +17,8 @@ if "ingelogde_speler" not in st.session_state:
 
 speler_naam = st.session_state["ingelogde_speler"]
 
-supabase = init_connection()
 TABEL_NAAM = st.secrets.get("TABEL_NAAM", "gebruikers_data_test")
+repo = get_repository(TABEL_NAAM)
 DB_KOLOM = "scorito_giro_team26_v2"
 
 # --- ETAPPE DATA ---
@@ -85,19 +85,6 @@ def bereken_alle_stage_scores(df_input, wegingen):
     )
     return df_out
 
-def get_clickable_image_html(image_path, fallback_text, link):
-    if os.path.exists(image_path):
-        try:
-            with open(image_path, "rb") as img_file:
-                encoded_string = base64.b64encode(img_file.read()).decode()
-            ext = "png" if image_path.lower().endswith(".png") else "jpeg"
-            img_src = f"data:image/{ext};base64,{encoded_string}"
-        except Exception:
-            img_src = f"https://placehold.co/600x400/eeeeee/000000?text={fallback_text}"
-    else:
-        img_src = f"https://placehold.co/600x400/eeeeee/000000?text={fallback_text}"
-    return f'<a href="{link}" target="_blank"><img src="{img_src}" width="100%" style="border-radius:8px;"></a>'
-
 def bepaal_auto_kopman(team_renners, etappe_id, df):
     """Berekent de automatische kopman puur op basis van het etappeprofiel."""
     w = next((e['w'] for e in GIRO_ETAPPES if e['id'] == etappe_id), {"SPR": 0.25, "GC": 0.25, "ITT": 0.25, "MTN": 0.25})
@@ -147,13 +134,14 @@ with st.sidebar:
                 "weights":       st.session_state.giro_weights_v2,
                 "kopman_keuzes": st.session_state.kopman_keuzes,
             }
-            supabase.table(TABEL_NAAM).update({DB_KOLOM: data}).eq("username", speler_naam).execute()
-            st.success("Opgeslagen!")
+            if repo.save_game_state(speler_naam, DB_KOLOM, data):
+                st.success("Opgeslagen!")
+            else:
+                st.error(f"Niet opgeslagen: geen account gevonden voor {speler_naam}.")
 
         if st.button("🔄 Inladen", use_container_width=True):
-            res = supabase.table(TABEL_NAAM).select(DB_KOLOM).eq("username", speler_naam).execute()
-            if res.data and res.data[0].get(DB_KOLOM):
-                db_data = res.data[0][DB_KOLOM]
+            db_data = repo.load_game_state(speler_naam, DB_KOLOM)
+            if db_data:
                 st.session_state.etappe_keuzes  = db_data.get("etappe_keuzes",  _default_keuzes.copy())
                 st.session_state.giro_weights_v2 = db_data.get("weights",       _default_weights.copy())
                 st.session_state.finaal_team    = db_data.get("team",           [])
@@ -320,8 +308,8 @@ with tab1:
         map_path  = f"data/giro262/giro26-{etappe['id']}-map.jpg"
         prof_path = f"data/giro262/giro26-{etappe['id']}-hp.jpg"
         i1, i2 = st.columns(2)
-        i1.markdown(get_clickable_image_html(map_path,  f"Kaart+{etappe['id']}", giro_link), unsafe_allow_html=True)
-        i2.markdown(get_clickable_image_html(prof_path, f"Profiel+{etappe['id']}", giro_link), unsafe_allow_html=True)
+        i1.markdown(clickable_image_html(map_path,  f"Kaart+{etappe['id']}", giro_link), unsafe_allow_html=True)
+        i2.markdown(clickable_image_html(prof_path, f"Profiel+{etappe['id']}", giro_link), unsafe_allow_html=True)
 
     som_input = new_spr + new_gc + new_itt + new_mtn
     if abs(som_input - 1.0) > 0.01 and som_input > 0:
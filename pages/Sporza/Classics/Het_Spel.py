@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
-import os
 from datetime import datetime
 from thefuzz import process, fuzz
-from app_utils.db import init_connection
+from app_utils.storage import get_repository
 from app_utils.crypto import generate_signature
+from app_utils.results_store import UITSLAGEN_PATH, load_results
+from app_utils.het_spel import (
+    PRIJZEN_PATH, STATS_PATH, EV_METHODS, koppel_stats, build_race_index, race_info, beschikbare_extras, build_ev,
+    optimize_picks, het_spel_standings
+)
+from app_utils.sporza_klassiekers import get_file_mod_time
+from app_utils.data_access import rider_stats
 
 # 1. Paginaconfiguratie
 st.set_page_config(page_title="Custom Klassiekers Spel", layout="wide", page_icon="🎮")
@@ -17,32 +23,24 @@ if "ingelogde_speler" not in st.session_state:
 speler_naam = st.session_state["ingelogde_speler"]
 
 # 3. Database Connectie
-supabase = init_connection()
 tabel_naam = st.secrets.get("TABEL_NAAM", "gebruikers_data_test")
+repo = get_repository(tabel_naam)
 
 # --- HULPFUNCTIES ---
-def is_team_locked():
-    if os.path.exists("data/uitslagen.csv"):
-        try:
-            df_u = pd.read_csv("data/uitslagen.csv", sep=None, engine='python')
-            df_u.columns = [str(c).strip().title() for c in df_u.columns]
-            if 'Race' in df_u.columns:
-                verreden = [str(x).strip().upper() for x in df_u['Race'].unique()]
-                if "NOK" in verreden:
-                    return True
-        except:
-            return False
-    return False
+def is_team_locked(uitslagen_path=UITSLAGEN_PATH):
+    try:
+        return "NOK" in load_results(uitslagen_path).races()
+    except:
+        return False
 
 # --- DATA LADEN ---
 @st.cache_data(ttl=3600)
 def load_game_data():
     try:
-        supabase = init_connection()
-        response = supabase.table(tabel_naam).select('username, created_at, sporza_team, sporza_transfers, scorito_team').execute()
+        rows = get_repository(tabel_naam).list_users_for_leaderboard(['sporza_team', 'sporza_transfers', 'scorito_team'])
 
         users_data = []
-        for row in response.data:
+        for row in rows:
             user_data = {
                 'username': row['username'],
                 'created_at': row['created_at'],
@@ -56,13 +54,20 @@ def load_game_data():
     except:
         return []
 
+@st.cache_data(ttl=300)
+def load_custom_teams():
+    try:
+        rows = get_repository(tabel_naam).list_users_for_leaderboard(['custom_team'])
+        return [row for row in rows if row.get('custom_team')]
+    except:
+        return []
+
 @st.cache_data
 def load_csv_data():
     try:
-        df_p = pd.read_csv("data/sporza_prijzen_startlijst.csv", sep=None, engine='python')
-        df_s = pd.read_csv("data/renners_stats.csv", sep=None, engine='python')
+        df_p = pd.read_csv(PRIJZEN_PATH, sep=None, engine='python')
+        df_s = rider_stats(STATS_PATH)
         if 'Naam' in df_p.columns: df_p = df_p.rename(columns={'Naam': 'Renner'})
-        if 'Naam' in df_s.columns: df_s = df_s.rename(columns={'Naam': 'Renner'})
         
         # Sporza koersen VANAF de koers NA Strade Bianche (STR = Strade, NOK = Nokere Koerse)
         races = ["NOK", "BKC", "MSR", "RVB", "E3", "IFF", "DDV", "RVV", "SP", "PR", "RVL", "BRP", "AGT", "WAP", "LBL"]
@@ -70,7 +75,8 @@ def load_csv_data():
         
         koers_map = {"NOK":"SPR","BKC":"SPR","MSR":"AVG","RVB":"SPR","E3":"COB","IFF":"SPR","DDV":"COB","RVV":"COB","SP":"SPR","PR":"COB","RVL":"SPR","BRP":"HLL","AGT":"HLL","WAP":"HLL","LBL":"HLL"}
         
-        df = pd.merge(df_p, df_s[['Renner', 'COB', 'HLL', 'SPR', 'AVG', 'Team']], on='Renner', how='left')
+        # Sporza gebruikt korte namen: stats koppelen via naam-matching, Renner blijft de Sporza-naam
+        df = koppel_stats(df_p, df_s)
         
         # Zorg dat stats numeriek zijn voor de top 50 berekening
         for col in ['COB', 'HLL', 'SPR', 'AVG']:
@@ -82,7 +88,9 @@ def load_csv_data():
         return pd.DataFrame({'Renner': ['Wout van Aert', 'Mathieu van der Poel', 'Tadej Pogačar']}), ["NOK", "MSR", "RVV"], {}
 
 df, races, k_map = load_csv_data()
-alle_renners = sorted(df['Renner'].dropna().unique()) if not df.empty else []
+# Top 50, dark horses en extra's per koers: één keer per data-versie berekend, gedeeld door alle koersen
+race_index = build_race_index(df, races, k_map, (get_file_mod_time(PRIJZEN_PATH), get_file_mod_time(STATS_PATH)))
+alle_renners = race_index['alle_renners']
 team_locked = is_team_locked()
 
 # --- STATE ---
@@ -99,14 +107,15 @@ with st.sidebar:
     if speler_naam != "gast":
         if st.button("💾 Opslaan in Cloud", type="primary", use_container_width=True):
             data = {"base": st.session_state.game_base_team, "picks": st.session_state.game_picks}
-            payload = {"username": speler_naam, "custom_team": {"data": data, "signature": generate_signature(data)}}
-            supabase.table(tabel_naam).upsert(payload, on_conflict="username").execute()
-            st.success("Opgeslagen!")
+            if repo.save_game_state(speler_naam, "custom_team", {"data": data, "signature": generate_signature(data)}):
+                st.success("Opgeslagen!")
+            else:
+                st.error(f"Niet opgeslagen: geen account gevonden voor {speler_naam}.")
 
         if st.button("🔄 Laden uit Cloud", use_container_width=True):
-            res = supabase.table(tabel_naam).select("custom_team").eq("username", speler_naam).execute()
-            if res.data:
-                d = res.data[0]["custom_team"]["data"]
+            custom_team = repo.load_game_state(speler_naam, "custom_team")
+            if custom_team:
+                d = custom_team["data"]
                 st.session_state.game_base_team = d.get("base", [])
                 st.session_state.game_picks = d.get("picks", {r: {"extras": [], "dark_horse": None, "kopman": None} for r in races})
                 st.rerun()
@@ -116,7 +125,7 @@ with st.sidebar:
 st.divider()
 
 # --- INTERFACE COMPONENTEN ---
-tab0, tab1, tab2 = st.tabs(["📖 Spelregels & Uitleg", "🚴 Basis Team (10)", "🏁 Selecties per Koers"])
+tab0, tab1, tab2, tab3 = st.tabs(["📖 Spelregels & Uitleg", "🚴 Basis Team (10)", "🏁 Selecties per Koers", "🏆 Klassement"])
 
 # Tab 0: Spelregels
 with tab0:
@@ -175,6 +184,28 @@ with tab1:
 # Tab 2: Selecties per koers
 with tab2:
     st.subheader("Kopman, Extra's & Dark Horse")
+
+    with st.expander("🤖 Optimaliseer alle koersen"):
+        st.write("Berekent voor je basisteam in één keer de beste extra's, kopman en dark horse voor alle koersen.")
+        opt_methode = st.selectbox("🧮 Rekenmodel", EV_METHODS, help="Ranking: verwachte plaats op basis van de koersstatistiek. Macht 4: vloeiende curve op de statistiek.")
+        if st.button("🚀 Vul alle koersen in", use_container_width=True):
+            if len(st.session_state.game_base_team) != 10:
+                st.warning("Kies eerst 10 renners voor je basisteam.")
+            else:
+                optimaal = optimize_picks(build_ev(df, race_index, opt_methode), st.session_state.game_base_team, races)
+                for r, pick in optimaal.items():
+                    st.session_state.game_picks[r] = {"extras": pick["extras"], "dark_horse": pick["dark_horse"], "kopman": pick["kopman"]}
+                    for widget in (f"extras_{r}", f"dh_{r}", f"kopman_{r}"):
+                        st.session_state.pop(widget, None)
+                st.session_state.het_spel_optimalisatie = optimaal
+                st.rerun()
+
+        if "het_spel_optimalisatie" in st.session_state:
+            st.dataframe(pd.DataFrame([
+                {"Koers": r, "Kopman": p["kopman"], "Extra's": ", ".join(p["extras"]), "Dark Horse": p["dark_horse"], "Verwachte punten": round(p["ev"])}
+                for r, p in st.session_state.het_spel_optimalisatie.items()
+            ]), hide_index=True, use_container_width=True)
+
     koers_keuze = st.selectbox("Kies een koers:", races)
     
     if koers_keuze:
@@ -185,12 +216,13 @@ with tab2:
         
         # 1. Drie extra renners
         st.markdown(f"### 1. Drie Extra Renners voor {koers_keuze}")
-        beschikbare_extras = [r for r in alle_renners if r not in st.session_state.game_base_team]
+        extra_opties = beschikbare_extras(race_index, st.session_state.game_base_team)
+        basis_set = set(st.session_state.game_base_team)
         
         gekozen_extras = st.multiselect(
             "Kies maximaal 3 extra renners (buiten je basisteam):",
-            options=beschikbare_extras,
-            default=[x for x in huidige_picks.get("extras", []) if x in beschikbare_extras],
+            options=extra_opties,
+            default=[x for x in huidige_picks.get("extras", []) if x in race_index['alle_renners_set'] and x not in basis_set],
             max_selections=3,
             key=f"extras_{koers_keuze}",
             help="Selecteer eventuele extra renners voor deze specifieke koers."
@@ -199,15 +231,9 @@ with tab2:
 
         # 2. Dark Horse (buiten top 50)
         st.markdown("### 2. Dark Horse")
-        stat_voor_koers = k_map.get(koers_keuze, "AVG")
-        
-        if stat_voor_koers in df.columns:
-            top_50_renners = df.sort_values(by=stat_voor_koers, ascending=False).head(50)['Renner'].tolist()
-        else:
-            top_50_renners = df.head(50)['Renner'].tolist()
-            
-        buiten_top_50 = [r for r in alle_renners if r not in top_50_renners]
-        opties_dark_horse = [""] + buiten_top_50
+        koers_info = race_info(race_index, koers_keuze)
+        stat_voor_koers = koers_info['stat']
+        opties_dark_horse = [""] + koers_info['dark_horses']
         
         huidige_dark_horse = huidige_picks.get("dark_horse")
         idx_dh = opties_dark_horse.index(huidige_dark_horse) if huidige_dark_horse in opties_dark_horse else 0
@@ -244,3 +270,23 @@ with tab2:
                 f"\n**Extra (3):** {', '.join(gekozen_extras) if gekozen_extras else 'Geen'}" +
                 f"\n**Dark Horse:** {gekozen_dark_horse if gekozen_dark_horse else 'Geen'}" +
                 f"\n**Kopman:** {gekozen_kopman if gekozen_kopman else 'Geen'}")
+
+# Tab 3: Klassement
+with tab3:
+    st.subheader("🏆 Klassement")
+    st.caption("Automatisch berekend uit de opgeslagen teams en de verwerkte uitslagen. Alleen nieuwe koersen worden opnieuw doorgerekend.")
+    try:
+        klassement = het_spel_standings(
+            load_custom_teams(), race_index,
+            verify=lambda data, signature: signature == generate_signature(data)
+        )
+    except Exception as e:
+        st.error(f"Fout bij berekenen klassement: {e}")
+        klassement = pd.DataFrame()
+
+    if klassement.empty:
+        st.info("Nog geen opgeslagen teams gevonden.")
+    else:
+        if len(klassement.columns) <= 3:
+            st.info("Er zijn nog geen uitslagen verwerkt voor de koersen van het spel.")
+        st.dataframe(klassement, hide_index=True, use_container_width=True)
@@ -1,11 +1,18 @@
 import streamlit as st
 import pandas as pd
-import pulp
 import json
 import os
 from thefuzz import process, fuzz
-from app_utils.db import init_connection
-from app_utils.name_matching import normalize_name_logic
+from app_utils.storage import get_repository
+from app_utils.results_store import load_results
+from app_utils.parameter_sweep import build_grid, run_sweep, summarize_sweep, inclusion_frequencies
+from app_utils.rider_types import klassieker_types
+from app_utils.race_status import active_roster, race_status_matrix, rol_en_moment
+from app_utils.ownership import OwnershipTimeline
+from app_utils.captains import starters_and_captains
+from app_utils.sporza_klassiekers import (
+    EV_METHODS, SCORITO_NAAR_SPORZA, get_file_mod_time, load_and_merge_data, calculate_sporza_ev, solve_sporza_dynamic
+)
 from datetime import datetime
 
 # --- CONFIGURATIE ---
@@ -18,31 +25,10 @@ if "ingelogde_speler" not in st.session_state:
 
 speler_naam = st.session_state["ingelogde_speler"]
 
-supabase = init_connection()
 TABEL_NAAM = st.secrets.get("TABEL_NAAM", "gebruikers_data_test")
-
-# --- HULPFUNCTIES ---
-def get_file_mod_time(filepath):
-    try:
-        return os.path.getmtime(filepath)
-    except Exception:
-        return 0
+repo = get_repository(TABEL_NAAM)
 
 # --- OPMAAK & SORTEER LOGICA ---
-def get_numeric_status(is_on_startlist, is_starter, is_verreden=False, rank_str=None):
-    if is_verreden:
-        if rank_str and str(rank_str) not in ['nan', 'None', 'DNS', '']:
-            if str(rank_str).isdigit():
-                return int(rank_str)
-            else:
-                return 996 # DNF
-        else:
-            return 996 if is_on_startlist else 999
-    else:
-        if is_on_startlist:
-            return 997 if is_starter else 998
-        return 999
-
 def format_race_status(val, limit):
     if pd.isna(val):
         return ""
@@ -65,266 +51,20 @@ def format_race_status(val, limit):
     except:
         return ""
 
-# --- DATA LADEN (SPORZA SPECIFIEK) ---
-@st.cache_data
-def load_and_merge_data(prog_mod_time, stats_mod_time):
-    try:
-        df_prog = pd.read_csv("data/sporza_prijzen_startlijst.csv", sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
-        df_prog.columns = df_prog.columns.str.strip()
-        if 'Naam' in df_prog.columns and 'Renner' not in df_prog.columns:
-            df_prog = df_prog.rename(columns={'Naam': 'Renner'})
-        
-        df_stats = pd.read_csv("data/renners_stats.csv", sep=None, engine='python', encoding='utf-8-sig', on_bad_lines='skip')
-        df_stats.columns = df_stats.columns.str.strip()
-        if 'Naam' in df_stats.columns and 'Renner' not in df_stats.columns:
-            df_stats = df_stats.rename(columns={'Naam': 'Renner'})
-        df_stats = df_stats.drop_duplicates(subset=['Renner'], keep='first')
-        
-        overlap_cols = [c for c in df_stats.columns if c in df_prog.columns and c != 'Renner']
-        df_stats = df_stats.drop(columns=overlap_cols)
-        
-        short_names = df_prog['Renner'].unique()
-        full_names = df_stats['Renner'].unique()
-        norm_to_full = {normalize_name_logic(n): n for n in full_names}
-        norm_full_names = list(norm_to_full.keys())
-        name_mapping = {}
-        
-        manual_overrides = {
-            "Poel": "Mathieu van der Poel", "Aert": "Wout van Aert", "Lie": "Arnaud De Lie",
-            "Gils": "Maxim Van Gils", "Broek": "Frank van den Broek",
-            "Magnier": "Paul Magnier", "Pogacar": "Tadej Pogačar", "Skujins": "Toms Skujiņš",
-            "Kooij": "Olav Kooij"
-        }
-        
-        for short in short_names:
-            if short in manual_overrides:
-                name_mapping[short] = manual_overrides[short]
-            else:
-                norm_short = normalize_name_logic(short)
-                match_res = process.extractOne(norm_short, norm_full_names, scorer=fuzz.token_set_ratio)
-                if match_res and match_res[1] > 75:
-                    name_mapping[short] = norm_to_full[match_res[0]]
-                else:
-                    name_mapping[short] = short
+def get_uitslagen(alle_renners):
+    def match_naam(rider_name):
+        match = process.extractOne(rider_name, alle_renners, scorer=fuzz.token_set_ratio)
+        return match[0] if match and match[1] > 70 else None
 
-        df_prog['Renner_Full'] = df_prog['Renner'].map(name_mapping)
-        merged_df = pd.merge(df_prog, df_stats, left_on='Renner_Full', right_on='Renner', how='left')
-        
-        if 'Renner_x' in merged_df.columns:
-            merged_df = merged_df.drop(columns=['Renner_x', 'Renner_y'], errors='ignore')
-            
-        merged_df['Prijs'] = pd.to_numeric(merged_df['Prijs'], errors='coerce').fillna(0).astype(int)
-        merged_df = merged_df.sort_values(by='Prijs', ascending=False)
-        merged_df = merged_df.drop_duplicates(subset=['Renner_Full'], keep='first')
-        merged_df = merged_df.rename(columns={'Renner_Full': 'Renner'})
-        
-        ALLE_KOERSEN = ["OML", "KBK", "SAM", "STR", "NOK", "BKC", "MSR", "RVB", "E3", "IFF", "DDV", "RVV", "SP", "PR", "RVL", "BRP", "AGT", "WAP", "LBL"]
-        available_races = [k for k in ALLE_KOERSEN if k in merged_df.columns]
-        
-        all_stats_cols = ['COB', 'HLL', 'SPR', 'AVG', 'FLT', 'MTN', 'ITT', 'GC', 'OR', 'TTL']
-        for col in available_races + all_stats_cols:
-            if col not in merged_df.columns:
-                merged_df[col] = 0
-            merged_df[col] = pd.to_numeric(merged_df[col], errors='coerce').fillna(0).astype(int)
-            
-        if 'Team' not in merged_df.columns:
-            merged_df['Team'] = 'Onbekend'
-        else:
-            merged_df['Team'] = merged_df['Team'].fillna('Onbekend')
-        
-        koers_stat_map = {
-            "OML": "COB", "KBK": "SPR", "SAM": "COB", "STR": "HLL", "NOK": "SPR", 
-            "BKC": "SPR", "MSR": "AVG", "RVB": "SPR", "E3": "COB", "IFF": "SPR", 
-            "DDV": "COB", "RVV": "COB", "SP": "SPR", "PR": "COB", "RVL": "SPR", 
-            "BRP": "HLL", "AGT": "HLL", "WAP": "HLL", "LBL": "HLL"
-        }
-        
-        return merged_df, available_races, koers_stat_map
-    except Exception as e:
-        st.error(f"Fout in dataverwerking: {e}")
-        return pd.DataFrame(), [], {}
-
-@st.cache_data
-def get_uitslagen(file_mod_time, alle_renners):
-    if not os.path.exists("data/uitslagen.csv"):
-        return pd.DataFrame()
     try:
-        df_raw_uitslagen = pd.read_csv("data/uitslagen.csv", sep=None, engine='python')
-        df_raw_uitslagen.columns = [str(c).strip().title() for c in df_raw_uitslagen.columns]
-        
-        if 'Race' not in df_raw_uitslagen.columns or 'Rider' not in df_raw_uitslagen.columns or 'Rnk' not in df_raw_uitslagen.columns:
+        store = load_results()
+        df_u = store.matched(("sporza_klassiekers", hash(tuple(alle_renners))), match_naam)
+        if df_u.empty:
             return pd.DataFrame()
-            
-        scorito_naar_sporza_map = {
-            'OHN': 'OML', 'SB': 'STR', 'BDP': 'RVB', 
-            'GW': 'IFF', 'BP': 'BRP', 'AGR': 'AGT', 'WP': 'WAP'
-        }
-            
-        uitslag_parsed = []
-        match_cache = {}
-
-        for race, rnk, rider in zip(df_raw_uitslagen['Race'], df_raw_uitslagen['Rnk'], df_raw_uitslagen['Rider']):
-            koers_origineel = str(race).strip().upper()
-            koers = scorito_naar_sporza_map.get(koers_origineel, koers_origineel)
-            
-            rank_str = str(rnk).strip().upper()
-            if rank_str in ['DNS', 'NAN', '']:
-                continue
-            
-            rider_name = str(rider).strip()
-
-            if rider_name not in match_cache:
-                match_cache[rider_name] = process.extractOne(rider_name, alle_renners, scorer=fuzz.token_set_ratio)
-
-            match = match_cache[rider_name]
-
-            if match and match[1] > 70:
-                uitslag_parsed.append({
-                    "Race": koers,
-                    "Rnk": rank_str,
-                    "Renner": match[0]
-                })
-        return pd.DataFrame(uitslag_parsed)
+        return df_u.assign(Race=df_u['Race'].replace(SCORITO_NAAR_SPORZA))
     except:
         return pd.DataFrame()
 
-def calculate_sporza_ev(df, available_races, koers_stat_map, method):
-    df = df.copy()
-    pts_monument = [125, 100, 80, 70, 60, 50, 45, 40, 37, 34, 31, 28, 25, 22, 20, 18, 16, 14, 12, 10]
-    pts_wt = [100, 80, 65, 55, 48, 40, 36, 32, 30, 27, 24, 22, 20, 18, 16, 14, 12, 10, 9, 8]
-    pts_non_wt = [80, 64, 52, 44, 38, 32, 29, 26, 24, 22, 20, 18, 16, 14, 12, 11, 10, 9, 8, 7]
-    
-    monuments = ["MSR", "RVV", "PR", "LBL"]
-    world_tour = ["OML", "STR", "RVB", "E3", "IFF", "DDV", "AGT", "WAP"]
-    
-    race_evs = {}
-    for koers in available_races:
-        stat = koers_stat_map.get(koers, 'AVG')
-        starters = df[df[koers] == 1].copy()
-        starters = starters.sort_values(by=[stat, 'AVG'], ascending=[False, False])
-        
-        if koers in monuments: scorito_pts = pts_monument
-        elif koers in world_tour: scorito_pts = pts_wt
-        else: scorito_pts = pts_non_wt
-        
-        race_ev = pd.Series(0.0, index=df.index)
-        for i, idx in enumerate(starters.index):
-            val = 0.0
-            if "Sporza Ranking" in method:
-                val = scorito_pts[i] if i < len(scorito_pts) else 0.0
-            elif "Originele Curve" in method:
-                val = (starters.loc[idx, stat] / 100)**4 * scorito_pts[0]
-                
-            if i == 0: val += 30
-            elif i == 1: val += 25
-            elif i == 2: val += 20
-            race_ev.loc[idx] = val
-        
-        race_evs[koers] = race_ev
-        df[f'EV_{koers}'] = race_ev
-
-    df['EV_all'] = sum(race_evs.values()) if race_evs else 0.0
-    df['Sporza_EV'] = df['EV_all'].fillna(0).round(0).astype(int)
-    df['Waarde (EV/M)'] = (df['Sporza_EV'] / df['Prijs']).replace([float('inf'), -float('inf')], 0).fillna(0).round(1)
-    
-    return df
-
-def bepaal_klassieker_type(row):
-    try:
-        cob = int(row.get('COB', 0))
-        hll = int(row.get('HLL', 0))
-        spr = int(row.get('SPR', 0))
-        mtn = int(row.get('MTN', 0))
-        itt = int(row.get('ITT', 0))
-        gc = int(row.get('GC', 0))
-    except (ValueError, TypeError):
-        return 'Onbekend'
-
-    elite = []
-    if cob >= 85: elite.append('Kassei')
-    if hll >= 85: elite.append('Heuvel')
-    if spr >= 85: elite.append('Sprint')
-    
-    if len(elite) == 3: return 'Allround / Multispecialist'
-    elif len(elite) == 2: return ' / '.join(elite)
-    elif len(elite) == 1: return elite[0]
-    else:
-        s = {'Kassei': cob, 'Heuvel': hll, 'Sprint': spr, 'Klimmer': mtn, 'Tijdrit': itt, 'Klassement': gc}
-        if sum(s.values()) == 0: return 'Onbekend'
-        return max(s, key=s.get)
-
-# --- SPORZA SOLVER ---
-def solve_sporza_dynamic(df, available_races, t_moments, force_base, ban_base, exclude_list):
-    prob = pulp.LpProblem("Sporza_Solver_Dynamic", pulp.LpMaximize)
-    K = len(t_moments)
-
-    x = pulp.LpVariable.dicts("Base", df.index, cat='Binary')
-    y = [pulp.LpVariable.dicts(f"Uit_{k}", df.index, cat='Binary') for k in range(K)]
-    z = [pulp.LpVariable.dicts(f"In_{k}", df.index, cat='Binary') for k in range(K)]
-    s = {r: pulp.LpVariable.dicts(f"Start_{r}", df.index, cat='Binary') for r in available_races}
-
-    prob += pulp.lpSum([s[r][i] * df.loc[i, f'EV_{r}'] for r in available_races for i in df.index])
-    prob += pulp.lpSum([x[i] for i in df.index]) == 20
-
-    for i in df.index:
-        renner = df.loc[i, 'Renner']
-        if renner in force_base: prob += x[i] == 1
-        if renner in ban_base: prob += x[i] == 0
-        if renner in exclude_list: 
-            prob += x[i] == 0
-            for k in range(K): prob += z[k][i] == 0
-
-    for k in range(K):
-        prob += pulp.lpSum([y[k][i] for i in df.index]) == 1 
-        prob += pulp.lpSum([z[k][i] for i in df.index]) == 1 
-
-    for i in df.index:
-        prob += x[i] + pulp.lpSum([z[k][i] for k in range(K)]) <= 1
-
-    for k in range(K):
-        for i in df.index:
-            active_before = x[i] - pulp.lpSum([y[m][i] for m in range(k)]) + pulp.lpSum([z[m][i] for m in range(k)])
-            prob += y[k][i] <= active_before
-
-    penalties = [0, 0, 0, 0, 1, 3, 6, 10, 15]
-    teams = df['Team'].unique()
-
-    for p in range(K + 1):
-        budget_limit = 120 - penalties[p]
-        prob += pulp.lpSum([(x[j] - pulp.lpSum([y[m][j] for m in range(p)]) + pulp.lpSum([z[m][j] for m in range(p)])) * df.loc[j, 'Prijs'] for j in df.index]) <= budget_limit
-        
-        for team in teams:
-            team_indices = df[df['Team'] == team].index
-            prob += pulp.lpSum([(x[j] - pulp.lpSum([y[m][j] for m in range(p)]) + pulp.lpSum([z[m][j] for m in range(p)])) for j in team_indices]) <= 4
-
-    for r in available_races:
-        idx_r = available_races.index(r)
-        active_transfers = []
-        for k, m in enumerate(t_moments):
-            if available_races.index(m) < idx_r:
-                active_transfers.append(k)
-
-        for i in df.index:
-            active_at_r = x[i] - pulp.lpSum([y[k][i] for k in active_transfers]) + pulp.lpSum([z[k][i] for k in active_transfers])
-            prob += s[r][i] <= active_at_r
-            prob += s[r][i] <= df.loc[i, r]
-
-        prob += pulp.lpSum([s[r][i] for i in df.index]) <= 12
-
-    time_limit = 20 if K <= 2 else 40
-    prob.solve(pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit))
-
-    if pulp.LpStatus[prob.status] == 'Optimal':
-        base_team = [df.loc[i, 'Renner'] for i in df.index if x[i].varValue > 0.5]
-        transfer_plan = []
-        for k in range(K):
-            uit = [df.loc[i, 'Renner'] for i in df.index if y[k][i].varValue > 0.5]
-            erin = [df.loc[i, 'Renner'] for i in df.index if z[k][i].varValue > 0.5]
-            if uit and erin:
-                transfer_plan.append({"uit": uit[0], "in": erin[0], "moment": t_moments[k]})
-        return base_team, transfer_plan
-    return [], []
-
 # --- HOOFDCODE ---
 prog_time = get_file_mod_time("data/sporza_prijzen_startlijst.csv")
 stats_time = get_file_mod_time("data/renners_stats.csv")
@@ -347,15 +87,16 @@ with st.sidebar:
             if st.button("💾 Opslaan", type="primary", use_container_width=True):
                 try:
                     team_data = {"selected_riders": st.session_state.sporza_selected_riders, "transfer_plan": st.session_state.sporza_transfer_plan, "ts": datetime.now().strftime("%Y-%m-%d %H:%M")}
-                    supabase.table(TABEL_NAAM).update({"sporza_team": team_data}).eq("username", speler_naam).execute()
-                    st.success("Cloud-backup geslaagd!")
+                    if repo.save_game_state(speler_naam, "sporza_team", team_data):
+                        st.success("Cloud-backup geslaagd!")
+                    else:
+                        st.error(f"Niet opgeslagen: geen account gevonden voor {speler_naam}.")
                 except Exception as e: st.error(f"Fout: {e}")
         with c_cloud2:
             if st.button("🔄 Inladen", use_container_width=True):
                 try:
-                    res = supabase.table(TABEL_NAAM).select("sporza_team").eq("username", speler_naam).execute()
-                    if res.data and res.data[0].get('sporza_team'):
-                        d = res.data[0]['sporza_team']
+                    d = repo.load_game_state(speler_naam, "sporza_team")
+                    if d:
                         st.session_state.sporza_selected_riders = d.get("selected_riders", [])
                         st.session_state.sporza_transfer_plan = d.get("transfer_plan", [])
                         st.success(f"Team geladen (van {d.get('ts', '?')})")
@@ -384,7 +125,7 @@ with st.sidebar:
 
     st.divider()
     st.title("🚴 Sporza AI Coach")
-    ev_method = st.selectbox("🧮 Rekenmodel (EV)", ["1. Sporza Ranking (Dynamisch)", "2. Originele Curve (Macht 4)"], help="Kies hoe de AI punten berekent. 'Originele Curve' geeft exponentiële waarde aan specialisten.")
+    ev_method = st.selectbox("🧮 Rekenmodel (EV)", EV_METHODS, help="Kies hoe de AI punten berekent. 'Originele Curve' geeft exponentiële waarde aan specialisten.")
     toon_uitslagen = st.checkbox("🏁 Koersen zijn begonnen (Toon uitslagen)", value=True, help="Toont daadwerkelijke uitslagen en medailles in plaats van alleen de verwachte matrix.")
     
     st.divider()
@@ -409,7 +150,7 @@ with st.sidebar:
             st.success("✅ Deze transfers zijn gratis in Sporza.")
 
     df = calculate_sporza_ev(df_raw, available_races, koers_mapping, ev_method)
-    df['Type'] = df.apply(bepaal_klassieker_type, axis=1)
+    df['Type'] = klassieker_types(df)
 
     with st.expander("🔒 Renners Forceren / Uitsluiten", expanded=False):
         force_base = st.multiselect("🟢 Moet in start-team:", options=df['Renner'].tolist(), help="Kies renners die verplicht in je start-team moeten zitten.")
@@ -431,7 +172,7 @@ st.title("🚴 Voorjaarsklassiekers: Sporza Wielermanager")
 st.markdown("**Met dank aan:** [Wielerorakel.nl](https://www.cyclingoracle.com/)")
 st.divider()
 
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["🚀 Jouw Team & Transfers", "🗓️ Startlijst & Uitslagen", "👑 Kopmannen", "📋 Database", "ℹ️ Uitleg"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🚀 Jouw Team & Transfers", "🗓️ Startlijst & Uitslagen", "👑 Kopmannen", "📋 Database", "ℹ️ Uitleg", "🧪 Gevoeligheid"])
 
 if not st.session_state.sporza_selected_riders:
     with tab1: st.info("👈 Kies je instellingen en klik op **Bereken Sporza Team** om te beginnen!")
@@ -439,13 +180,11 @@ else:
     all_display_riders = list(set(st.session_state.sporza_selected_riders + [t['in'] for t in st.session_state.sporza_transfer_plan]))
     current_df = df[df['Renner'].isin(all_display_riders)].copy()
     
-    def bepaal_rol_en_moment(naam):
-        for t in st.session_state.sporza_transfer_plan:
-            if naam == t['uit']: return f"Verkocht na {t['moment']}"
-            if naam == t['in']: return f"Gekocht na {t['moment']}"
-        return 'Basis (Blijft)'
-
-    current_df['Rol'] = current_df['Renner'].apply(bepaal_rol_en_moment)
+    current_df['Rol'] = rol_en_moment(current_df['Renner'], st.session_state.sporza_transfer_plan)
+    penalties = [0, 0, 0, 0, 1, 3, 6, 10, 15]
+    prijzen = dict(zip(df['Renner'], df['Prijs']))
+    timeline = OwnershipTimeline(st.session_state.sporza_selected_riders, st.session_state.sporza_transfer_plan, available_races,
+                                 prijzen, lambda n: 120 - penalties[n])
     start_team_df = current_df[current_df['Renner'].isin(st.session_state.sporza_selected_riders)]
     
     with tab1:
@@ -466,14 +205,8 @@ else:
             if not st.session_state.sporza_transfer_plan:
                 st.info("Geen transfers ingepland.")
             else:
-                temp_team = list(st.session_state.sporza_selected_riders)
-                penalties = [0, 0, 0, 0, 1, 3, 6, 10, 15]
                 for i, t in enumerate(st.session_state.sporza_transfer_plan):
-                    if t['uit'] in temp_team: temp_team.remove(t['uit'])
-                    if t['in'] not in temp_team: temp_team.append(t['in'])
-                    
-                    budget_limiet = 120 - penalties[i+1]
-                    budget_now = budget_limiet - df[df['Renner'].isin(temp_team)]['Prijs'].sum()
+                    budget_now = timeline.speling_na_wissel(i)
                     kosten_text = "Gratis" if i < 3 else f"-€{penalties[i+1]-penalties[i]}M Boete"
                     
                     st.markdown(f"***Wissel {i+1} (ná {t['moment']} | Speling: €{budget_now}M | {kosten_text})***")
@@ -493,25 +226,17 @@ else:
                 else:
                     m_race = st.selectbox("Wisselmoment (Ná race):", options=available_races[:-1], index=len(available_races)-2)
 
-                    actief_op_moment = list(st.session_state.sporza_selected_riders)
-                    idx_m = available_races.index(m_race)
-                    for t in st.session_state.sporza_transfer_plan:
-                        if available_races.index(t['moment']) <= idx_m:
-                            if t['uit'] in actief_op_moment: actief_op_moment.remove(t['uit'])
-                            if t['in'] not in actief_op_moment: actief_op_moment.append(t['in'])
+                    actief_op_moment = timeline.team_na(m_race)
 
                     m_uit = st.selectbox("❌ Wie gaat eruit?", options=sorted(actief_op_moment))
                     m_in_opties = [r for r in df['Renner'].tolist() if r not in actief_op_moment]
                     m_in = st.selectbox("📥 Wie komt erin?", options=sorted(m_in_opties))
 
                     if st.button("➕ Voeg Wissel Toe", use_container_width=True):
-                        test_team = list(actief_op_moment)
-                        test_team.remove(m_uit)
-                        test_team.append(m_in)
-                        test_kosten = df[df['Renner'].isin(test_team)]['Prijs'].sum()
+                        test_team = [r for r in actief_op_moment if r != m_uit] + [m_in]
+                        test_kosten = timeline.kosten_na(m_race) - prijzen.get(m_uit, 0) + prijzen.get(m_in, 0)
 
                         aantal_transfers_na_toevoegen = len(st.session_state.sporza_transfer_plan) + 1
-                        penalties = [0, 0, 0, 0, 1, 3, 6, 10, 15]
                         budget_limiet = 120 - penalties[aantal_transfers_na_toevoegen]
 
                         # Controleer ploeglimieten
@@ -602,55 +327,16 @@ else:
         
         if toon_uitslagen:
             st.success("✅ Actuele uitslagen ingeladen! Top 30 finishes worden beloond met een medaille (🏅). De tabel blijft perfect sorteerbaar.")
-            u_time = get_file_mod_time("data/uitslagen.csv")
-            df_uitslagen = get_uitslagen(u_time, df['Renner'].tolist())
-            verreden_koersen = df_uitslagen['Race'].unique() if not df_uitslagen.empty else []
+            df_uitslagen = get_uitslagen(df['Renner'].tolist())
         else:
             df_uitslagen = pd.DataFrame()
-            verreden_koersen = []
 
         matrix_df = current_df[['Renner', 'Prijs', 'Rol'] + available_races].set_index('Renner')
-        active_matrix = matrix_df.copy()
-
-        for r in current_df['Renner']:
-            rol = current_df.loc[current_df['Renner'] == r, 'Rol'].values[0]
-            if 'Verkocht na' in rol:
-                moment = rol.replace('Verkocht na ', '')
-                if moment in available_races:
-                    idx = available_races.index(moment) + 1
-                    active_matrix.loc[r, available_races[idx:]] = 0
-            elif 'Gekocht na' in rol:
-                moment = rol.replace('Gekocht na ', '')
-                if moment in available_races:
-                    idx = available_races.index(moment) + 1
-                    active_matrix.loc[r, available_races[:idx]] = 0
-
-        display_matrix = active_matrix[available_races].copy()
-        
-        totals_dict = {}
-        kopmannen_dict = {}
-        for c in available_races:
-            active_riders_in_race = [r for r in active_matrix.index if active_matrix.loc[r, c] == 1]
-            starters_df = current_df[current_df['Renner'].isin(active_riders_in_race)].sort_values(by=f'EV_{c}', ascending=False).head(12)
-            starters_names = starters_df['Renner'].values
-            
-            kopman = starters_names[0] if len(starters_names) > 0 else "-"
-            kopmannen_dict[c] = kopman
-            totals_dict[c] = str(len(starters_names))
-            
-            is_verreden = c in verreden_koersen
-            df_k = df_uitslagen[df_uitslagen['Race'] == c] if is_verreden else pd.DataFrame()
-            
-            for r in display_matrix.index:
-                is_on_list = (active_matrix.loc[r, c] == 1)
-                is_starter = r in starters_names
-                rank_str = None
-                if is_verreden:
-                    res = df_k[df_k['Renner'] == r]
-                    if not res.empty: rank_str = res['Rnk'].values[0]
-                
-                display_matrix.loc[r, c] = get_numeric_status(is_on_list, is_starter, is_verreden, rank_str)
-            display_matrix[c] = pd.to_numeric(display_matrix[c])
+        active_matrix = active_roster(matrix_df, available_races, timeline)
+
+        starters_matrix, kopmannen = starters_and_captains(current_df, available_races, active_matrix)
+
+        display_matrix = race_status_matrix(active_matrix, df_uitslagen, starters_matrix)
 
         display_matrix.insert(0, 'Rol', matrix_df['Rol'])
         
@@ -675,19 +361,9 @@ else:
         st.header("👑 Kopmannen Advies")
         st.write("In Sporza kies je slechts **1 kopman** per koers voor bonuspunten. Hier is de beste keuze uit jouw geselecteerde 12 starters.")
         
-        kop_res = []
-        for c in available_races:
-            active_riders_in_race = [r for r in active_matrix.index if active_matrix.loc[r, c] == 1]
-            starters_df = current_df[current_df['Renner'].isin(active_riders_in_race)].sort_values(by=f'EV_{c}', ascending=False).head(12)
-            top = starters_df['Renner'].tolist()
-            
-            kop_res.append({
-                "Koers": c, 
-                "👑 Absolute Kopman": top[0] if len(top)>0 else "-", 
-                "Alternatief 1": top[1] if len(top)>1 else "-",
-                "Alternatief 2": top[2] if len(top)>2 else "-"
-            })
-        st.dataframe(pd.DataFrame(kop_res), hide_index=True, use_container_width=True)
+        kop_res = kopmannen.fillna("-").rename_axis("Koers").reset_index()
+        kop_res.columns = ["Koers", "👑 Absolute Kopman", "Alternatief 1", "Alternatief 2"]
+        st.dataframe(kop_res, hide_index=True, use_container_width=True)
 
 with tab4:
     st.header("📋 Database: Alle Renners (Sporza Prijzen)")
@@ -703,27 +379,9 @@ with tab4:
 
     d_df = f_df[['Renner', 'Team', 'Prijs', 'Waarde (EV/M)', 'Type', 'Sporza_EV'] + available_races].copy()
     
-    if toon_uitslagen:
-        u_time = get_file_mod_time("data/uitslagen.csv")
-        df_uitslagen_db = get_uitslagen(u_time, df['Renner'].tolist())
-        verreden_koersen_db = df_uitslagen_db['Race'].unique() if not df_uitslagen_db.empty else []
-    else:
-        df_uitslagen_db = pd.DataFrame()
-        verreden_koersen_db = []
-
-    for c in available_races:
-        is_verreden = c in verreden_koersen_db
-        df_k = df_uitslagen_db[df_uitslagen_db['Race'] == c] if is_verreden else pd.DataFrame()
-        
-        new_col = []
-        for r, val in zip(d_df['Renner'], d_df[c]):
-            is_on_list = (val == 1)
-            rank_str = None
-            if is_verreden:
-                res = df_k[df_k['Renner'] == r]
-                if not res.empty: rank_str = res['Rnk'].values[0]
-            new_col.append(get_numeric_status(is_on_list, is_on_list, is_verreden, rank_str))
-        d_df[c] = pd.to_numeric(new_col)
+    df_uitslagen_db = get_uitslagen(df['Renner'].tolist()) if toon_uitslagen else pd.DataFrame()
+    on_list_db = pd.DataFrame(d_df[available_races].to_numpy() == 1, index=d_df['Renner'], columns=available_races)
+    d_df[available_races] = race_status_matrix(on_list_db, df_uitslagen_db).to_numpy()
     
     format_dict = {c: lambda x: format_race_status(x, 30) for c in available_races}
     format_dict['Prijs'] = lambda x: f"€ {int(x)}M"
@@ -781,3 +439,43 @@ with tab5:
     * **Opslaan (Back-up maken):** Onderaan Tab 1 vind je 'Exporteer Team'. Download je bestand als `.json`. Dit bevat de exacte 20 renners én je wisselmomenten.
     * **Inladen (Team terughalen):** Ga in de linker zijbalk naar **📂 Oude Teams Inladen**. Upload je `.json` bestand. Het script controleert automatisch via *Fuzzy Matching* of oude namen nog correct in de database staan.
     """)
+
+with tab6:
+    st.header("🧪 Gevoeligheidsanalyse")
+    st.markdown("Hoe verandert het optimale team bij een ander rekenmodel of andere wisselmomenten? De AI rekent elk scenario parallel door en toont de resultaten zodra ze binnenkomen. Eerder berekende scenario's komen direct uit de cache.")
+
+    sc1, sc2 = st.columns(2)
+    with sc1:
+        sweep_methods = st.multiselect("🧮 Rekenmodellen", options=EV_METHODS, default=[ev_method], help="Elk gekozen rekenmodel wordt als apart scenario doorgerekend.")
+        cpu_count = os.cpu_count() or 1
+        if cpu_count > 1:
+            sweep_workers = st.slider("Parallelle processen", 1, cpu_count, min(4, cpu_count), help="Aantal scenario's dat tegelijk wordt doorgerekend.")
+        else:
+            # Een slider met min == max geeft een fout; op één CPU rekent de sweep met één proces
+            sweep_workers = 1
+    with sc2:
+        sweep_moments = st.multiselect("🗓️ Wisselmoment-varianten", options=["GEEN"] + available_races[:-1], default=["GEEN"], help="Per gekozen koers wordt een scenario met één wissel na die koers berekend. 'GEEN' rekent zonder wissels.")
+        include_current = st.checkbox("Neem huidige wisselplanning mee", value=bool(t_moments), help="Voegt het scenario met de wisselmomenten uit de zijbalk toe.")
+
+    sweep_t_moments = [[] if m == "GEEN" else [m] for m in sweep_moments]
+    if include_current and t_moments and list(t_moments) not in sweep_t_moments:
+        sweep_t_moments.append(list(t_moments))
+    scenarios = build_grid("sporza", {"ev_method": sweep_methods, "t_moments": sweep_t_moments})
+    st.caption(f"{len(scenarios)} scenario's in deze sweep. Je geforceerde, uitgesloten en genegeerde renners gelden voor elk scenario.")
+    sweep_constraints = {"force_base": force_base, "ban_base": ban_base, "exclude_list": exclude_list}
+
+    if st.button("▶️ Start Sweep", type="primary", use_container_width=True):
+        progress = st.progress(0.0, text="Scenario's worden doorgerekend...")
+        table_placeholder = st.empty()
+        sweep_results = []
+        for res in run_sweep("sporza", df_raw, available_races, koers_mapping, scenarios, max_workers=sweep_workers, constraints=sweep_constraints):
+            sweep_results.append(res)
+            progress.progress(len(sweep_results) / len(scenarios), text=f"{len(sweep_results)}/{len(scenarios)} scenario's klaar")
+            table_placeholder.dataframe(summarize_sweep(sweep_results), hide_index=True, use_container_width=True)
+        st.session_state.sporza_sweep_results = sweep_results
+
+    if st.session_state.get("sporza_sweep_results"):
+        st.subheader("📈 Objective per scenario")
+        st.dataframe(summarize_sweep(st.session_state.sporza_sweep_results), hide_index=True, use_container_width=True)
+        st.subheader("🔁 Hoe vaak zit een renner in het team?")
+        st.dataframe(inclusion_frequencies(st.session_state.sporza_sweep_results), hide_index=True, use_container_width=True)
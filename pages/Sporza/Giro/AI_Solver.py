@@ -3,14 +3,14 @@ import pandas as pd
 import pulp
 import json
 import os
-import base64
 from thefuzz import process, fuzz
-from app_utils.db import init_connection
+from app_utils.storage import get_repository
 from app_utils.name_matching import match_naam_slim, normalize_name_logic
 from datetime import datetime
 from app_utils.claude_predictions import genereer_claude_etappe_voorspellingen
 from app_utils.giro_data import load_giro_data, calculate_giro_ev
 from app_utils.giro_solver import solve_giro_team
+from app_utils.stage_images import clickable_image_html
 
 # --- CONFIGURATIE ---
 st.set_page_config(page_title="Sporza Giro Suggesties Solver", layout="wide", page_icon="🤖")
@@ -21,8 +21,8 @@ if "ingelogde_speler" not in st.session_state:
 
 speler_naam = st.session_state["ingelogde_speler"]
 
-supabase = init_connection()
 TABEL_NAAM = st.secrets.get("TABEL_NAAM", "gebruikers_data_test")
+repo = get_repository(TABEL_NAAM)
 DB_KOLOM = "sporza_giro_team26"
 
 # --- ETAPPE DATA ---
@@ -73,18 +73,6 @@ def laad_profiel_scores():
 laad_profiel_scores()
 
 # --- HULPFUNCTIES ---
-def get_clickable_image_html(image_path, fallback_text, link):
-    if os.path.exists(image_path):
-        try:
-            with open(image_path, "rb") as img_file:
-                encoded_string = base64.b64encode(img_file.read()).decode()
-            ext = "png" if image_path.lower().endswith(".png") else "jpeg"
-            img_src = f"data:image/{ext};base64,{encoded_string}"
-        except Exception:
-            img_src = f"https://placehold.co/600x400/eeeeee/000000?text={fallback_text}"
-    else:
-        img_src = f"https://placehold.co/600x400/eeeeee/000000?text={fallback_text}"
-    return f'<a href="{link}" target="_blank"><img src="{img_src}" width="100%" style="border-radius:8px;"></a>'
 
 # --- DATA LADEN ---
 def calculate_prediction_ev(df, predictions, top_x):
@@ -130,13 +118,14 @@ with st.sidebar:
                     "reasoning":       st.session_state.giro_reasoning,
                     "ts":              datetime.now().strftime("%Y-%m-%d %H:%M"),
                 }
-                supabase.table(TABEL_NAAM).update({DB_KOLOM: data}).eq("username", speler_naam).execute()
-                st.success("Opgeslagen!")
+                if repo.save_game_state(speler_naam, DB_KOLOM, data):
+                    st.success("Opgeslagen!")
+                else:
+                    st.error(f"Niet opgeslagen: geen account gevonden voor {speler_naam}.")
         with c_cloud2:
             if st.button("🔄 Inladen", use_container_width=True):
-                res = supabase.table(TABEL_NAAM).select(DB_KOLOM).eq("username", speler_naam).execute()
-                if res.data and res.data[0].get(DB_KOLOM):
-                    db_data = res.data[0][DB_KOLOM]
+                db_data = repo.load_game_state(speler_naam, DB_KOLOM)
+                if db_data:
                     st.session_state.giro_selected_riders   = db_data.get("selected_riders", [])
                     st.session_state.giro_stage_predictions = db_data.get("predictions", {str(s["id"]): [None]*10 for s in GIRO_ETAPPES})
                     st.session_state.giro_weights           = db_data.get("weights",      {str(e["id"]): e["w"].copy() for e in GIRO_ETAPPES})
@@ -219,11 +208,23 @@ with tab2:
 
     c1, c2 = st.columns([1, 4])
     if c1.button("🤖 Analyseer alle 21 etappes", type="primary"):
+        voortgang = st.progress(0.0, text="🤖 Etappes analyseren...")
+        live = st.container()
+        klaar = []
+
+        def toon_etappe(sid, picks, reden):
+            klaar.append(sid)
+            voortgang.progress(len(klaar) / len(GIRO_ETAPPES), text=f"🤖 {len(klaar)}/{len(GIRO_ETAPPES)} etappes klaar")
+            live.write(f"✅ Etappe {sid}: {', '.join(p for p in picks if p)}")
+
+        # Per 3 etappes een verzoek, max. 4 tegelijk; mislukte etappes worden opnieuw gevraagd
         preds, reasoning = genereer_claude_etappe_voorspellingen(
             df,
             GIRO_ETAPPES,
             top_x_voorspellingen,
             st.session_state.giro_weights,
+            stages_per_request=3,
+            on_stage=toon_etappe,
         )
         st.session_state.giro_stage_predictions = preds
         st.session_state.giro_reasoning         = reasoning
@@ -259,8 +260,8 @@ with tab2:
 
             st.markdown("*(Klik op een afbeelding voor de officiële info)*")
             i1, i2 = st.columns(2)
-            i1.markdown(get_clickable_image_html(map_path,  f"Kaart+Etappe+{etappe['id']}", giro_link), unsafe_allow_html=True)
-            i2.markdown(get_clickable_image_html(prof_path, f"Profiel+Etappe+{etappe['id']}", giro_link), unsafe_allow_html=True)
+            i1.markdown(clickable_image_html(map_path,  f"Kaart+Etappe+{etappe['id']}", giro_link), unsafe_allow_html=True)
+            i2.markdown(clickable_image_html(prof_path, f"Profiel+Etappe+{etappe['id']}", giro_link), unsafe_allow_html=True)
 
             st.divider()
 
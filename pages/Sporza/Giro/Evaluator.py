@@ -5,7 +5,8 @@ import unicodedata
 import os
 import functools
 from thefuzz import process, fuzz
-from app_utils.db import init_connection
+from app_utils.storage import get_repository
+from app_utils.data_access import rider_stats
 from datetime import datetime
 
 # --- CONFIGURATIE ---
@@ -17,8 +18,8 @@ if "ingelogde_speler" not in st.session_state:
 
 speler_naam = st.session_state["ingelogde_speler"]
 
-supabase = init_connection()
 TABEL_NAAM = st.secrets.get("TABEL_NAAM", "gebruikers_data_test")
+repo = get_repository(TABEL_NAAM)
 
 # --- CONSTANTEN ---
 GIRO_ETAPPES = list(range(1, 22))  # 21 etappes
@@ -111,17 +112,11 @@ def match_naam(naam, alle_renners):
     """Wrapper voor backwards compatibility en om lists naar tuples te casten voor caching."""
     return match_naam_cached(naam, tuple(alle_renners))
 
-@st.cache_data
 def load_stats():
     base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
     stats_file = os.path.join(base_dir, "data", "renners_stats.csv")
     if not os.path.exists(stats_file): return pd.DataFrame()
-    df = pd.read_csv(stats_file, sep=None, engine='python')
-    if 'Naam' in df.columns: df = df.rename(columns={'Naam': 'Renner'})
-    for col in ['GC', 'SPR', 'ITT', 'MTN']:
-        if col not in df.columns: df[col] = 0
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    return df.drop_duplicates(subset=['Renner'])
+    return rider_stats(stats_file)
 
 @st.cache_data
 def load_giro_results():
@@ -240,9 +235,8 @@ with st.sidebar:
     if speler_naam != "gast":
         with col1:
             if st.button("🤖 AI Solver", use_container_width=True):
-                res = supabase.table(TABEL_NAAM).select("sporza_giro_team26").eq("username", speler_naam).execute()
-                if res.data and res.data[0].get("sporza_giro_team26"):
-                    d = res.data[0]["sporza_giro_team26"]
+                d = repo.load_game_state(speler_naam, "sporza_giro_team26")
+                if d:
                     st.session_state["eval_ai_team"] = {
                         "renners": d.get("selected_riders", []),
                         "keuzes": d.get("predictions", {str(i): [None]*10 for i in range(1, 22)})
@@ -251,9 +245,8 @@ with st.sidebar:
 
         with col2:
             if st.button("🛠️ Bouwer", use_container_width=True):
-                res = supabase.table(TABEL_NAAM).select("sporza_giro_team26_v2").eq("username", speler_naam).execute()
-                if res.data and res.data[0].get("sporza_giro_team26_v2"):
-                    d = res.data[0]["sporza_giro_team26_v2"]
+                d = repo.load_game_state(speler_naam, "sporza_giro_team26_v2")
+                if d:
                     st.session_state["eval_bouwer_team"] = {
                         "renners":       d.get("team", []),
                         "keuzes":        d.get("etappe_keuzes",  {str(i): [None, None, None] for i in range(1, 22)}),
@@ -1,12 +1,12 @@
 import streamlit as st
-from app_utils.db import init_connection
-from app_utils.crypto import hash_wachtwoord, verify_wachtwoord
+from app_utils.storage import get_repository
+from app_utils.crypto import controleer_login, wachttijd, LOGIN_OK, LOGIN_TE_VEEL, LOGIN_DRUK
 
 st.set_page_config(page_title="Wieler Spellen Solver", page_icon="🚴‍♂️", layout="wide")
 
 # --- DATABASE CONNECTIE ---
-supabase = init_connection()
 TABEL_NAAM = st.secrets.get("TABEL_NAAM", "gebruikers_data_test")
+repo = get_repository(TABEL_NAAM)
 
 # --- INLOG PAGINA (Landingspagina Lay-out) ---
 def login_page():
@@ -49,21 +49,26 @@ def login_page():
                     if inlog_naam and inlog_ww:
                         with st.spinner("Aanmelden..."):
                             try:
-                                res = supabase.table(TABEL_NAAM).select("password").eq("username", inlog_naam.lower()).execute()
-                                if res.data:
-                                    db_password = res.data[0].get("password")
-                                    if verify_wachtwoord(inlog_ww, db_password):
-                                        # Upgrade legacy SHA-256 hash to PBKDF2 hash automatically
-                                        if not db_password.startswith("pbkdf2_sha256$"):
-                                            new_hash = hash_wachtwoord(inlog_ww)
-                                            supabase.table(TABEL_NAAM).update({"password": new_hash}).eq("username", inlog_naam.lower()).execute()
+                                wacht = wachttijd(inlog_naam.lower())
+                                if wacht > 0:
+                                    st.error(f"❌ Te veel inlogpogingen. Probeer het over {int(wacht) + 1} seconden opnieuw.")
+                                else:
+                                    user = repo.get_user(inlog_naam.lower(), ["password"])
+                                    db_password = user.get("password") if user else None
+                                    status, new_hash = controleer_login(inlog_naam.lower(), inlog_ww, db_password)
+                                    if status == LOGIN_OK:
+                                        # Legacy SHA-256 hash of oud aantal iteraties: sla de nieuwe hash op
+                                        if new_hash:
+                                            repo.set_password(inlog_naam.lower(), new_hash)
 
                                         st.session_state["ingelogde_speler"] = inlog_naam.lower()
                                         st.rerun()
+                                    elif status == LOGIN_TE_VEEL:
+                                        st.error(f"❌ Te veel inlogpogingen. Probeer het over {int(wachttijd(inlog_naam.lower())) + 1} seconden opnieuw.")
+                                    elif status == LOGIN_DRUK:
+                                        st.warning("⏳ Het is erg druk op de server. Probeer het zo opnieuw.")
                                     else:
                                         st.error("❌ Onjuiste gebruikersnaam of wachtwoord.")
-                                else:
-                                    st.error("❌ Onjuiste gebruikersnaam of wachtwoord.")
                             except Exception as e:
                                 if "Name or service not known" in str(e) or "Invalid URL" in str(e) or "ConnectError" in str(e):
                                     st.error("❌ Database configuratie ontbreekt of is ongeldig. Controleer je `.streamlit/secrets.toml` of klik op 'Doorgaan als gast'.")
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from app_utils.captains import fill_captains, starters_and_captains, top_k
+
+
+def test_top_k_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        n, races, k = rng.integers(0, 25), rng.integers(1, 5), rng.integers(1, 14)
+        scores = rng.integers(0, 5, (n, races)).astype(float)
+        scores[rng.random((n, races)) < 0.1] = np.nan
+        mask = rng.random((n, races)) < 0.6
+        res = top_k(scores, mask, k)
+        for c in range(races):
+            # Referentie: stabiele sortering, NaN achteraan
+            kandidaten = [i for i in range(n) if mask[i, c]]
+            kandidaten.sort(key=lambda i: np.inf if np.isnan(scores[i, c]) else -scores[i, c])
+            verwacht = kandidaten[:k] + [-1] * (k - len(kandidaten[:k]))
+            assert res[c].tolist() == verwacht
+
+
+def test_starters_and_captains():
+    df = pd.DataFrame({'Renner': ['A', 'B', 'C', 'D'], 'EV_R1': [10, 30, 20, 30], 'EV_R2': [5, 0, 0, 1]})
+    active = pd.DataFrame({'R1': [True, True, True, True], 'R2': [True, False, False, True]}, index=df['Renner'])
+    starters, kopmannen = starters_and_captains(df, ['R1', 'R2'], active, n_starters=2)
+    assert starters['R1'].tolist() == [False, True, False, True]
+    assert starters['R2'].tolist() == [True, False, False, True]
+    assert kopmannen.loc['R1'].tolist() == ['B', 'D', 'C']
+    assert kopmannen.loc['R2'].tolist() == ['A', 'D', None]
+
+
+def test_fill_captains_keeps_fixed_picks():
+    assert fill_captains(['A', 'B', 'C', 'D']) == ['A', 'B', 'C']
+    assert fill_captains(['A', 'B', 'C', 'D'], [None, 'C', None]) == ['A', 'C', 'B']
+    assert fill_captains(['A'], ['B']) == ['B', 'A', None]
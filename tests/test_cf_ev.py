@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from app_utils.cycling_fantasy import EV_METHODS, calculate_cf_ev
+
+
+@pytest.fixture
+def startlist():
+    return pd.DataFrame({
+        'Renner': [f"R{i}" for i in range(25)],
+        'COB': list(range(50, 75)),
+        'AVG': [60] * 25,
+        'Prijs': [200] * 24 + [0],
+    })
+
+
+def test_ranking_uses_cf_points(startlist):
+    df = calculate_cf_ev(startlist, 'COB', EV_METHODS[0])
+    assert df['Renner'].iloc[0] == "R24"
+    assert df['CF_EV'].tolist()[:3] == [45, 25, 22]
+    assert df['CF_EV'].iloc[19] == 1 and (df['CF_EV'].iloc[20:] == 0).all()
+    # Prijs 0 geeft geen oneindige waarde
+    assert df.loc[df['Renner'] == "R24", 'Waarde (EV/Credit)'].iloc[0] == 0
+
+
+def test_power_curve(startlist):
+    df = calculate_cf_ev(startlist, 'COB', EV_METHODS[1])
+    assert df['CF_EV'].iloc[1] == pytest.approx((73 / 100) ** 4 * 45)
+    assert df['Waarde (EV/Credit)'].iloc[1] == round(df['CF_EV'].iloc[1] / 200, 4)
+
+
+def test_cached_per_startlist_stat_and_method(startlist):
+    eerste = calculate_cf_ev(startlist, 'COB', EV_METHODS[0])
+    assert calculate_cf_ev(startlist.copy(), 'COB', EV_METHODS[0]) is eerste
+    assert calculate_cf_ev(startlist, 'AVG', EV_METHODS[0]) is not eerste
+    assert calculate_cf_ev(startlist, 'COB', EV_METHODS[1]) is not eerste
+
+    gewijzigd = startlist.copy()
+    gewijzigd.loc[0, 'COB'] = 99
+    assert calculate_cf_ev(gewijzigd, 'COB', EV_METHODS[0])['Renner'].iloc[0] == "R0"
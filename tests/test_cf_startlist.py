@@ -0,0 +1,62 @@
+import io
+import sys
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+from thefuzz import process, fuzz
+
+from app_utils.cf_startlist import content_hash, iter_pcs_riders, join_prices, match_names, parse_pcs_riders
+
+
+def mock_pdfplumber(pages):
+    mock = MagicMock()
+    mock_pages = []
+    for text in pages:
+        page = MagicMock()
+        page.extract_text.return_value = text
+        mock_pages.append(page)
+    mock.open.return_value.__enter__.return_value.pages = mock_pages
+    return mock
+
+
+def test_iter_pcs_riders_streams_pages():
+    pages = iter(["1 VAN AERT Wout 100\nGeen renner\n", "", "2 POGACAR Tadej 50\n"])
+    riders = iter_pcs_riders(pages)
+    assert next(riders) == "Wout VAN AERT"
+    assert list(riders) == ["Tadej POGACAR"]
+
+
+def test_parse_is_cached_by_content():
+    mock = mock_pdfplumber(["1 VAN AERT Wout 100\n", None])
+    with patch.dict(sys.modules, {'pdfplumber': mock}):
+        eerste = parse_pcs_riders(io.BytesIO(b"startlijst-a"))
+        tweede = parse_pcs_riders(io.BytesIO(b"startlijst-a"))
+        parse_pcs_riders(io.BytesIO(b"startlijst-b"))
+    assert eerste == tweede == ["Wout VAN AERT"]
+    assert mock.open.call_count == 2
+
+
+def test_content_hash():
+    assert content_hash(b"abc") == content_hash(io.BytesIO(b"abc"))
+    assert content_hash("bestaat_niet.pdf") is None
+
+
+def test_match_names_equals_extract_one():
+    full_names = ["Wout van Aert", "Tadej Pogačar", "Mathieu van der Poel", "Jasper Philipsen", "Mads Pedersen"]
+    names = ["Wout VAN AERT", "Tadej POGACAR", "VAN DER POEL Mathieu", "Jasper Philipson", "Onbekende Renner", None, ""]
+
+    def oud(naam):
+        if not naam:
+            return None
+        match = process.extractOne(str(naam), full_names, scorer=fuzz.token_set_ratio)
+        return match[0] if match and match[1] > 75 else None
+
+    assert match_names(names, full_names, threshold=75) == [oud(n) for n in names]
+
+
+def test_join_prices():
+    stats = pd.Series(["Tadej Pogačar", "Toms Skujiņš", "Jasper Philipsen", "Onbekend Renner"])
+    prices = pd.DataFrame({"Renner": ["Tadej Pogacar", "Toms Skujins", "Jasper Philipson", "Niemand Hier"],
+                           "Prijs": [1200, 400, 800, 300]})
+    assert join_prices(stats, prices).tolist() == [1200, 400, 800, 200]
+    assert join_prices(stats, pd.DataFrame(columns=["Renner", "Prijs"])).tolist() == [200] * 4
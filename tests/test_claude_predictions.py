@@ -0,0 +1,119 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from app_utils import claude_predictions as cp
+
+ETAPPES = [
+    {"id": 1, "route": "A - B", "km": 150, "type": "Vlak", "w": {"SPR": 1.0, "GC": 0.0, "ITT": 0.0, "MTN": 0.0}},
+    {"id": 2, "route": "B - C", "km": 30, "type": "Tijdrit", "w": {"SPR": 0.0, "GC": 0.2, "ITT": 0.8, "MTN": 0.0}},
+]
+
+
+@pytest.fixture
+def df(monkeypatch):
+    monkeypatch.setattr(cp, "st", MagicMock())
+    cp.clear_cache()
+    return pd.DataFrame({
+        "Renner": ["Tadej Pogačar", "Jonathan Milan", "Filippo Ganna", "Olav Kooij"],
+        "Team": ["UAE", "LTK", "IGD", "VLA"],
+        "Prijs": [12, 8, 7, 6],
+        "GC": [98, 10, 60, 5], "SPR": [50, 95, 40, 92], "ITT": [85, 40, 97, 30], "MTN": [95, 5, 40, 5],
+        "Giro_EV": [300, 200, 150, 180],
+    })
+
+
+class TelBackend(cp.LocalBackend):
+    name = "tel"
+
+    def __init__(self, antwoord=None):
+        self.calls = 0
+        self.antwoord = antwoord
+
+    def complete(self, system, user, context):
+        self.calls += 1
+        return self.antwoord if self.antwoord is not None else super().complete(system, user, context)
+
+
+def test_local_backend_is_deterministic(df):
+    preds, reasoning = cp.genereer_claude_etappe_voorspellingen(df, ETAPPES, 2, {}, backend=cp.LocalBackend())
+    assert preds == {"1": ["Jonathan Milan", "Olav Kooij"], "2": ["Filippo Ganna", "Tadej Pogačar"]}
+    assert "ITT" in reasoning["2"]
+
+
+def test_predictions_cached_per_weights_and_top_x(df):
+    backend = TelBackend()
+    eerste = cp.genereer_claude_etappe_voorspellingen(df, ETAPPES, 2, {}, backend=backend)
+    eerste[0]["1"][0] = "aangepast"
+    assert cp.genereer_claude_etappe_voorspellingen(df, ETAPPES, 2, {}, backend=backend)[0]["1"][0] == "Jonathan Milan"
+    assert backend.calls == 1
+    cp.genereer_claude_etappe_voorspellingen(df, ETAPPES, 3, {}, backend=backend)
+    cp.genereer_claude_etappe_voorspellingen(df, ETAPPES, 2, {"1": {"SPR": 0, "GC": 1, "ITT": 0, "MTN": 0}}, backend=backend)
+    assert backend.calls == 3
+
+
+def test_names_resolved_and_failures_not_cached(df):
+    antwoord = json.dumps({"1": {"picks": ["Tadej Pogacar", "jonathan milan", "Filipo Ganna", "Niemand Hier"], "reasoning": "x"}})
+    preds, _ = cp.genereer_claude_etappe_voorspellingen(df, ETAPPES, 4, {}, backend=TelBackend(antwoord))
+    assert preds["1"] == ["Tadej Pogačar", "Jonathan Milan", "Filippo Ganna", None]
+    assert preds["2"] == [None] * 4
+
+    kapot = TelBackend("geen json")
+    for _ in range(2):
+        assert cp.genereer_claude_etappe_voorspellingen(df, ETAPPES, 1, {}, backend=kapot) == ({"1": [None], "2": [None]}, {})
+    # Elke aanroep: één verzoek plus één herhaling
+    assert kapot.calls == 4
+
+
+@pytest.fixture
+def mock_server():
+    # Lokale nabootsing van POST /v1/messages; etappe 2 krijgt de eerste keer geen picks
+    verzoeken = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][0]["content"]
+            stages = json.loads(prompt.split("Etappes:\n", 1)[1].split("\n\nVoorspel", 1)[0])
+            ids = [str(s["id"]) for s in stages]
+            verzoeken.append((self.headers["x-api-key"], ids))
+            antwoord = {sid: {"picks": ["Filippo Ganna", "Olav Kooij"], "reasoning": f"etappe {sid}"} for sid in ids}
+            if "2" in ids and sum("2" in v for _, v in verzoeken) == 1:
+                antwoord["2"] = {"reasoning": "vergeten"}
+            data = json.dumps({"content": [{"type": "text", "text": "```json\n" + json.dumps(antwoord) + "\n```"}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", verzoeken
+    server.shutdown()
+
+
+def test_concurrent_stage_requests_retry_only_failed_stages(df, mock_server):
+    url, verzoeken = mock_server
+    etappes = [dict(ETAPPES[0], id=i) for i in range(1, 6)]
+    gezien = []
+    backend = cp.MessagesHTTPBackend("sk-test", base_url=url)
+    preds, reasoning = cp.genereer_claude_etappe_voorspellingen(
+        df, etappes, 2, {}, backend=backend, stages_per_request=2, max_workers=3,
+        on_stage=lambda sid, picks, reden: gezien.append(sid))
+
+    assert preds == {str(i): ["Filippo Ganna", "Olav Kooij"] for i in range(1, 6)}
+    assert reasoning["2"] == "etappe 2"
+    assert sorted(gezien) == ["1", "2", "3", "4", "5"] and gezien[-1] == "2"
+    assert sorted(ids for _, ids in verzoeken) == [["1", "2"], ["2"], ["3", "4"], ["5"]]
+    assert {key for key, _ in verzoeken} == {"sk-test"}
+
+    # Alles staat nu per etappe in de cache
+    cp.genereer_claude_etappe_voorspellingen(df, etappes, 2, {}, backend=backend, stages_per_request=2)
+    assert len(verzoeken) == 4
@@ -8,7 +8,8 @@ mock_st = MagicMock()
 mock_st.secrets = {"CRYPTO_SALT": "GeheimeKlassiekerSleutel2026"}
 sys.modules["streamlit"] = mock_st
 
-from app_utils.crypto import generate_signature, hash_wachtwoord, verify_wachtwoord
+from app_utils import crypto
+from app_utils.crypto import generate_signature, hash_wachtwoord, verify_wachtwoord, needs_rehash, controleer_login
 
 def test_hash_wachtwoord_format():
     ww = "test1234"
@@ -80,3 +81,38 @@ def test_generate_signature_with_different_salt():
 
     # Reset salt for other tests if necessary (though they might run in parallel or different order)
     mock_st.secrets["CRYPTO_SALT"] = "GeheimeKlassiekerSleutel2026"
+
+def test_iterations_configurable_and_rehash(monkeypatch):
+    oud = hash_wachtwoord("klimmer")
+    legacy = hashlib.sha256("klimmer".encode()).hexdigest()
+    assert not needs_rehash(oud)
+    assert needs_rehash(legacy)
+
+    monkeypatch.setenv("PBKDF2_ITERATIONS", "1000")
+    nieuw = hash_wachtwoord("klimmer")
+    assert nieuw.startswith("pbkdf2_sha256$1000$")
+    assert needs_rehash(oud) and not needs_rehash(nieuw)
+    # Oude hashes blijven geldig en worden bij het inloggen vervangen
+    assert verify_wachtwoord("klimmer", oud)
+    status, new_hash = controleer_login("renner", "klimmer", oud)
+    assert status == crypto.LOGIN_OK and new_hash.startswith("pbkdf2_sha256$1000$")
+    assert verify_wachtwoord("klimmer", new_hash)
+    assert controleer_login("renner", "klimmer", new_hash) == (crypto.LOGIN_OK, None)
+    status, new_hash = controleer_login("renner", "klimmer", legacy)
+    assert status == crypto.LOGIN_OK and new_hash.startswith("pbkdf2_sha256$1000$")
+
+def test_controleer_login_rate_limit(monkeypatch):
+    monkeypatch.setenv("PBKDF2_ITERATIONS", "1000")
+    crypto.reset_pogingen()
+    db_hash = hash_wachtwoord("sprinter")
+    for _ in range(crypto.MAX_POGINGEN):
+        assert controleer_login("wout", "fout", db_hash) == (crypto.LOGIN_FOUT, None)
+    # Ook het juiste wachtwoord wordt geweigerd tot het venster voorbij is
+    assert controleer_login("wout", "sprinter", db_hash) == (crypto.LOGIN_TE_VEEL, None)
+    assert crypto.wachttijd("wout") > 0
+    assert crypto.wachttijd("wout", nu=10**9) == 0
+    # Andere gebruikers en onbekende namen hebben hun eigen limiet
+    assert controleer_login("tadej", "sprinter", db_hash)[0] == crypto.LOGIN_OK
+    assert controleer_login("onbekend", "sprinter", None) == (crypto.LOGIN_FOUT, None)
+    crypto.reset_pogingen("wout")
+    assert controleer_login("wout", "sprinter", db_hash)[0] == crypto.LOGIN_OK
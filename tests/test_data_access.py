@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app_utils import data_access
+from app_utils.data_access import compact_frame, read_table, rider_stats
+
+
+def write(path, text, ns):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(ns, ns))
+
+
+def test_rider_stats_normalized(tmp_path):
+    path = tmp_path / "renners_stats.csv"
+    write(path, "Naam\tPloeg\tCOB\tSPR\nA\tT1\t80\tx\nA\tT2\t10\t5\nB\t\t70\t60\n", 10**18)
+    df = rider_stats(str(path))
+    assert df['Renner'].tolist() == ["A", "B"]
+    assert df['Team'].tolist() == ["T1", "Onbekend"]
+    assert df['SPR'].tolist() == [0, 60] and df['GC'].tolist() == [0, 0]
+    assert df['COB'].dtype == "uint8" and df['Team'].dtype == "category"
+
+
+def test_loaded_once_per_file_version(tmp_path, monkeypatch):
+    path = tmp_path / "renners_stats.csv"
+    write(path, "Naam\tCOB\nA\t80\n", 10**18)
+    reads = []
+    original = data_access._read
+    monkeypatch.setattr(data_access, "_read", lambda p: reads.append(p) or original(p))
+
+    eerste = rider_stats(str(path))
+    tweede = rider_stats(str(path))
+    assert len(reads) == 1
+    # Gedeelde data, maar kolommen toevoegen raakt de gedeelde kopie niet
+    tweede['Extra'] = 1
+    assert 'Extra' not in rider_stats(str(path)).columns
+    assert eerste['COB'].tolist() == [80]
+
+    write(path, "Naam\tCOB\nA\t90\n", 2 * 10**18)
+    assert rider_stats(str(path))['COB'].tolist() == [90]
+    assert len(reads) == 2
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_table(str(tmp_path / "nope.csv"))
+
+
+def test_compact_frame():
+    df = pd.DataFrame({'Renner': ["A", "B"], 'Team': ["T1", None], 'COB': [80, 255], 'SPR': [300, 5],
+                       'OHN': [1, 0], 'EV_OHN': [12.5, 0.0]})
+    res = compact_frame(df, race_cols=['OHN'])
+    assert res['Team'].dtype == "category" and res['Team'].fillna('Onbekend').tolist() == ["T1", "Onbekend"]
+    assert res['COB'].dtype == "uint8" and res['SPR'].dtype == "int64"
+    assert res['OHN'].tolist() == [True, False] and res['EV_OHN'].dtype == "float32"
+    # Het origineel blijft ongewijzigd
+    assert df['OHN'].dtype == "int64"
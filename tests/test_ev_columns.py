@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from app_utils import giro_data, scorito_klassiekers, sporza_klassiekers
+from app_utils.ev_matrix import starters_order
+
+
+@pytest.fixture
+def riders():
+    return pd.DataFrame({
+        'Renner': ["A", "B", "C", "D", "E"],
+        'COB': [90, 80, 80, 70, 99],
+        'AVG': [50, 60, 60, 70, 50],
+        'Prijs': [2000000, 1000000, 1000000, 500000, 0],
+        'OHN': [1, 1, 1, 1, 0],
+        'E3': [0, 1, 0, 1, 1],
+    }, index=[10, 11, 12, 13, 14])
+
+
+def test_starters_order_ties_keep_frame_order(riders):
+    assert starters_order(riders, 'OHN', 'COB').tolist() == [0, 1, 2, 3]
+    assert starters_order(riders, 'E3', 'COB').tolist() == [4, 1, 3]
+
+
+def test_dynamic_ev_columns_only_new_columns(riders):
+    races, stat_map = ['OHN', 'E3'], {'OHN': 'COB', 'E3': 'COB'}
+    cols = scorito_klassiekers.dynamic_ev_columns(riders, races, stat_map, scorito_klassiekers.EV_METHODS[0])
+    assert list(cols.columns) == ['EV_OHN', 'EV_E3', 'EV_all', 'Scorito_EV', 'Waarde (EV/M)']
+    assert cols.index.equals(riders.index)
+    # Kopman-factoren 3 / 2.5 / 2 op de eerste drie starters
+    assert cols['EV_OHN'].tolist() == [300, 225, 160, 72, 0]
+    assert cols['EV_E3'].tolist() == [0, 225, 0, 160, 300]
+    assert cols.loc[14, 'Waarde (EV/M)'] == 0
+
+    df = scorito_klassiekers.calculate_dynamic_ev(riders, races, stat_map, scorito_klassiekers.EV_METHODS[0], ['E3'])
+    assert 'EV_OHN' not in riders.columns
+    assert (df['EV_E3'] == 0).all() and df['Scorito_EV'].tolist() == [300, 225, 160, 72, 0]
+
+
+def test_sporza_ev_podium_bonus(riders):
+    cols = sporza_klassiekers.sporza_ev_columns(riders, ['OHN'], {'OHN': 'COB'}, sporza_klassiekers.EV_METHODS[0])
+    assert cols['EV_OHN'].tolist() == [110, 89, 72, 44, 0]
+
+
+def test_giro_ev_keeps_input(riders):
+    df = riders.assign(GC=[90, 50, 50, 50, 50], SPR=[10, 90, 10, 10, 10], ITT=[10, 10, 90, 10, 10], MTN=[10, 10, 10, 85, 10])
+    res = giro_data.calculate_giro_ev(df)
+    assert 'Giro_EV' not in df.columns
+    assert res['Type'].tolist() == ['Klassementsrenner', 'Sprinter', 'Tijdrijder', 'Aanvaller / Klimmer', 'Knecht / Vrijbuiter']
+    assert res.loc[10, 'Giro_EV'] == round(0.9**4 * 400 + 0.1**4 * 430)
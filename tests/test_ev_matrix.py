@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_utils.ev_matrix import build_ev_matrix, evaluate_plan, evaluate_plans, ownership_intervals
+
+RACES = ['R1', 'R2', 'R3', 'R4', 'R5']
+
+
+def reference_plan_ev(df_eval, base_team, plan, available_races):
+    # Original row-scan implementation of evaluate_plan_ev.
+    current_active = set(base_team)
+    totaal = 0
+    for race in available_races:
+        for t in plan:
+            if t['moment'] == race:
+                if t['uit'] in current_active: current_active.remove(t['uit'])
+                current_active.add(t['in'])
+        for r in current_active:
+            res = df_eval.loc[df_eval['Renner'] == r, f'EV_{race}']
+            if not res.empty:
+                totaal += res.values[0]
+    return totaal
+
+
+@pytest.fixture
+def df_eval():
+    rng = np.random.default_rng(0)
+    data = {'Renner': [f'R{i}' for i in range(12)]}
+    for r in RACES:
+        data[f'EV_{r}'] = rng.integers(0, 100, 12).astype(float)
+    return pd.DataFrame(data)
+
+
+def test_ownership_intervals_chain():
+    m = {'races': ['R1', 'R2', 'R3']}
+    plan = [{'uit': 'B', 'in': 'C', 'moment': 'R2'}, {'uit': 'C', 'in': 'D', 'moment': 'R3'}, {'uit': 'A', 'in': 'E', 'moment': 'GEEN'}]
+    assert sorted(ownership_intervals(m, ['A', 'B'], plan)) == [('A', 0, 3), ('B', 0, 1), ('C', 1, 2), ('D', 2, 3)]
+
+
+def test_matches_reference_on_random_plans(df_eval):
+    rnd = random.Random(1)
+    ev_matrix = build_ev_matrix(df_eval, RACES)
+    names = df_eval['Renner'].tolist() + ['Onbekend']
+    base_team = names[:5]
+    plans = []
+    for _ in range(50):
+        plans.append([
+            {'uit': rnd.choice(names), 'in': rnd.choice(names), 'moment': rnd.choice(RACES + ['GEEN'])}
+            for _ in range(rnd.randint(0, 4))
+        ])
+
+    batch = evaluate_plans(ev_matrix, base_team, plans)
+    for plan, score in zip(plans, batch):
+        expected = reference_plan_ev(df_eval, base_team, plan, RACES)
+        assert score == pytest.approx(expected)
+        assert evaluate_plan(ev_matrix, base_team, plan) == pytest.approx(expected)
+
+
+def test_per_plan_base_teams(df_eval):
+    ev_matrix = build_ev_matrix(df_eval, RACES)
+    scores = evaluate_plans(ev_matrix, [['R0'], ['R1', 'R2'], []], [[], [], []])
+    assert scores[0] == pytest.approx(df_eval.iloc[0, 1:].sum())
+    assert scores[1] == pytest.approx(df_eval.iloc[1:3, 1:].to_numpy().sum())
+    assert scores[2] == 0
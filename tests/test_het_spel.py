@@ -4,8 +4,8 @@ import pytest
 
 # Mock modules to prevent side effects on import
 mock_st = MagicMock()
-# Explicitly mock st.tabs to return three dummy MagicMocks
-mock_st.tabs.return_value = (MagicMock(), MagicMock(), MagicMock())
+# Explicitly mock st.tabs to return one dummy MagicMock per tab
+mock_st.tabs.side_effect = lambda labels: tuple(MagicMock() for _ in labels)
 
 mock_st.secrets = {"CRYPTO_SALT": "test_salt", "SUPABASE_URL": "http://test", "SUPABASE_KEY": "test", "TABEL_NAAM": "test_tabel"}
 sys.modules['streamlit'] = mock_st
@@ -24,14 +24,14 @@ mock_st.cache_resource = dummy_cache_data
 
 from pages.Sporza.Classics.Het_Spel import is_team_locked, load_game_data, load_csv_data
 
-@patch('pages.Sporza.Classics.Het_Spel.init_connection')
-def test_load_game_data_exception_handling(mock_init_connection):
+@patch('pages.Sporza.Classics.Het_Spel.get_repository')
+def test_load_game_data_exception_handling(mock_get_repository):
     """
     Test that load_game_data handles exceptions during database operations gracefully
     and returns an empty list.
     """
-    # Force init_connection to raise an Exception to simulate connection or query failure
-    mock_init_connection.side_effect = Exception("Mocked exception during DB connection")
+    # Force get_repository to raise an Exception to simulate connection or query failure
+    mock_get_repository.side_effect = Exception("Mocked exception during DB connection")
 
     # Execute the function
     result = load_game_data()
@@ -56,18 +56,14 @@ def test_load_csv_data_exception_handling(mock_read_csv):
     assert races == ["NOK", "MSR", "RVV"]
     assert k_map == {}
 
-@patch('pages.Sporza.Classics.Het_Spel.os.path.exists')
-@patch('pages.Sporza.Classics.Het_Spel.pd.read_csv')
-def test_is_team_locked_exception_handling(mock_read_csv, mock_exists):
+@patch('pages.Sporza.Classics.Het_Spel.load_results')
+def test_is_team_locked_exception_handling(mock_load_results):
     """
     Test that is_team_locked handles exceptions during file reading gracefully
     and returns False.
     """
-    # Force os.path.exists to return True so we enter the try block
-    mock_exists.return_value = True
-
-    # Force pd.read_csv to raise an Exception
-    mock_read_csv.side_effect = Exception("Mocked exception during read")
+    # Force the results store to raise an Exception
+    mock_load_results.side_effect = Exception("Mocked exception during read")
 
     # Execute the function
     result = is_team_locked()
@@ -75,62 +71,43 @@ def test_is_team_locked_exception_handling(mock_read_csv, mock_exists):
     # Verify that it caught the exception and returned False
     assert result is False
 
-@patch('pages.Sporza.Classics.Het_Spel.os.path.exists')
-def test_is_team_locked_file_not_found(mock_exists):
+def test_is_team_locked_file_not_found(tmp_path):
     """
     Test that is_team_locked returns False when uitslagen.csv doesn't exist.
     """
-    mock_exists.return_value = False
-
-    result = is_team_locked()
+    result = is_team_locked(str(tmp_path / "uitslagen.csv"))
 
     assert result is False
 
-@patch('pages.Sporza.Classics.Het_Spel.os.path.exists')
-@patch('pages.Sporza.Classics.Het_Spel.pd.read_csv')
-def test_is_team_locked_success(mock_read_csv, mock_exists):
+def test_is_team_locked_success(tmp_path):
     """
     Test that is_team_locked returns True when NOK is found in the uitslagen.csv
     """
-    mock_exists.return_value = True
+    path = tmp_path / "uitslagen.csv"
+    path.write_text("Race\tRnk\tRider\nNOK\t1\tA\nMSR\t1\tB\n", encoding="utf-8")
 
-    # Create a mock dataframe that has 'Race' column and 'NOK' in it
-    import pandas as pd
-    mock_df = pd.DataFrame({'Race': ['NOK', 'MSR']})
-    mock_read_csv.return_value = mock_df
-
-    result = is_team_locked()
+    result = is_team_locked(str(path))
 
     assert result is True
 
-@patch('pages.Sporza.Classics.Het_Spel.os.path.exists')
-@patch('pages.Sporza.Classics.Het_Spel.pd.read_csv')
-def test_is_team_locked_no_nok(mock_read_csv, mock_exists):
+def test_is_team_locked_no_nok(tmp_path):
     """
     Test that is_team_locked returns False when NOK is NOT found in the uitslagen.csv
     """
-    mock_exists.return_value = True
+    path = tmp_path / "uitslagen.csv"
+    path.write_text("Race\tRnk\tRider\nMSR\t1\tA\nE3\t1\tB\n", encoding="utf-8")
 
-    import pandas as pd
-    mock_df = pd.DataFrame({'Race': ['MSR', 'E3']})
-    mock_read_csv.return_value = mock_df
-
-    result = is_team_locked()
+    result = is_team_locked(str(path))
 
     assert result is False
 
-@patch('pages.Sporza.Classics.Het_Spel.os.path.exists')
-@patch('pages.Sporza.Classics.Het_Spel.pd.read_csv')
-def test_is_team_locked_no_race_column(mock_read_csv, mock_exists):
+def test_is_team_locked_no_race_column(tmp_path):
     """
     Test that is_team_locked returns False when uitslagen.csv doesn't have a Race column
     """
-    mock_exists.return_value = True
-
-    import pandas as pd
-    mock_df = pd.DataFrame({'Other': ['A', 'B']})
-    mock_read_csv.return_value = mock_df
+    path = tmp_path / "uitslagen.csv"
+    path.write_text("Other\nA\nB\n", encoding="utf-8")
 
-    result = is_team_locked()
+    result = is_team_locked(str(path))
 
     assert result is False
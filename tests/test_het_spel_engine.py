@@ -0,0 +1,164 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_utils.het_spel import (
+    EV_METHODS, beschikbare_extras, build_ev, build_race_index, het_spel_standings, koppel_stats, optimize_picks,
+    race_info,
+)
+from app_utils.results_store import ResultsStore
+
+
+@pytest.fixture
+def df():
+    n = 60
+    return pd.DataFrame({
+        'Renner': [f"R{i:02d}" for i in range(n)],
+        'SPR': list(range(n)),
+        'COB': list(range(n, 0, -1)),
+        'NOK': [1] * n,
+        'E3': [1] * n,
+    })
+
+
+def test_race_index_matches_per_race_sort(df):
+    index = build_race_index(df, ["NOK", "E3"], {"NOK": "SPR", "E3": "COB"}, version="v1")
+    nok = race_info(index, "NOK")
+    assert nok['stat'] == "SPR"
+    assert nok['top_50'] == frozenset(f"R{i:02d}" for i in range(10, 60))
+    assert nok['dark_horses'] == [f"R{i:02d}" for i in range(10)]
+    assert race_info(index, "E3")['dark_horses'] == [f"R{i:02d}" for i in range(50, 60)]
+    # Onbekende koers: iedereen mag dark horse zijn
+    assert race_info(index, "XYZ")['dark_horses'] == index['alle_renners']
+
+
+def test_race_index_built_once_per_version(df):
+    eerste = build_race_index(df, ["NOK"], {"NOK": "SPR"}, version="v1")
+    assert build_race_index(df, ["NOK"], {"NOK": "SPR"}, version="v1") is eerste
+    assert build_race_index(df, ["NOK"], {"NOK": "SPR"}, version="v2") is not eerste
+
+
+def test_beschikbare_extras(df):
+    index = build_race_index(df, ["NOK"], {"NOK": "SPR"}, version="v3")
+    extras = beschikbare_extras(index, ["R00", "R05"])
+    assert "R00" not in extras and "R05" not in extras and len(extras) == 58
+    assert beschikbare_extras(index, ["R05", "R00"]) is extras
+
+
+def brute_force(points, dark, eligible, base, n):
+    best = None
+    buiten = [i for i in range(n) if i not in base]
+    for extras in itertools.combinations(buiten, 3):
+        actief = list(base) + list(extras)
+        score = sum(points[i] for i in actief) + max(points[i] for i in actief)
+        if best is None or score > best:
+            best = score
+    return best + max(dark[i] for i in range(n) if eligible[i])
+
+
+@pytest.mark.parametrize("method", EV_METHODS)
+def test_optimize_picks_matches_brute_force(method):
+    rng = np.random.default_rng(3)
+    n = 70
+    df = pd.DataFrame({
+        'Renner': [f"R{i:02d}" for i in range(n)],
+        'SPR': rng.integers(40, 100, n), 'COB': rng.integers(40, 100, n), 'AVG': rng.integers(40, 100, n),
+        'NOK': rng.integers(0, 2, n), 'E3': rng.integers(0, 2, n),
+    })
+    index = build_race_index(df, ["NOK", "E3"], {"NOK": "SPR", "E3": "COB"}, version=("opt", method))
+    ev = build_ev(df, index, method)
+    base = [f"R{i:02d}" for i in range(10)]
+    picks = optimize_picks(ev, base)
+
+    base_rows = [ev['row'][r] for r in base]
+    for k, race in enumerate(ev['races']):
+        pick = picks[race]
+        assert len(pick['extras']) == 3 and not set(pick['extras']) & set(base)
+        assert pick['kopman'] in base + pick['extras']
+        assert pick['dark_horse'] not in index['races'][race]['top_50']
+        expected = brute_force(ev['points'][:, k], ev['dark_horse'][:, k], ev['eligible'][:, k], base_rows, n)
+        assert pick['ev'] == pytest.approx(expected)
+
+
+def test_ranking_ev_uses_startlist(df):
+    index = build_race_index(df.assign(NOK=[0] * 59 + [1]), ["NOK"], {"NOK": "SPR"}, version="start")
+    ev = build_ev(df.assign(NOK=[0] * 59 + [1]), index, EV_METHODS[0])
+    assert ev['points'][:, 0].sum() == 100 and ev['points'][59, 0] == 100
+
+
+def test_koppel_stats_keeps_sporza_names():
+    df_p = pd.DataFrame({'Renner': ["VAN DER POEL Mathieu", "POGAČAR Tadej", "ONBEKEND Iemand"], 'Team': ["ADC", "UAD", "X"]})
+    df_s = pd.DataFrame({'Renner': ["Tadej Pogačar", "Mathieu van der Poel"], 'COB': [80, 99], 'SPR': [70, 80],
+                         'HLL': [99, 80], 'AVG': [99, 95], 'Team': ["UAE", "Alpecin"]})
+    df = koppel_stats(df_p, df_s)
+    assert df['Renner'].tolist() == df_p['Renner'].tolist()
+    assert df['COB'].tolist()[:2] == [99, 80] and pd.isna(df['COB'].iloc[2])
+    assert df['Team'].tolist() == ["ADC", "UAD", "X"]
+
+
+def write_uitslagen(path, regels, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        if mode == "w":
+            f.write("Race\tRnk\tRider\tTeam\n")
+        for regel in regels:
+            f.write("\t".join(regel) + "\n")
+    os.utime(path, ns=(1, 10**18 + len(open(path).read())))
+
+
+@pytest.fixture
+def spel():
+    n = 60
+    df = pd.DataFrame({'Renner': [f"RENNER{i:02d} Jan" for i in range(n)], 'SPR': list(range(n)), 'COB': list(range(n))})
+    index = build_race_index(df, ["NOK", "IFF"], {"NOK": "SPR", "IFF": "COB"}, version="stand")
+    base = [f"RENNER{i:02d} Jan" for i in range(50, 60)]
+    picks = {"NOK": {"extras": ["RENNER01 Jan"], "kopman": "RENNER59 Jan", "dark_horse": "RENNER02 Jan"},
+             "IFF": {"extras": [], "kopman": "RENNER00 Jan", "dark_horse": "RENNER55 Jan"}}
+    players = [
+        {"username": "anna", "custom_team": {"data": {"base": base, "picks": picks}, "signature": "ok"}},
+        {"username": "bert", "custom_team": {"data": {"base": base[:1], "picks": {}}, "signature": "ok"}},
+        {"username": "vals", "custom_team": {"data": {"base": base, "picks": picks}, "signature": "fout"}},
+    ]
+    return index, players
+
+
+def test_standings_scores_rules_and_updates_incrementally(tmp_path, spel):
+    index, players = spel
+    path = tmp_path / "uitslagen.csv"
+    # Basis: RENNER59 wint (kopman x2), RENNER02 is dark horse buiten de top 50 en wordt 5e, RENNER01 (extra) 21e
+    write_uitslagen(path, [("NOK", "1", " Renner59 Jan", "T"), ("NOK", "5", " Renner02 Jan", "T"),
+                           ("NOK", "21", " Renner01 Jan", "T"), ("NOK", "DNF", " Renner50 Jan", "T")])
+    store = ResultsStore(str(path))
+    store.refresh()
+    verify = lambda data, signature: signature == "ok"
+
+    stand = het_spel_standings(players, index, store=store, verify=verify)
+    assert stand['Speler'].tolist() == ["anna", "bert"]
+    assert stand.loc[0, 'NOK'] == 200 + 150
+    assert stand.loc[1, 'NOK'] == 0
+    assert het_spel_standings(players, index, store=store, verify=verify) is stand
+
+    # GW is de Scorito-code voor Gent-Wevelgem (IFF)
+    write_uitslagen(path, [("GW", "2", " Renner50 Jan", "T"), ("GW", "3", " Renner55 Jan", "T")], mode="a")
+    store.refresh()
+    stand = het_spel_standings(players, index, store=store, verify=verify)
+    assert stand.loc[0, 'IFF'] == 80 + 70
+    assert stand.loc[1, 'IFF'] == 80
+    assert stand['Totaal'].tolist() == [500, 80]
+    assert stand['Positie'].tolist() == [1, 2]
+
+
+def test_standings_count_each_active_rider_once(tmp_path, spel):
+    index, _ = spel
+    # Extra die al in het basisteam zit telt één keer; kopman buiten de actieve renners telt niet dubbel
+    picks = {"NOK": {"extras": ["RENNER59 Jan", "RENNER59 Jan"], "kopman": "RENNER01 Jan", "dark_horse": "ONBEKEND"}}
+    players = [{"username": "cis", "custom_team": {"data": {"base": ["RENNER59 Jan"] * 2, "picks": picks}, "signature": "ok"}}]
+    path = tmp_path / "uitslagen.csv"
+    write_uitslagen(path, [("NOK", "1", " Renner59 Jan", "T"), ("NOK", "2", " Renner01 Jan", "T")])
+    store = ResultsStore(str(path))
+    store.refresh()
+
+    stand = het_spel_standings(players, index, store=store)
+    assert stand.loc[0, 'NOK'] == 100
@@ -44,8 +44,8 @@ def test_get_file_mod_time(sporza_module, tmp_path):
         assert get_file_mod_time(str(test_file)) == 0
 
 
-def test_bepaal_klassieker_type(sporza_module):
-    bepaal_klassieker_type = sporza_module.bepaal_klassieker_type
+def test_bepaal_klassieker_type():
+    from app_utils.sporza_klassiekers import bepaal_klassieker_type
 
     # Test Sprinter
     assert bepaal_klassieker_type({'SPR': 90, 'COB': 0, 'HLL': 0}) == 'Sprint'
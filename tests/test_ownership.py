@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+
+from app_utils.ownership import OwnershipTimeline
+
+RACES = ['R1', 'R2', 'R3', 'R4', 'R5', 'R6']
+
+
+def replay(base_team, plan, toepassen):
+    # Referentie: de list remove/append replay van de pagina's
+    team = list(base_team)
+    for t in plan:
+        if toepassen(t):
+            if t['uit'] in team: team.remove(t['uit'])
+            if t['in'] not in team: team.append(t['in'])
+    return team
+
+
+def random_plan(rnd, base_team, pool):
+    plan = []
+    team = list(base_team)
+    for _ in range(rnd.randint(0, 5)):
+        uit = rnd.choice(team)
+        erin = rnd.choice([r for r in pool if r not in team])
+        team[team.index(uit)] = erin
+        plan.append({'uit': uit, 'in': erin, 'moment': rnd.choice(RACES[:-1])})
+    plan.sort(key=lambda t: RACES.index(t['moment']))
+    return plan
+
+
+def test_timeline_matches_list_replays():
+    rnd = random.Random(3)
+    pool = [f'P{i}' for i in range(15)]
+    prijzen = {r: rnd.randint(1, 10) for r in pool}
+    for _ in range(200):
+        base_team = rnd.sample(pool, 6)
+        plan = random_plan(rnd, base_team, pool)
+        tl = OwnershipTimeline(base_team, plan, RACES, prijzen, lambda n: 40 - n)
+        for k, race in enumerate(RACES):
+            # Evaluator: transfers ná een eerdere race tellen mee in deze race
+            in_race = replay(base_team, plan, lambda t: RACES.index(t['moment']) < k)
+            # Handmatige wissel: team na de transfers van dit moment
+            na_race = replay(base_team, plan, lambda t: RACES.index(t['moment']) <= k)
+            assert sorted(tl.team_in(race)) == sorted(in_race)
+            assert sorted(tl.team_na(race)) == sorted(na_race)
+            assert tl.kosten_na(race) == sum(prijzen[r] for r in na_race)
+            assert tl.kosten[k] == sum(prijzen[r] for r in in_race)
+            assert all(tl.rijdt(r, race) == (r in in_race) for r in pool)
+        for i in range(len(plan)):
+            temp_team = replay(base_team, plan[:i + 1], lambda t: True)
+            assert sorted(tl.team_na_wissel(i)) == sorted(temp_team)
+            assert tl.speling_na_wissel(i) == 40 - (i + 1) - sum(prijzen[r] for r in temp_team)
+
+
+def test_timeline_unknown_moment_and_unsorted_plan():
+    plan = [{'uit': 'B', 'in': 'C', 'moment': 'R3'}, {'uit': 'A', 'in': 'E', 'moment': 'GEEN'},
+            {'uit': 'C', 'in': 'D', 'moment': 'R1'}]
+    tl = OwnershipTimeline(['A', 'B'], plan, ['R1', 'R2', 'R3', 'R4'], {'A': 2, 'B': 3, 'C': 5, 'D': 7})
+    assert [t['moment'] for t in tl.transfers] == ['R1', 'R3', 'GEEN']
+    assert tl.owned_rows(['A', 'B', 'C', 'E', 'X']).tolist() == [
+        [True, True, True, True],
+        [True, True, True, False],
+        [False, False, False, True],
+        [False, False, False, False],
+        [False, False, False, False],
+    ]
+    assert tl.team_in('R4') == ['A', 'C', 'D']
+    assert tl.kosten.tolist() == [5, 12, 12, 14]
+    assert np.isinf(tl.budget).all()
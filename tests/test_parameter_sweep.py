@@ -0,0 +1,93 @@
+import sys
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+sys.modules['streamlit'] = MagicMock()
+
+from app_utils import parameter_sweep
+
+
+@pytest.fixture
+def scorito_data():
+    df_raw = pd.DataFrame({
+        'Renner': ['A', 'B', 'C', 'D', 'E', 'F'],
+        'Prijs': [4000000, 3000000, 2000000, 1500000, 1000000, 750000],
+        'Team': ['T1', 'T1', 'T2', 'T2', 'T3', 'T3'],
+        'R1': [1, 1, 1, 0, 1, 1],
+        'R2': [1, 0, 1, 1, 1, 0],
+        'COB': [90, 80, 70, 60, 50, 40],
+        'SPR': [40, 50, 60, 70, 80, 90],
+        'AVG': [70, 65, 60, 55, 50, 45],
+    })
+    return df_raw, ['R1', 'R2'], {'R1': 'COB', 'R2': 'SPR'}
+
+
+@pytest.fixture
+def tmp_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(parameter_sweep, 'CACHE_DIR', str(tmp_path / 'sweep'))
+    monkeypatch.setattr(parameter_sweep, '_memory_cache', {})
+    return tmp_path / 'sweep'
+
+
+def test_build_grid_expands_product_with_defaults():
+    scenarios = parameter_sweep.build_grid('scorito', {'min_bud': [42000000, 43000000], 'max_ren': [19, 20], 'max_bud': []})
+    assert len(scenarios) == 4
+    assert all(s['max_bud'] == 45000000 for s in scenarios)
+    assert {(s['min_bud'], s['max_ren']) for s in scenarios} == {(42000000, 19), (42000000, 20), (43000000, 19), (43000000, 20)}
+
+
+def test_solve_scenario_scorito(scorito_data):
+    df_raw, races, koers_map = scorito_data
+    params = {'min_bud': 0, 'max_bud': 6000000, 'max_ren': 3, 'ev_method': '1. Scorito Ranking (Dynamisch)', 't_moments': []}
+    res = parameter_sweep.solve_scenario('scorito', df_raw, races, koers_map, params)
+    assert res['status'] == 'Optimal'
+    assert len(res['team']) == 3
+    assert res['objective'] > 0
+
+
+def test_run_sweep_caches_results(scorito_data, tmp_cache):
+    df_raw, races, koers_map = scorito_data
+    scenarios = parameter_sweep.build_grid('scorito', {
+        'min_bud': [0], 'max_bud': [5000000, 7000000], 'max_ren': [3],
+        'ev_method': ['1. Scorito Ranking (Dynamisch)'], 't_moments': [[]],
+    })
+
+    first = list(parameter_sweep.run_sweep('scorito', df_raw, races, koers_map, scenarios, max_workers=2))
+    assert len(first) == 2
+    assert not any(r['cached'] for r in first)
+    assert len(list(tmp_cache.iterdir())) == 2
+
+    second = list(parameter_sweep.run_sweep('scorito', df_raw, races, koers_map, scenarios, max_workers=2))
+    assert all(r['cached'] for r in second)
+    assert sorted(r['objective'] for r in first) == sorted(r['objective'] for r in second)
+
+
+def test_summaries():
+    results = [
+        {'params': {'max_ren': 3, 't_moments': []}, 'status': 'Optimal', 'objective': 10.0, 'team': ['A', 'B'], 'plan': []},
+        {'params': {'max_ren': 4, 't_moments': ['R1']}, 'status': 'Optimal', 'objective': 20.0, 'team': ['A', 'C'], 'plan': [{'uit': 'C', 'in': 'D', 'moment': 'R1'}]},
+        {'params': {'max_ren': 5, 't_moments': []}, 'status': 'Infeasible', 'objective': 0.0, 'team': [], 'plan': []},
+    ]
+    summary = parameter_sweep.summarize_sweep(results)
+    assert summary['Objective'].tolist() == [20.0, 10.0, 0.0]
+    assert summary.loc[0, 't_moments'] == 'R1'
+
+    freq = parameter_sweep.inclusion_frequencies(results).set_index('Renner')
+    assert freq.loc['A', 'Frequentie'] == 1.0
+    assert freq.loc['D', 'Frequentie'] == 0.5
+
+
+def test_solve_scenario_applies_constraints_and_unknown_moments(scorito_data):
+    df_raw, races, koers_map = scorito_data
+    params = {'min_bud': 0, 'max_bud': 6000000, 'max_ren': 3, 'ev_method': '1. Scorito Ranking (Dynamisch)', 't_moments': []}
+    vrij = parameter_sweep.solve_scenario('scorito', df_raw, races, koers_map, params)
+    verboden = vrij['team'][0]
+    res = parameter_sweep.solve_scenario('scorito', df_raw, races, koers_map, params, {'force_base': ['F'], 'exclude_list': [verboden]})
+    assert res['status'] == 'Optimal'
+    assert 'F' in res['team'] and verboden not in res['team']
+
+    # 'GEEN' of een onbekende koers mag de worker niet laten crashen
+    sporza = parameter_sweep.solve_scenario('sporza', df_raw, races, koers_map, {'ev_method': '1. Sporza Ranking (Dynamisch)', 't_moments': ['GEEN', 'XYZ']})
+    assert sporza['game'] == 'sporza'
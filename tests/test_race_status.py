@@ -0,0 +1,64 @@
+import random
+
+import pandas as pd
+
+from app_utils.ownership import OwnershipTimeline
+from app_utils.race_status import active_roster, race_status_matrix, rol_en_moment
+
+
+def get_numeric_status(is_on_startlist, is_starter, is_verreden=False, rank_str=None):
+    # Referentie: de celfunctie die de Klassiekers pagina's gebruikten
+    if is_verreden:
+        if rank_str and str(rank_str) not in ['nan', 'None', 'DNS', '']:
+            if str(rank_str).isdigit():
+                return int(rank_str)
+            else:
+                return 996
+        else:
+            return 996 if is_on_startlist else 999
+    else:
+        if is_on_startlist:
+            return 997 if is_starter else 998
+        return 999
+
+
+def test_rol_en_moment_first_transfer_wins():
+    plan = [{"uit": "A", "in": "B", "moment": "E3"}, {"uit": "B", "in": "C", "moment": "RVV"}]
+    assert rol_en_moment(["A", "B", "C", "D"], plan) == ["Verkocht na E3", "Gekocht na E3", "Gekocht na RVV", "Basis (Blijft)"]
+
+
+def test_active_roster_follows_timeline():
+    races = ["OHN", "E3", "RVV", "PR"]
+    matrix_df = pd.DataFrame({"OHN": [1, 1, 1], "E3": [1, 0, 1], "RVV": [1, 1, 1], "PR": [0, 1, 1]},
+                             index=pd.Index(["A", "B", "C"], name="Renner"))
+    plan = [{"uit": "A", "in": "B", "moment": "E3"}, {"uit": "D", "in": "E", "moment": "XYZ"}]
+    active = active_roster(matrix_df, races, OwnershipTimeline(["A", "C", "D"], plan, races))
+    assert active.loc["A"].tolist() == [True, True, False, False]
+    assert active.loc["B"].tolist() == [False, False, True, True]
+    assert active.loc["C"].tolist() == [True, True, True, True]
+
+
+def test_status_matrix_matches_cell_function():
+    rnd = random.Random(1)
+    renners = [f"R{i}" for i in range(30)]
+    races = [f"K{j}" for j in range(20)]
+    on_list = pd.DataFrame([[rnd.random() < 0.6 for _ in races] for _ in renners], index=renners, columns=races)
+    starters = pd.DataFrame([[rnd.random() < 0.5 for _ in races] for _ in renners], index=renners, columns=races)
+    rows = [{"Race": race, "Rnk": rnd.choice(["1", "12", "DNF", "OTL", "DNS", "nan", "", "7"]), "Renner": r}
+            for race in races[:8] for r in renners if rnd.random() < 0.5]
+    rows += [{"Race": "K0", "Rnk": "3", "Renner": "R0"}, {"Race": "XX", "Rnk": "3", "Renner": "R1"}]
+    df_u = pd.DataFrame(rows)
+
+    res = race_status_matrix(on_list, df_u, starters)
+    verreden = set(df_u["Race"])
+    for r in renners:
+        for c in races:
+            k = df_u[(df_u["Race"] == c) & (df_u["Renner"] == r)]
+            rank_str = k["Rnk"].values[0] if not k.empty else None
+            assert res.loc[r, c] == get_numeric_status(on_list.loc[r, c], starters.loc[r, c], c in verreden, rank_str)
+
+
+def test_status_matrix_without_results():
+    on_list = pd.DataFrame({"OHN": [True, False]}, index=["A", "B"])
+    assert race_status_matrix(on_list).loc[:, "OHN"].tolist() == [997, 999]
+    assert race_status_matrix(on_list, pd.DataFrame(), on_list & False).loc[:, "OHN"].tolist() == [998, 999]
@@ -0,0 +1,69 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_utils.replacement_engine import best_replacements, budget_slack, find_replacements
+
+RACES = ['R1', 'R2', 'R3']
+
+
+def brute_force(values, prices, k, budget):
+    best = None
+    for combo in itertools.combinations(range(len(values)), k):
+        if sum(prices[i] for i in combo) <= budget:
+            ev = sum(values[i] for i in combo)
+            if best is None or ev > best:
+                best = ev
+    return best
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 4])
+def test_best_replacements_matches_brute_force(k):
+    rng = np.random.default_rng(k)
+    for _ in range(20):
+        values = rng.integers(0, 50, 14).astype(float)
+        prices = rng.choice([0.5, 0.75, 1, 1.5, 2, 3], 14)
+        budget = float(rng.choice([1.5, 3, 5]))
+        gekozen = best_replacements(values, prices, k, budget)
+        expected = brute_force(values, prices, k, budget)
+        if expected is None:
+            assert gekozen == []
+        else:
+            assert len(gekozen) == k
+            assert prices[gekozen].sum() <= budget
+            assert values[gekozen].sum() == pytest.approx(expected)
+
+
+@pytest.fixture
+def df_eval():
+    return pd.DataFrame({
+        'Renner': ['A', 'B', 'C', 'D', 'E', 'F'],
+        'Prijs': [10, 10, 10, 8, 3, 1],
+        'EV_R1': [5, 5, 5, 50, 50, 1],
+        'EV_R2': [5, 5, 5, 40, 20, 2],
+        'EV_R3': [5, 5, 5, 40, 20, 3],
+    })
+
+
+def test_budget_slack_checks_future_transfers(df_eval):
+    prices = df_eval['Prijs'].to_numpy()
+    index = {r: i for i, r in enumerate(df_eval['Renner'])}
+    plan = [{'uit': 'B', 'in': 'C', 'moment': 'R2'}]
+    # Current team without injured A: B (10). After R2: C (10).
+    assert budget_slack(prices, index, ['A', 'B'], plan, ['A'], 'R1', 20, RACES) == 10
+
+
+def test_find_replacements_uses_remaining_ev(df_eval):
+    # D is the best for R2+R3 but too expensive, E fits the budget.
+    res = find_replacements(df_eval, ['A', 'B'], [], ['A'], 'R1', 15, RACES)
+    assert res == ['E']
+    res = find_replacements(df_eval, ['A', 'B'], [], ['A'], 'R1', 20, RACES)
+    assert res == ['D']
+
+
+def test_find_replacements_skips_planned_riders(df_eval):
+    plan = [{'uit': 'B', 'in': 'D', 'moment': 'R2'}]
+    res = find_replacements(df_eval, ['A', 'B'], plan, ['A'], 'R1', 30, RACES)
+    assert res == ['E']
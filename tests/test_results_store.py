@@ -0,0 +1,83 @@
+import os
+
+from app_utils.results_store import ResultsStore, load_results
+
+HEADER = "Race\tRnk\tRider\tTeam\n"
+
+
+def write(path, text, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_ingests_races_incrementally(tmp_path):
+    path = tmp_path / "uitslagen.csv"
+    write(path, HEADER + "OHN\t1\t Van der Poel Mathieu\tADC\nOHN\t2\t Philipsen Jasper\tADC\n")
+    store = ResultsStore(str(path))
+    assert store.refresh() == ["OHN"]
+    assert store.races() == ["OHN"]
+    assert store.refresh() == []
+
+    write(path, "\n" + HEADER + "KBK\t1\t Philipsen Jasper\tADC\nKBK\tDNS\t Pedersen Mads\tLTK\n", mode="a")
+    os.utime(path, ns=(1, 10**18))
+    assert store.refresh() == ["KBK"]
+    assert store.races() == ["OHN", "KBK"]
+    assert len(store.frame()) == 4
+    assert list(store.frame().columns) == ["Race", "Rnk", "Rider", "Team"]
+
+
+def test_matched_only_processes_new_rows(tmp_path):
+    path = tmp_path / "uitslagen.csv"
+    write(path, HEADER + "OHN\t1\tA\tT\nOHN\t2\tB\tT\nOHN\tDNS\tC\tT\n")
+    store = ResultsStore(str(path))
+    store.refresh()
+
+    calls = []
+    def matcher(naam):
+        calls.append(naam)
+        return None if naam == "B" else naam.lower()
+
+    df = store.matched("k", matcher)
+    assert df.to_dict("records") == [{"Race": "OHN", "Rnk": "1", "Renner": "a"}]
+    assert calls == ["A", "B"]
+
+    write(path, "NOK\t1\tA\tT\nNOK\t2\tD\tT\n", mode="a")
+    os.utime(path, ns=(1, 10**18))
+    store.refresh()
+    df = store.matched("k", matcher)
+    assert calls == ["A", "B", "D"]
+    assert df["Race"].tolist() == ["OHN", "NOK", "NOK"]
+    assert store.matched("k", matcher) is df
+
+
+def test_rewritten_file_is_reloaded(tmp_path):
+    path = tmp_path / "uitslagen.csv"
+    write(path, HEADER + "OHN\t1\tA\tT\n")
+    store = ResultsStore(str(path))
+    store.refresh()
+
+    write(path, HEADER + "MSR\t1\tB\tT\nMSR\t2\tC\tT\n")
+    os.utime(path, ns=(1, 10**18))
+    store.refresh()
+    assert store.races() == ["MSR"]
+    assert store.matched("k", str.lower)["Renner"].tolist() == ["b", "c"]
+
+
+def test_quoted_fields_and_partial_last_line(tmp_path):
+    path = tmp_path / "uitslagen.csv"
+    write(path, HEADER + 'OHN\t1\t Van Aert Wout\t"Visma\tLease a Bike"\nOHN\t2\t Pedersen Ma')
+    store = ResultsStore(str(path))
+    store.refresh()
+    assert store.frame()["Team"].tolist() == ["Visma\tLease a Bike"]
+
+    # De rest van de half geschreven regel komt erbij; de regel wordt pas nu ingelezen
+    write(path, "ds\tLTK\n", mode="a")
+    os.utime(path, ns=(1, 10**18))
+    assert store.refresh() == ["OHN"]
+    assert store.frame()["Rider"].tolist() == [" Van Aert Wout", " Pedersen Mads"]
+
+
+def test_missing_file(tmp_path):
+    store = load_results(str(tmp_path / "bestaat_niet.csv"))
+    assert store.races() == []
+    assert store.columns == []
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from app_utils import giro_data, scorito_klassiekers, sporza_klassiekers
+from app_utils.data_access import rider_stats
+from app_utils.rider_types import giro_rollen, klassieker_types
+
+
+def test_klassieker_types_match_row_functions_on_all_riders():
+    df = rider_stats()
+    types = klassieker_types(df)
+    assert types.index.equals(df.index)
+    assert types.tolist() == df.apply(sporza_klassiekers.bepaal_klassieker_type, axis=1).tolist()
+    assert types.tolist() == df.apply(scorito_klassiekers.bepaal_klassieker_type, axis=1).tolist()
+    assert {'Allround / Multispecialist', 'Kassei / Sprint', 'Kassei'} <= set(types)
+
+
+def test_klassieker_types_edge_cases():
+    df = pd.DataFrame({
+        'COB': [90, 90, 0, 'x', 50, 60, None],
+        'HLL': [90, 0, 90, 90, 70, 60, 90],
+        'SPR': [90, 90, 90, 90, 50, 60, 90],
+        'MTN': [0, 0, 0, 0, 70, 60, 0],
+    })
+    assert klassieker_types(df).tolist() == [
+        'Allround / Multispecialist', 'Kassei / Sprint', 'Heuvel / Sprint', 'Onbekend', 'Heuvel', 'Kassei', 'Onbekend'
+    ]
+    rijen = [sporza_klassiekers.bepaal_klassieker_type(r) for r in df.to_dict('records')]
+    assert klassieker_types(df).tolist() == rijen
+    assert klassieker_types(pd.DataFrame({'COB': [0]})).tolist() == ['Onbekend']
+    assert klassieker_types(pd.DataFrame(columns=['COB'])).tolist() == []
+
+
+def test_giro_rollen_match_bepaal_rol_on_all_riders():
+    df = rider_stats()
+    assert giro_rollen(df).tolist() == df.apply(giro_data.bepaal_rol, axis=1).tolist()
+    assert set(giro_rollen(df)) == {'Klassementsrenner', 'Sprinter', 'Tijdrijder', 'Aanvaller / Klimmer', 'Knecht / Vrijbuiter'}
@@ -0,0 +1,37 @@
+import base64
+import io
+import os
+
+from PIL import Image
+
+from app_utils import stage_images
+
+
+def _png(path, size=(1600, 1000)):
+    Image.new('P', size, color=3).save(path, format='PNG')
+
+
+def test_extensionless_png_is_found_and_downscaled(tmp_path):
+    _png(tmp_path / "giro26-13-hp")
+    uri = stage_images.stage_image_uri(str(tmp_path / "giro26-13-hp.jpg"))
+    assert uri.startswith("data:image/jpeg;base64,")
+    with Image.open(io.BytesIO(base64.b64decode(uri.split(",", 1)[1]))) as img:
+        assert img.size == (640, 400)
+
+
+def test_uri_cached_until_file_changes(tmp_path):
+    pad = tmp_path / "giro26-1-map.jpg"
+    Image.new('RGB', (400, 300)).save(pad, format='JPEG')
+    eerste = stage_images.stage_image_uri(str(pad))
+    assert stage_images.stage_image_uri(str(pad)) is eerste
+
+    Image.new('RGB', (200, 100), color='red').save(pad, format='JPEG')
+    os.utime(pad, ns=(1, 1))
+    assert stage_images.stage_image_uri(str(pad)) != eerste
+
+
+def test_missing_or_broken_image_gives_placeholder(tmp_path):
+    (tmp_path / "kapot.jpg").write_bytes(b"geen plaatje")
+    html = stage_images.clickable_image_html(str(tmp_path / "kapot.jpg"), "Kaart+1", "https://x")
+    assert 'src="https://placehold.co/600x400/eeeeee/000000?text=Kaart+1"' in html
+    assert stage_images.stage_image_uri(str(tmp_path / "weg.jpg")) is None
@@ -0,0 +1,112 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app_utils.storage import CachedRepository, Repository, SQLiteRepository, SupabaseRepository
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path):
+    return SQLiteRepository(str(tmp_path / "gebruikers.sqlite"), "gebruikers_data_test")
+
+
+def test_sqlite_repository_roundtrip(sqlite_repo):
+    assert sqlite_repo.get_user("wout") is None
+    sqlite_repo.create_user("wout", "hash1")
+    sqlite_repo.create_user("tadej", "hash2")
+    assert sqlite_repo.get_user("wout") == {"username": "wout", "password": "hash1"}
+
+    team = {"selected_riders": ["Wout van Aert"], "transfer_plan": [{"uit": "A", "in": "B", "moment": "E3"}]}
+    assert sqlite_repo.save_game_state("wout", "scorito_team", team) is True
+    assert sqlite_repo.save_game_state("onbekend", "scorito_team", team) is False
+    sqlite_repo.set_password("wout", "hash3")
+    assert sqlite_repo.load_game_state("wout", "scorito_team") == team
+    assert sqlite_repo.load_game_state("wout", "sporza_team") is None
+    assert sqlite_repo.get_user("wout", ["password", "scorito_team"])["password"] == "hash3"
+    assert sqlite_repo.get_user("onbekend") is None
+
+    board = sqlite_repo.list_users_for_leaderboard(["scorito_team", "sporza_team"])
+    assert [u["username"] for u in board] == ["wout", "tadej"]
+    assert board[0]["scorito_team"] == team and board[0]["sporza_team"] is None
+    assert set(board[1]) == {"username", "created_at", "scorito_team", "sporza_team"}
+
+    # Een tweede verbinding op hetzelfde bestand ziet dezelfde data
+    again = SQLiteRepository(sqlite_repo.path, "gebruikers_data_test")
+    assert again.load_game_state("wout", "scorito_team") == team
+
+
+def test_cached_repository_write_through(sqlite_repo):
+    klok = [0.0]
+    backend = MagicMock(wraps=sqlite_repo)
+    backend.name = sqlite_repo.name
+    repo = CachedRepository(backend, ttl=60, clock=lambda: klok[0])
+    repo.create_user("wout", "hash1")
+
+    assert repo.get_user("wout", ["password", "sporza_team"]) == {"username": "wout", "password": "hash1", "sporza_team": None}
+    assert repo.get_user("wout") == {"username": "wout", "password": "hash1"}
+    assert backend.get_user.call_count == 1
+
+    team = {"selected_riders": ["Jasper Philipsen"]}
+    repo.save_game_state("wout", "sporza_team", team)
+    team["selected_riders"].append("Gewijzigd na opslaan")
+    geladen = repo.load_game_state("wout", "sporza_team")
+    assert geladen == {"selected_riders": ["Jasper Philipsen"]}
+    geladen["selected_riders"].clear()
+    assert repo.load_game_state("wout", "sporza_team") == {"selected_riders": ["Jasper Philipsen"]}
+    assert sqlite_repo.load_game_state("wout", "sporza_team") == {"selected_riders": ["Jasper Philipsen"]}
+    assert backend.get_user.call_count == 1
+
+    repo.list_users_for_leaderboard(["sporza_team"])
+    repo.list_users_for_leaderboard(["sporza_team"])
+    assert backend.list_users_for_leaderboard.call_count == 1
+    repo.set_password("wout", "hash2")
+    assert repo.get_user("wout")["password"] == "hash2"
+    repo.list_users_for_leaderboard(["sporza_team"])
+    assert backend.list_users_for_leaderboard.call_count == 2
+
+    # Na de TTL wordt opnieuw uit de backend gelezen
+    klok[0] = 61
+    repo.get_user("wout")
+    assert backend.get_user.call_count == 2
+
+    # Een mislukte save (onbekende gebruiker) komt niet in de cache
+    assert repo.save_game_state("onbekend", "sporza_team", team) is False
+    assert repo.get_user("onbekend", ["sporza_team"]) is None
+
+
+def test_supabase_repository_queries():
+    client = MagicMock()
+    table = client.table.return_value
+    table.select.return_value.eq.return_value.execute.return_value.data = [{"username": "wout", "sporza_team": {"a": 1}}]
+    repo = SupabaseRepository(client, "gebruikers_data_test")
+
+    assert repo.load_game_state("wout", "sporza_team") == {"a": 1}
+    client.table.assert_called_with("gebruikers_data_test")
+    table.select.assert_called_with("username, sporza_team")
+    table.select.return_value.eq.assert_called_with("username", "wout")
+
+    table.update.return_value.eq.return_value.execute.return_value.data = [{"username": "wout"}]
+    assert repo.save_game_state("wout", "sporza_team", {"a": 2}) is True
+    table.update.assert_called_with({"sporza_team": {"a": 2}})
+    table.update.return_value.eq.assert_called_with("username", "wout")
+    table.update.return_value.eq.return_value.execute.return_value.data = []
+    assert repo.save_game_state("niemand", "sporza_team", {"a": 2}) is False
+
+    repo.create_user("tadej", "hash")
+    table.insert.assert_called_with({"username": "tadej", "password": "hash"})
+
+    table.select.return_value.execute.return_value.data = [{"username": "wout", "created_at": "x", "custom_team": None}]
+    assert repo.list_users_for_leaderboard(["custom_team"]) == [{"username": "wout", "created_at": "x", "custom_team": None}]
+    table.select.assert_called_with("username, created_at, custom_team")
+
+    table.select.return_value.eq.return_value.execute.return_value.data = []
+    assert repo.get_user("niemand") is None
+
+
+def test_incomplete_backend_fails_at_construction():
+    class Half(Repository):
+        def get_user(self, username, kolommen=("password",)):
+            return None
+
+    with pytest.raises(TypeError):
+        Half()
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from app_utils.transfer_planner import normalize_moments, period_races, plan_transfers
+
+RACES = ['R1', 'R2', 'R3', 'R4']
+
+
+@pytest.fixture
+def df():
+    # A and B only score early, C and D only late: the optimum sells A/B for C/D.
+    return pd.DataFrame({
+        'Renner': ['A', 'B', 'C', 'D', 'E'],
+        'Prijs': [5, 5, 5, 5, 1],
+        'Team': ['T1', 'T1', 'T2', 'T2', 'T3'],
+        'R1': [1, 1, 0, 0, 1], 'R2': [1, 1, 0, 0, 1], 'R3': [0, 0, 1, 1, 1], 'R4': [0, 0, 1, 1, 1],
+        'EV_R1': [50.0, 40.0, 0.0, 0.0, 1.0],
+        'EV_R2': [50.0, 40.0, 0.0, 0.0, 1.0],
+        'EV_R3': [0.0, 0.0, 60.0, 30.0, 1.0],
+        'EV_R4': [0.0, 0.0, 60.0, 30.0, 1.0],
+    })
+
+
+def test_normalize_moments_merges_and_sorts():
+    assert normalize_moments(['R3', 'GEEN', 'R1', 'R3'], RACES) == [('R1', 1), ('R3', 2)]
+    assert normalize_moments({'R2': 2, 'R1': 0}, RACES) == [('R2', 2)]
+
+
+def test_period_races():
+    assert period_races(RACES, [('R2', 1)]) == [['R1', 'R2'], ['R3', 'R4']]
+    assert period_races(RACES, []) == [RACES]
+
+
+def test_plan_transfers_periods(df):
+    res = plan_transfers(df, RACES, ['R2', 'R2'], 3, 11)
+    assert res['status'] == 'Optimal'
+    assert sorted(res['base_team']) == ['A', 'B', 'E']
+    assert sorted((t['uit'], t['in']) for t in res['plan']) == [('A', 'C'), ('B', 'D')]
+    assert all(t['moment'] == 'R2' for t in res['plan'])
+    assert res['objective'] == pytest.approx(50 * 2 + 40 * 2 + 60 * 2 + 30 * 2 + 4)
+
+
+def test_plan_transfers_respects_counts_and_budgets(df):
+    res = plan_transfers(df, RACES, ['R2'], 3, [11, 11])
+    assert len(res['plan']) == 1
+    assert res['plan'][0] == {'uit': 'B', 'in': 'C', 'moment': 'R2'}
+
+    res = plan_transfers(df, RACES, ['R2'], 3, [11, 6])
+    assert res['status'] != 'Optimal'
+
+
+def test_plan_transfers_starters_and_team_limit(df):
+    res = plan_transfers(df, RACES, {'R2': 1}, 3, 15, objective='starters', max_starters=1,
+                         max_per_team=1, exact_transfers=True)
+    assert res['status'] == 'Optimal'
+    assert len(res['plan']) == 1
+    # Only the best starter per race counts: A early, C late.
+    assert res['objective'] == pytest.approx(50 * 2 + 60 * 2)
+
+
+def test_single_move_blocks_rebuying(df):
+    res = plan_transfers(df, RACES, ['R1', 'R3'], 3, 11, single_move=True, force_base=['A', 'B', 'E'])
+    owned_after = {t['in'] for t in res['plan']}
+    sold = {t['uit'] for t in res['plan']}
+    assert not owned_after & sold